@@ -26,6 +26,23 @@ class PredictionRequest(BaseModel):
     user_preferences: Optional[Dict[str, Any]] = None
     prediction_params: Optional[Dict[str, Any]] = None
 
+class BatchPredictionRequest(BaseModel):
+    """
+    Modelo de requisição para predições ML em lote.
+    
+    Exatamente um dos campos `rows`, `columns` ou `book_ids` deve ser informado.
+    
+    Attributes:
+        model_type (str): Tipo do modelo (rating, price, category)
+        rows (Optional[List[Dict[str, Any]]]): Linhas de features (mesmo formato de `input_features`)
+        columns (Optional[Dict[str, List[Any]]]): Features em formato colunar (coluna -> valores)
+        book_ids (Optional[List[int]]): IDs de livros cujas features são resolvidas no servidor
+    """
+    model_type: str
+    rows: Optional[List[Dict[str, Any]]] = None
+    columns: Optional[Dict[str, List[Any]]] = None
+    book_ids: Optional[List[int]] = None
+
 class PredictionResult(BaseModel):
     """
     Modelo de resultado individual de predição.
@@ -56,4 +73,19 @@ class MLPredictionsResponse(BaseModel):
     model_info: Dict[str, Any]
     execution_time_ms: float
     total_predictions: int
-    metadata: Dict[str, Any]
\ No newline at end of file
+    metadata: Dict[str, Any]
+
+class SimilarBooksResponse(BaseModel):
+    """
+    Resposta do endpoint de livros similares.
+    
+    Attributes:
+        book_id (int): ID do livro de referência
+        similar_books (List[PredictionResult]): Livros similares, com a similaridade em `prediction_value`
+        model_info (Dict[str, Any]): Informações sobre o índice de similaridade usado
+        execution_time_ms (float): Tempo de execução em milissegundos
+    """
+    book_id: int
+    similar_books: List[PredictionResult]
+    model_info: Dict[str, Any]
+    execution_time_ms: float
@@ -45,4 +45,18 @@ class MLTrainingDataResponse(BaseModel):
     feature_columns: List[str]
     target_columns: List[str]
     dataset_info: Dict[str, Any]
-    split_info: Dict[str, Any]
\ No newline at end of file
+    split_info: Dict[str, Any]
+class MLTrainingStatsResponse(BaseModel):
+    """
+    Resposta do endpoint de estatísticas do dataset de treinamento ML.
+    
+    Retorna apenas as estatísticas do dataset, sem os registros de treinamento.
+    
+    Attributes:
+        total_records (int): Total de registros no dataset
+        dataset_info (Dict[str, Any]): Estatísticas do dataset (min, max, avg, std, categorias)
+        split_info (Dict[str, Any]): Informações sobre divisão train/test/validation
+    """
+    total_records: int
+    dataset_info: Dict[str, Any]
+    split_info: Dict[str, Any]
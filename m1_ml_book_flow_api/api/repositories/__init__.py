@@ -13,6 +13,7 @@ Módulos disponíveis:
     - stats_overview_repository: Estatísticas gerais do sistema
     - stats_categories_repository: Estatísticas agrupadas por categoria
     - top_rating_repository: Livros mais bem avaliados (top rated)
+    - catalog_repository: Snapshot colunar em memória do catálogo para os endpoints de leitura
     - scraping_repository: Persistência de livros coletados via web scraping
 """
 
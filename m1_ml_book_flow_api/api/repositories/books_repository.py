@@ -3,13 +3,19 @@ Módulo de repositório para gerenciamento de livros.
 
 Este módulo contém funções para buscar, listar e filtrar livros a partir do
 banco de dados PostgreSQL. Serve como camada de acesso aos dados de livros.
+
+As consultas de leitura são guardadas em cache por versão do catálogo
+(`core.catalog_version`): um commit do scraping em qualquer worker ou nó
+invalida os resultados.
 """
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from m1_ml_book_flow_api.api.models.Book import Book
 from m1_ml_book_flow_api.core.models import BookDB
-from m1_ml_book_flow_api.core.database import get_db
+from m1_ml_book_flow_api.core.database import get_db, SessionLocal
+from m1_ml_book_flow_api.core.catalog_version import catalog_cached
+from m1_ml_book_flow_api.core.timing import span
 
 def _convert_book_db_to_book(book_db: BookDB) -> Book:
     """
@@ -33,7 +39,44 @@ def _convert_book_db_to_book(book_db: BookDB) -> Book:
         image=book_db.image or ""
     )
 
-def list_books(db: Session = None) -> List[Book]:
+# Colunas do modelo `Book`, consultadas sem instanciar `BookDB`
+_BOOK_COLUMNS = (BookDB.id, BookDB.title, BookDB.author, BookDB.year, BookDB.category,
+                 BookDB.price, BookDB.rating, BookDB.available, BookDB.image)
+
+def _row_to_dict(row: tuple) -> dict:
+    """
+    Converte uma linha (tupla de colunas) no dicionário com os campos do modelo `Book`.
+
+    Aplica os mesmos padrões de `_convert_book_db_to_book`, sem construir o modelo
+    ORM nem o modelo Pydantic: as listas são serializadas diretamente pelo orjson.
+    """
+    book_id, title, author, year, category, price, rating, available, image = row
+    return {
+        "id": book_id,
+        "title": title,
+        "author": author or "",
+        "year": year or 0,
+        "category": category or "",
+        "price": price,
+        "rating": rating or 0.0,
+        "available": available,
+        "image": image or "",
+    }
+
+def _fetch_books(query) -> List[dict]:
+    """
+    Executa a consulta de colunas de livros e converte as linhas em dicionários.
+
+    A consulta e a conversão são registradas nas etapas `db` e `convert` da
+    requisição (header Server-Timing).
+    """
+    with span("db"):
+        rows = query.all()
+    with span("convert"):
+        return [_row_to_dict(row) for row in rows]
+
+@catalog_cached()
+def list_books(db: Session = None) -> List[dict]:
     """
     Lista todos os livros disponíveis no banco de dados.
 
@@ -41,21 +84,49 @@ def list_books(db: Session = None) -> List[Book]:
         db (Session, optional): Sessão do banco de dados. Se não fornecida, cria uma nova.
 
     Returns:
-        List[Book]: Lista com todos os livros cadastrados no sistema.
+        List[dict]: Lista com todos os livros cadastrados no sistema (campos do modelo `Book`).
     """
     if db is None:
         db_gen = get_db()
         db = next(db_gen)
         try:
-            books_db = db.query(BookDB).all()
-            return [_convert_book_db_to_book(book) for book in books_db]
+            return _fetch_books(db.query(*_BOOK_COLUMNS))
+        finally:
+            db.close()
+    else:
+        return _fetch_books(db.query(*_BOOK_COLUMNS))
+
+def get_books_by_ids(book_ids: List[int], db: Session = None) -> List[Book]:
+    """
+    Busca vários livros pelos IDs em uma única consulta.
+
+    Args:
+        book_ids (List[int]): IDs dos livros a serem buscados.
+        db (Session, optional): Sessão do banco de dados. Se não fornecida, cria uma nova.
+
+    Returns:
+        List[Book]: Livros encontrados (sem ordem garantida). IDs inexistentes são ignorados.
+    """
+    if not book_ids:
+        return []
+    if db is None:
+        db_gen = get_db()
+        db = next(db_gen)
+        try:
+            with span("db"):
+                books_db = db.query(BookDB).filter(BookDB.id.in_(set(book_ids))).all()
+            with span("convert"):
+                return [_convert_book_db_to_book(book) for book in books_db]
         finally:
             db.close()
     else:
-        books_db = db.query(BookDB).all()
-        return [_convert_book_db_to_book(book) for book in books_db]
+        with span("db"):
+            books_db = db.query(BookDB).filter(BookDB.id.in_(set(book_ids))).all()
+        with span("convert"):
+            return [_convert_book_db_to_book(book) for book in books_db]
 
-def search_books_by(title: Optional[str] = None, category: Optional[str] = None, db: Session = None) -> List[Book]:
+@catalog_cached()
+def search_books_by(title: Optional[str] = None, category: Optional[str] = None, db: Session = None) -> List[dict]:
     """
     Busca livros por título e/ou categoria no banco de dados.
 
@@ -69,14 +140,14 @@ def search_books_by(title: Optional[str] = None, category: Optional[str] = None,
         db (Session, optional): Sessão do banco de dados. Se não fornecida, cria uma nova.
 
     Returns:
-        List[Book]: Lista de livros que correspondem aos critérios de busca.
+        List[dict]: Lista de livros (campos do modelo `Book`) que correspondem aos critérios de busca.
                    Se ambos os parâmetros forem None, retorna todos os livros.
     """
     if db is None:
         db_gen = get_db()
         db = next(db_gen)
         try:
-            query = db.query(BookDB)
+            query = db.query(*_BOOK_COLUMNS)
             
             filters = []
             if title:
@@ -87,12 +158,11 @@ def search_books_by(title: Optional[str] = None, category: Optional[str] = None,
             if filters:
                 query = query.filter(and_(*filters))
             
-            books_db = query.all()
-            return [_convert_book_db_to_book(book) for book in books_db]
+            return _fetch_books(query)
         finally:
             db.close()
     else:
-        query = db.query(BookDB)
+        query = db.query(*_BOOK_COLUMNS)
         
         filters = []
         if title:
@@ -103,10 +173,10 @@ def search_books_by(title: Optional[str] = None, category: Optional[str] = None,
         if filters:
             query = query.filter(and_(*filters))
         
-        books_db = query.all()
-        return [_convert_book_db_to_book(book) for book in books_db]
+        return _fetch_books(query)
 
-def search_books_by_range_price(min_price: float = 0.0, max_price: Optional[float] = None, db: Session = None) -> List[Book]:
+@catalog_cached()
+def search_books_by_range_price(min_price: float = 0.0, max_price: Optional[float] = None, db: Session = None) -> List[dict]:
     """
     Busca livros por faixa de preço no banco de dados.
 
@@ -119,30 +189,71 @@ def search_books_by_range_price(min_price: float = 0.0, max_price: Optional[floa
         db (Session, optional): Sessão do banco de dados. Se não fornecida, cria uma nova.
 
     Returns:
-        List[Book]: Lista de livros que estão na faixa de preço especificada.
+        List[dict]: Lista de livros (campos do modelo `Book`) que estão na faixa de preço especificada.
     """
     if db is None:
         db_gen = get_db()
         db = next(db_gen)
         try:
-            query = db.query(BookDB).filter(BookDB.price >= min_price)
+            query = db.query(*_BOOK_COLUMNS).filter(BookDB.price >= min_price)
             
             if max_price is not None:
                 query = query.filter(BookDB.price <= max_price)
             
-            books_db = query.all()
-            return [_convert_book_db_to_book(book) for book in books_db]
+            return _fetch_books(query)
         finally:
             db.close()
     else:
-        query = db.query(BookDB).filter(BookDB.price >= min_price)
+        query = db.query(*_BOOK_COLUMNS).filter(BookDB.price >= min_price)
         
         if max_price is not None:
             query = query.filter(BookDB.price <= max_price)
         
-        books_db = query.all()
-        return [_convert_book_db_to_book(book) for book in books_db]
+        return _fetch_books(query)
+
+def stream_books(
+    title: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    batch_size: int = 1000
+) -> Iterator[dict]:
+    """
+    Percorre os livros do banco com um cursor do lado do servidor, sem carregar o resultado inteiro.
+
+    Usa uma sessão própria (aberta na primeira linha e fechada ao final ou quando
+    o consumidor abandona o iterador), pois o streaming continua após o retorno
+    da rota e o fechamento da sessão injetada. Os filtros seguem `search_books_by`
+    e `search_books_by_range_price`; filtros None são ignorados.
 
+    Args:
+        title (Optional[str]): Título ou parte do título (case-insensitive)
+        category (Optional[str]): Categoria ou parte da categoria (case-insensitive)
+        min_price (Optional[float]): Preço mínimo (inclusivo)
+        max_price (Optional[float]): Preço máximo (inclusivo)
+        batch_size (int): Linhas lidas por vez do cursor (`yield_per`)
+
+    Yields:
+        dict: Livro com os campos do modelo `Book`, na ordem do ID
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(*_BOOK_COLUMNS)
+        if title:
+            query = query.filter(BookDB.title.ilike(f"%{title}%"))
+        if category:
+            query = query.filter(BookDB.category.ilike(f"%{category}%"))
+        if min_price is not None:
+            query = query.filter(BookDB.price >= min_price)
+        if max_price is not None:
+            query = query.filter(BookDB.price <= max_price)
+        query = query.order_by(BookDB.id).execution_options(stream_results=True, yield_per=batch_size)
+        for row in query:
+            yield _row_to_dict(row)
+    finally:
+        db.close()
+
+@catalog_cached()
 def get_book_by_id(book_id: int, db: Session = None):
     """
     Obtém detalhes completos de um livro pelo ID do banco de dados.
@@ -160,7 +271,8 @@ def get_book_by_id(book_id: int, db: Session = None):
         db_gen = get_db()
         db = next(db_gen)
         try:
-            book_db = db.query(BookDB).filter(BookDB.id == book_id).first()
+            with span("db"):
+                book_db = db.query(BookDB).filter(BookDB.id == book_id).first()
             if book_db:
                 # Simulando campos adicionais que não existem no modelo atual
                 # mas são esperados pela API (para compatibilidade)
@@ -182,7 +294,8 @@ def get_book_by_id(book_id: int, db: Session = None):
         finally:
             db.close()
     else:
-        book_db = db.query(BookDB).filter(BookDB.id == book_id).first()
+        with span("db"):
+            book_db = db.query(BookDB).filter(BookDB.id == book_id).first()
         if book_db:
             return {
                 "id": book_db.id,
@@ -0,0 +1,284 @@
+"""
+Módulo de repositório do snapshot em memória do catálogo de livros.
+
+Este módulo mantém, por processo, uma cópia imutável e colunar do catálogo:
+um array NumPy por coluna numérica e códigos inteiros para as colunas de texto,
+que apontam para uma tabela de strings internadas (cada título, autor, categoria
+ou URL aparece uma única vez em memória).
+
+O snapshot é construído na inicialização com uma única consulta e substituído
+atomicamente sempre que a versão do catálogo muda (ver `core.catalog_version`),
+inclusive quando o commit foi feito por outro worker ou nó. Os endpoints de
+leitura (categorias, estatísticas, top rated, health check e ML) calculam suas
+respostas a partir dele, sem ida ao banco de dados.
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from m1_ml_book_flow_api.api.models.Book import Book
+from m1_ml_book_flow_api.core.models import BookDB
+from m1_ml_book_flow_api.core.database import get_db
+from m1_ml_book_flow_api.core.catalog_version import catalog_version_watcher
+from m1_ml_book_flow_api.core.logger import get_logger
+from m1_ml_book_flow_api.core.metrics import CATALOG_BOOKS
+from m1_ml_book_flow_api.core.timing import span
+
+catalog_logger = get_logger("catalog_repository")
+
+class CatalogSnapshot:
+    """
+    Snapshot imutável e colunar do catálogo de livros.
+
+    Attributes:
+        ids (np.ndarray): IDs dos livros (ordenados)
+        prices (np.ndarray): Preços
+        ratings (np.ndarray): Avaliações (0.0 quando ausente)
+        rated (np.ndarray): Flags indicando se o livro tem avaliação (distingue ausente de 0.0)
+        years (np.ndarray): Anos de publicação (0 quando ausente)
+        available (np.ndarray): Flags de disponibilidade
+        title_codes, author_codes, category_codes, image_codes (np.ndarray): Códigos na tabela de strings
+        strings (Tuple[str, ...]): Tabela de strings internadas
+        version (int): Versão do snapshot (incrementada a cada reconstrução no processo)
+        built_at (float): Data/hora de construção (timestamp Unix)
+    """
+    __slots__ = (
+        "ids", "prices", "ratings", "rated", "years", "available",
+        "title_codes", "author_codes", "category_codes", "image_codes",
+        "strings", "version", "built_at", "_categories", "_books", "_lock",
+    )
+
+    def __init__(self, columns: Dict[str, np.ndarray], strings: Sequence[str], version: int):
+        self.ids = columns["ids"]
+        self.prices = columns["prices"]
+        self.ratings = columns["ratings"]
+        self.rated = columns["rated"]
+        self.years = columns["years"]
+        self.available = columns["available"]
+        self.title_codes = columns["title_codes"]
+        self.author_codes = columns["author_codes"]
+        self.category_codes = columns["category_codes"]
+        self.image_codes = columns["image_codes"]
+        self.strings = tuple(strings)
+        self.version = version
+        self.built_at = time.time()
+        self._categories: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._books: Optional[Tuple[Book, ...]] = None
+        self._lock = threading.Lock()
+        for array in columns.values():
+            array.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple], version: int = 0) -> "CatalogSnapshot":
+        """
+        Constrói o snapshot a partir das linhas (id, title, author, year, category, price, rating, available, image).
+
+        Valores ausentes recebem os mesmos padrões da conversão para o modelo `Book`;
+        a coluna `rated` guarda quais livros têm avaliação de fato.
+
+        Args:
+            rows (Sequence[tuple]): Linhas retornadas pela consulta ao banco
+            version (int): Versão do snapshot
+
+        Returns:
+            CatalogSnapshot: Snapshot pronto para consulta
+        """
+        n_rows = len(rows)
+        intern: Dict[str, int] = {}
+
+        def code(value: Optional[str]) -> int:
+            value = value or ""
+            found = intern.get(value)
+            if found is None:
+                found = intern[value] = len(intern)
+            return found
+
+        columns = {
+            "ids": np.fromiter((row[0] for row in rows), dtype=np.int64, count=n_rows),
+            "title_codes": np.fromiter((code(row[1]) for row in rows), dtype=np.int32, count=n_rows),
+            "author_codes": np.fromiter((code(row[2]) for row in rows), dtype=np.int32, count=n_rows),
+            "years": np.fromiter((row[3] or 0 for row in rows), dtype=np.int64, count=n_rows),
+            "category_codes": np.fromiter((code(row[4]) for row in rows), dtype=np.int32, count=n_rows),
+            "prices": np.fromiter((row[5] for row in rows), dtype=np.float64, count=n_rows),
+            "ratings": np.fromiter((row[6] or 0.0 for row in rows), dtype=np.float64, count=n_rows),
+            "rated": np.fromiter((row[6] is not None for row in rows), dtype=bool, count=n_rows),
+            "available": np.fromiter((bool(row[7]) for row in rows), dtype=bool, count=n_rows),
+            "image_codes": np.fromiter((code(row[8]) for row in rows), dtype=np.int32, count=n_rows),
+        }
+        return cls(columns, list(intern), version)
+
+    def string(self, code: int) -> str:
+        """Texto correspondente a um código da tabela de strings."""
+        return self.strings[code]
+
+    def category_groups(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Códigos das categorias e o grupo de cada livro, na ordem da primeira ocorrência.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Códigos únicos de categoria e, para cada livro,
+            o índice do seu grupo nesses códigos
+        """
+        if self._categories is None:
+            codes, first_index, inverse = np.unique(self.category_codes, return_index=True, return_inverse=True)
+            order = np.argsort(first_index, kind="stable")
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            self._categories = (codes[order], rank[inverse])
+        return self._categories
+
+    def book(self, position: int) -> Book:
+        """Materializa um livro do snapshot como modelo `Book`."""
+        return Book(
+            id=int(self.ids[position]),
+            title=self.strings[self.title_codes[position]],
+            author=self.strings[self.author_codes[position]],
+            year=int(self.years[position]),
+            category=self.strings[self.category_codes[position]],
+            price=float(self.prices[position]),
+            rating=float(self.ratings[position]),
+            available=bool(self.available[position]),
+            image=self.strings[self.image_codes[position]],
+        )
+
+    def books(self) -> Tuple[Book, ...]:
+        """
+        Livros do snapshot como modelos `Book`.
+
+        A materialização é feita uma única vez por snapshot e reutilizada.
+        """
+        if self._books is None:
+            with self._lock:
+                if self._books is None:
+                    self._books = tuple(self.book(position) for position in range(len(self)))
+        return self._books
+
+_COLUMNS = (BookDB.id, BookDB.title, BookDB.author, BookDB.year, BookDB.category,
+            BookDB.price, BookDB.rating, BookDB.available, BookDB.image)
+
+@span("db")
+def _fetch_rows(db: Session) -> List[tuple]:
+    return db.query(*_COLUMNS).order_by(BookDB.id).all()
+
+class CatalogStore:
+    """
+    Mantém o snapshot ativo do catálogo no processo.
+
+    A referência ao snapshot é substituída por inteiro a cada reconstrução, então
+    leitores nunca veem um estado parcial e nunca precisam de lock. Apenas a
+    primeira construção é serializada, para que requisições simultâneas não
+    reconstruam o snapshot cada uma.
+    """
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._first_build_lock = threading.Lock()
+        self._version = 0
+
+    def refresh(self, db: Session = None) -> CatalogSnapshot:
+        """
+        Reconstrói o snapshot a partir do banco de dados e o ativa.
+
+        Args:
+            db (Session, optional): Sessão do banco de dados. Se não fornecida, cria uma nova.
+
+        Returns:
+            CatalogSnapshot: Novo snapshot ativo
+        """
+        start = time.perf_counter()
+        if db is None:
+            db_gen = get_db()
+            db = next(db_gen)
+            try:
+                rows = _fetch_rows(db)
+            finally:
+                db.close()
+        else:
+            rows = _fetch_rows(db)
+        with self._lock:
+            self._version += 1
+            snapshot = self.set_snapshot(CatalogSnapshot.from_rows(rows, self._version))
+        CATALOG_BOOKS.set(len(snapshot))
+        catalog_logger.info(
+            f"Snapshot do catálogo construído: {len(snapshot)} livros",
+            extra={"event": "catalog_snapshot_built", "total_books": len(snapshot),
+                   "snapshot_version": snapshot.version,
+                   "build_time_ms": round((time.perf_counter() - start) * 1000, 2)}
+        )
+        return snapshot
+
+    def set_snapshot(self, snapshot: CatalogSnapshot) -> CatalogSnapshot:
+        """
+        Ativa um snapshot já construído (ex.: snapshot fixo em testes).
+
+        Args:
+            snapshot (CatalogSnapshot): Snapshot a ser ativado
+
+        Returns:
+            CatalogSnapshot: Snapshot ativo
+        """
+        self._snapshot = snapshot
+        return snapshot
+
+    @property
+    def is_loaded(self) -> bool:
+        """Indica se algum snapshot já foi construído ou ativado."""
+        return self._snapshot is not None
+
+    def get(self) -> CatalogSnapshot:
+        """
+        Obtém o snapshot ativo, construindo-o na primeira chamada.
+
+        Returns:
+            CatalogSnapshot: Snapshot ativo do catálogo
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        with self._first_build_lock:
+            snapshot = self._snapshot
+            return snapshot if snapshot is not None else self.refresh()
+
+# Snapshot global do processo
+catalog_store = CatalogStore()
+
+def _on_catalog_version(version: int) -> None:
+    """Reconstrói o snapshot (se já construído) quando a versão do catálogo muda."""
+    if catalog_store.is_loaded:
+        catalog_store.refresh()
+
+catalog_version_watcher.subscribe(_on_catalog_version)
+
+def get_catalog() -> CatalogSnapshot:
+    """
+    Obtém o snapshot ativo do catálogo de livros.
+
+    Returns:
+        CatalogSnapshot: Snapshot imutável e colunar do catálogo
+    """
+    return catalog_store.get()
+
+def refresh_catalog(db: Session = None) -> CatalogSnapshot:
+    """
+    Reconstrói o snapshot do catálogo (chamado na inicialização e quando a versão do catálogo muda).
+
+    Args:
+        db (Session, optional): Sessão do banco de dados. Se não fornecida, cria uma nova.
+
+    Returns:
+        CatalogSnapshot: Novo snapshot ativo
+    """
+    return catalog_store.refresh(db)
+
+def list_books() -> List[Book]:
+    """
+    Lista todos os livros do snapshot do catálogo, sem consulta ao banco.
+
+    Returns:
+        List[Book]: Livros do catálogo (materializados uma única vez por snapshot)
+    """
+    return list(get_catalog().books())
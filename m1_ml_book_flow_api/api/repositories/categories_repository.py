@@ -2,10 +2,12 @@
 Módulo de repositório para gerenciamento de categorias de livros.
 
 Este módulo contém funções para extrair e listar categorias únicas a partir
-dos livros cadastrados no sistema.
+dos livros cadastrados no sistema, a partir do snapshot em memória do catálogo.
 """
-from m1_ml_book_flow_api.api.repositories.books_repository import list_books
+from m1_ml_book_flow_api.api.repositories.catalog_repository import get_catalog
+from m1_ml_book_flow_api.core.catalog_version import catalog_cached
 
+@catalog_cached()
 def list_categories():
     """
     Lista todas as categorias únicas de livros disponíveis no sistema.
@@ -17,9 +19,7 @@ def list_categories():
         List[str]: Lista ordenada alfabeticamente com todas as categorias únicas.
                    Retorna lista vazia se não houver livros ou categorias cadastradas.
     """
-    categories = set()
-    books = list_books()
-    for book in books:
-        if getattr(book, "category", None):
-            categories.add(book.category)
-    return sorted(list(categories))
\ No newline at end of file
+    catalog = get_catalog()
+    categories = {catalog.string(code) for code in catalog.category_groups()[0]}
+    categories.discard("")
+    return sorted(categories)
\ No newline at end of file
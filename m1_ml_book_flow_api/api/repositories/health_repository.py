@@ -4,7 +4,7 @@ Módulo de repositório para informações de health check.
 Este módulo contém funções para fornecer estatísticas básicas utilizadas
 no endpoint de health check da API.
 """
-from ..repositories.books_repository import list_books
+from ..repositories.catalog_repository import get_catalog
 
 def get_books_count() -> int:
     """
@@ -16,5 +16,4 @@ def get_books_count() -> int:
     Returns:
         int: Número total de livros cadastrados. Retorna 0 se não houver livros.
     """
-    books = list_books()
-    return len(books)
\ No newline at end of file
+    return len(get_catalog())
\ No newline at end of file
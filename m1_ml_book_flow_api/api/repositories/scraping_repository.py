@@ -7,12 +7,13 @@ no banco de dados PostgreSQL usando SQLAlchemy.
 from sqlalchemy.orm import Session
 from typing import List, Dict
 from m1_ml_book_flow_api.core.models import BookDB
+from m1_ml_book_flow_api.core.catalog_version import bump_catalog_version
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
 logger = logging.getLogger(__name__)
 
-def save_scraped_books(db: Session, books_data: List[Dict]) -> int:
+def save_scraped_books(db: Session, books_data: List[Dict], bump_version: bool = True) -> int:
     """
     Salva livros coletados via scraping no banco de dados.
     
@@ -21,13 +22,19 @@ def save_scraped_books(db: Session, books_data: List[Dict]) -> int:
     - Se não existir, cria um novo registro
     
     O commit é realizado imediatamente após processar todos os livros da lista,
-    garantindo que os dados sejam persistidos no banco.
+    garantindo que os dados sejam persistidos no banco. Se algum livro foi salvo
+    e `bump_version` for True, a versão do catálogo é incrementada na mesma
+    transação, o que notifica todos os workers (via LISTEN/NOTIFY) para
+    invalidarem seus caches. Quem salva vários lotes seguidos (como o scraping,
+    página por página) passa False e chama `publish_catalog_version` uma única
+    vez ao final, evitando uma reconstrução do catálogo por lote.
     
     Args:
         db (Session): Sessão do banco de dados SQLAlchemy
         books_data (List[Dict]): Lista de dicionários com dados dos livros a serem salvos.
                                 Cada dicionário deve conter: title, author, year, category,
                                 price, rating, available, image.
+        bump_version (bool): Se incrementa a versão do catálogo no commit do lote
         
     Returns:
         int: Número total de livros salvos (criados + atualizados)
@@ -89,6 +96,8 @@ def save_scraped_books(db: Session, books_data: List[Dict]) -> int:
         
         # Realiza commit imediato para este lote de livros
         db.flush()
+        if saved_count > 0 and bump_version:
+            bump_catalog_version(db)
         db.commit()
         
         if saved_count > 0:
@@ -105,3 +114,28 @@ def save_scraped_books(db: Session, books_data: List[Dict]) -> int:
         logger.error(f"Erro inesperado ao salvar livros: {e}", exc_info=True)
         raise
 
+def publish_catalog_version(db: Session) -> int:
+    """
+    Incrementa a versão do catálogo em uma transação própria.
+
+    Usada ao final de uma sequência de lotes salvos com `bump_version=False`,
+    para notificar os workers uma única vez sobre todas as alterações.
+
+    Args:
+        db (Session): Sessão do banco de dados SQLAlchemy
+
+    Returns:
+        int: Nova versão do catálogo
+
+    Raises:
+        SQLAlchemyError: Em caso de erro do banco de dados (faz rollback automaticamente)
+    """
+    try:
+        version = bump_catalog_version(db)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.error(f"Erro do banco de dados ao publicar versão do catálogo: {e}", exc_info=True)
+        raise
+    logger.info(f"Versão do catálogo publicada: {version}")
+    return version
@@ -5,9 +5,12 @@ Este módulo contém funções para calcular estatísticas agrupadas por categor
 incluindo quantidade de livros e preço médio por categoria.
 """
 from typing import Optional, List
+import numpy as np
 from m1_ml_book_flow_api.api.models.StatsCategories import StatsCategories
-from m1_ml_book_flow_api.api.services.books_service import list_books
+from m1_ml_book_flow_api.api.repositories.catalog_repository import get_catalog
+from m1_ml_book_flow_api.core.catalog_version import catalog_cached
 
+@catalog_cached()
 def get_stats_categories() -> Optional[List[StatsCategories]]:
     """
     Calcula e retorna estatísticas agrupadas por categoria de livros.
@@ -25,29 +28,23 @@ def get_stats_categories() -> Optional[List[StatsCategories]]:
         - quantity_books: Quantidade de livros nesta categoria
         - category_price: Preço médio dos livros da categoria (arredondado para 2 casas decimais)
     """
-    books = list_books()
-    if not books:
+    catalog = get_catalog()
+    if len(catalog) == 0:
         return None
 
     # Agrupa livros por categoria e acumula preços
-    category_data = {}
-
-    for book in books:
-        category = book.category
-        if category not in category_data:
-            category_data[category] = {"total_price": 0, "count": 0}
-        category_data[category]["total_price"] += book.price
-        category_data[category]["count"] += 1
+    codes, groups = catalog.category_groups()
+    counts = np.bincount(groups, minlength=len(codes))
+    total_prices = np.bincount(groups, weights=catalog.prices, minlength=len(codes))
 
     # Calcula estatísticas para cada categoria
     stats = []
-    for category, data in category_data.items():
-        avg_price = data["total_price"] / data["count"]
+    for code, count, total_price in zip(codes.tolist(), counts.tolist(), total_prices.tolist()):
         stats.append(
             StatsCategories(
-                category_name=category,
-                quantity_books=data["count"],
-                category_price=round(avg_price, 2)
+                category_name=catalog.string(code),
+                quantity_books=count,
+                category_price=round(total_price / count, 2)
             )
         )
 
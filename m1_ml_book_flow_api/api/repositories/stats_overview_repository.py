@@ -4,10 +4,13 @@ Módulo de repositório para estatísticas gerais (overview) dos livros.
 Este módulo contém funções para calcular e retornar estatísticas gerais do sistema,
 incluindo preço médio e distribuição de avaliações.
 """
-from typing import Optional, Counter
+from typing import Optional
+import numpy as np
 from ..models.StatsOverview import StatsOverview
-from ..repositories.books_repository import list_books
+from ..repositories.catalog_repository import get_catalog
+from m1_ml_book_flow_api.core.catalog_version import catalog_cached
 
+@catalog_cached()
 def get_stats_overview() -> Optional[StatsOverview]:
     """
     Calcula e retorna estatísticas gerais dos livros do sistema.
@@ -27,19 +30,19 @@ def get_stats_overview() -> Optional[StatsOverview]:
         - 200 livros com rating 4.5
         - 100 livros com rating 5.0
     """
-    books = list_books()
-    if len(books) == 0:
+    catalog = get_catalog()
+    if len(catalog) == 0:
         return None
     else:
         # Calcula preço médio
-        middle_price = sum(book.price for book in books) / len(books)
+        middle_price = float(catalog.prices.mean())
         
-        # Extrai todos os ratings disponíveis e conta a distribuição
-        ratings = [book.rating for book in books if getattr(book, "rating", None) is not None]
-        distribution_ratings = dict(Counter(ratings))
+        # Conta a distribuição dos ratings (livros sem avaliação ficam de fora)
+        ratings, counts = np.unique(catalog.ratings[catalog.rated], return_counts=True)
+        distribution_ratings = dict(zip(ratings.tolist(), counts.tolist()))
 
         stats = StatsOverview(
-            total_books=len(books),
+            total_books=len(catalog),
             middle_price=middle_price,
             distribution_ratings=distribution_ratings
         )
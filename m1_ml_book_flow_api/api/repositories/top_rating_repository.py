@@ -5,9 +5,12 @@ Este módulo contém funções para buscar e retornar os livros com melhores ava
 ordenados por rating em ordem decrescente.
 """
 from typing import List
+import numpy as np
 from ..models.TopRatedBook import TopRatedBook
-from ..services.books_service import list_books
+from ..repositories.catalog_repository import get_catalog
+from m1_ml_book_flow_api.core.catalog_version import catalog_cached
 
+@catalog_cached()
 def get_top_rating(number_items: int) -> List[TopRatedBook]:
     """
     Retorna os livros mais bem avaliados (top rated) do sistema.
@@ -27,12 +30,15 @@ def get_top_rating(number_items: int) -> List[TopRatedBook]:
         Se number_items=10, retorna os 10 livros com maior rating.
         Se houver apenas 5 livros, retorna esses 5 livros ordenados.
     """
-    books = list_books()
-    if not books:
+    catalog = get_catalog()
+    if len(catalog) == 0:
         return []
 
-    # Ordena livros por rating em ordem decrescente
-    sorted_books = sorted(books, key=lambda b: b.rating, reverse=True)
+    # Ordena livros por rating em ordem decrescente (estável, como sorted(reverse=True))
+    top = np.argsort(-catalog.ratings, kind="stable")[:number_items]
 
     # Retorna apenas os N primeiros livros
-    return [TopRatedBook(title=b.title, rating=b.rating) for b in sorted_books[:number_items]]
+    return [
+        TopRatedBook(title=catalog.string(catalog.title_codes[position]), rating=float(catalog.ratings[position]))
+        for position in top.tolist()
+    ]
@@ -14,5 +14,7 @@ Módulos disponíveis:
     - stats_categories: Rotas para estatísticas agrupadas por categoria
     - top_rating: Rotas para livros mais bem avaliados (top rated)
     - scraping: Rotas para web scraping de livros
+    - admin: Rotas administrativas (profile do worker em execução)
+    - metrics: Endpoint de métricas Prometheus (agregadas entre os workers)
 """
 
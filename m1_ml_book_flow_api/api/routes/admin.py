@@ -0,0 +1,70 @@
+"""
+Módulo de rotas administrativas.
+
+Este módulo define as rotas da API restritas a administradores (ADMIN_USERS),
+como o profile sob demanda do worker em execução.
+"""
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+from m1_ml_book_flow_api.core.security.security import get_admin_user
+from m1_ml_book_flow_api.core.profiler import PROFILING_INTERVAL_MS, PROFILING_MAX_SECONDS
+from m1_ml_book_flow_api.api.services.profiling_service import profile_worker
+from m1_ml_book_flow_api.core.errors import ErrorResponse
+
+# Router com autenticação e restrição a administradores em todas as rotas
+router = APIRouter(
+    dependencies=[Depends(get_admin_user)]
+)
+
+@router.get(
+    "/admin/profile",
+    response_class=PlainTextResponse,
+    responses={
+        200: {"description": "Pilhas amostradas no formato collapsed stacks", "content": {"text/plain": {}}},
+        403: {"description": "Acesso restrito a administradores", "model": ErrorResponse},
+        409: {"description": "Já existe um profile em execução neste worker", "model": ErrorResponse},
+    },
+    summary="Profile por amostragem do worker",
+    description="Amostra as pilhas de todas as threads do worker por alguns segundos e retorna collapsed stacks (flamegraph)"
+)
+async def profile_worker_route(
+    seconds: float = Query(5.0, gt=0, le=PROFILING_MAX_SECONDS, description="Duração do profile em segundos"),
+    interval_ms: float = Query(PROFILING_INTERVAL_MS, ge=1, le=1000, description="Intervalo entre amostras em milissegundos"),
+    include_idle: bool = Query(False, description="Mantém pilhas de threads ociosas (event loop e threadpool sem trabalho)"),
+):
+    """
+    Executa um profile por amostragem do worker que atende a requisição.
+
+    Durante `seconds` segundos, uma thread de fundo lê as pilhas de todas as
+    threads do processo a cada `interval_ms` milissegundos. O event loop segue
+    atendendo as demais requisições durante o profile. Com vários workers, cada
+    chamada perfila apenas o worker que a recebeu.
+
+    A resposta é texto no formato collapsed stacks (`thread;raiz;...;folha contagem`),
+    que pode ser aberto no speedscope ou convertido com flamegraph.pl:
+
+        curl -H "Authorization: Bearer $TOKEN" ".../api/v1/admin/profile?seconds=10" > worker.folded
+        flamegraph.pl worker.folded > worker.svg
+
+    Args:
+        seconds (float): Duração do profile (até PROFILING_MAX_SECONDS)
+        interval_ms (float): Intervalo entre amostras (padrão PROFILING_INTERVAL_MS)
+        include_idle (bool): Mantém pilhas de threads ociosas
+
+    Returns:
+        PlainTextResponse: Pilhas amostradas, com os headers `X-Profile-Samples`
+                           (leituras das pilhas) e `X-Profile-Duration-ms`
+
+    Raises:
+        HTTPException 401: Se o token de autenticação for inválido
+        HTTPException 403: Se o usuário não for administrador
+        HTTPException 409: Se já houver um profile em execução neste worker
+    """
+    sampler = await profile_worker(seconds, interval_ms, include_idle)
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={
+            "X-Profile-Samples": str(sampler.ticks),
+            "X-Profile-Duration-ms": str(round(sampler.duration * 1000, 2)),
+        },
+    )
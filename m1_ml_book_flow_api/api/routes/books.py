@@ -3,17 +3,29 @@ Módulo de rotas para endpoints de livros.
 
 Este módulo define as rotas da API relacionadas ao gerenciamento de livros,
 incluindo listagem, busca, filtros por preço e obtenção de detalhes.
+
+As rotas de listagem recebem do repositório dicionários já no formato do modelo
+`Book` e os serializam diretamente com orjson (`ORJSONResponse`), sem construir
+nem revalidar um modelo Pydantic por livro; o `response_model` continua
+documentando o formato da resposta no OpenAPI.
+
+Com `Accept: application/x-ndjson`, as rotas de listagem enviam um livro por
+linha, lido do banco com um cursor do lado do servidor (memória limitada por
+requisição, independentemente do tamanho do resultado).
 """
 # api/routes/books.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from m1_ml_book_flow_api.core.timing import TimedORJSONResponse
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from ..services.books_service import (
     list_all_books,
     search_all_books,
     get_book_details,
-    search_books_with_price
+    search_books_with_price,
+    stream_all_books
 )
+from ..utils.ndjson import wants_ndjson, ndjson_response
 from m1_ml_book_flow_api.api.models.Book import Book
 from m1_ml_book_flow_api.api.models.BookDetails import BookDetails
 from m1_ml_book_flow_api.core.security.security import get_current_user
@@ -36,14 +48,16 @@ router = APIRouter(
     summary="Listar todos os livros",
     description="Retorna uma lista de livros cadastrados."
 )
-def list_books(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def list_books(request: Request, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     """
     Lista todos os livros cadastrados no sistema.
 
     Este endpoint retorna uma lista completa de todos os livros disponíveis,
-    sem filtros ou paginação.
+    sem filtros ou paginação. Com `Accept: application/x-ndjson`, a lista é
+    enviada em streaming, um livro por linha.
 
     Args:
+        request (Request): Requisição HTTP (usada para negociar o formato da resposta)
         current_user (dict): Usuário autenticado (obtido via token JWT)
 
     Returns:
@@ -54,7 +68,10 @@ def list_books(current_user: dict = Depends(get_current_user), db: Session = Dep
         HTTPException 404: Se não houver livros cadastrados
         HTTPException 500: Se ocorrer erro interno do servidor
     """
-    return list_all_books(db)
+    if wants_ndjson(request):
+        return ndjson_response(stream_all_books())
+    # Linhas já no formato de `Book`: serializa direto, sem revalidar contra o response_model
+    return TimedORJSONResponse(list_all_books(db))
 
 
 # GET /api/v1/books/search
@@ -69,6 +86,7 @@ def list_books(current_user: dict = Depends(get_current_user), db: Session = Dep
     description="Busca livros com base no título e/ou categoria."
 )
 def search_books_route(
+    request: Request,
     title: Optional[str] = None,
     category: Optional[str] = None,
     current_user: dict = Depends(get_current_user),
@@ -79,8 +97,10 @@ def search_books_route(
 
     Permite filtrar livros usando critérios de busca parcial (case-insensitive).
     Pode buscar apenas por título, apenas por categoria, ou por ambos simultaneamente.
+    Com `Accept: application/x-ndjson`, o resultado é enviado em streaming, um livro por linha.
 
     Args:
+        request (Request): Requisição HTTP (usada para negociar o formato da resposta)
         title (Optional[str]): Título ou parte do título para filtrar. Se None, não filtra por título.
         category (Optional[str]): Categoria ou parte da categoria para filtrar. Se None, não filtra por categoria.
         current_user (dict): Usuário autenticado (obtido via token JWT)
@@ -94,7 +114,9 @@ def search_books_route(
         HTTPException 404: Se nenhum livro corresponder aos critérios de busca
         HTTPException 500: Se ocorrer erro interno do servidor
     """
-    return search_all_books(title, category, db)
+    if wants_ndjson(request):
+        return ndjson_response(stream_all_books(title=title, category=category))
+    return TimedORJSONResponse(search_all_books(title, category, db))
 
 # GET /api/v1/books/price-range
 @router.get(
@@ -108,6 +130,7 @@ def search_books_route(
     description="Busca livros dentro de uma faixa de preço especificada."
 )
 def search_books_by_price_range(
+    request: Request,
     min: Optional[float] = None,
     max: Optional[float] = None,
     current_user: dict = Depends(get_current_user),
@@ -119,8 +142,10 @@ def search_books_by_price_range(
     Retorna todos os livros cujo preço está entre min (inclusivo) e max (inclusivo).
     Se max for None, retorna todos os livros com preço maior ou igual a min.
     Se min for None, retorna todos os livros com preço menor ou igual a max.
+    Com `Accept: application/x-ndjson`, o resultado é enviado em streaming, um livro por linha.
 
     Args:
+        request (Request): Requisição HTTP (usada para negociar o formato da resposta)
         min (Optional[float]): Preço mínimo (inclusivo). Se None, não há limite inferior.
         max (Optional[float]): Preço máximo (inclusivo). Se None, não há limite superior.
         current_user (dict): Usuário autenticado (obtido via token JWT)
@@ -134,7 +159,9 @@ def search_books_by_price_range(
         HTTPException 404: Se nenhum livro corresponder à faixa de preço especificada
         HTTPException 500: Se ocorrer erro interno do servidor
     """
-    return search_books_with_price(min, max, db)
+    if wants_ndjson(request):
+        return ndjson_response(stream_all_books(min_price=min, max_price=max))
+    return TimedORJSONResponse(search_books_with_price(min, max, db))
 
 
 # GET /api/v1/books/{book_id}
@@ -0,0 +1,29 @@
+"""
+Módulo de rotas para o endpoint de métricas Prometheus.
+
+Este módulo define a rota `/metrics` coletada pelo Prometheus, com as métricas
+HTTP do prometheus-fastapi-instrumentator e as métricas de domínio de
+`core.metrics`, agregadas entre os workers em modo multiprocesso.
+"""
+from fastapi import APIRouter
+from m1_ml_book_flow_api.core.metrics import metrics_response
+
+# Router sem dependência de autenticação (coletado pelo Prometheus)
+router = APIRouter()
+
+@router.get(
+    "/metrics",
+    include_in_schema=False,
+    summary="Métricas Prometheus"
+)
+def metrics():
+    """
+    Expõe as métricas da aplicação no formato de texto do Prometheus.
+
+    Com PROMETHEUS_MULTIPROC_DIR definido, a resposta agrega todos os workers
+    do uvicorn (e não apenas o worker que atendeu o scrape).
+
+    Returns:
+        Response: Métricas no formato de exposição do Prometheus
+    """
+    return metrics_response()
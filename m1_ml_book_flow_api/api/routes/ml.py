@@ -4,19 +4,28 @@ Módulo de rotas para endpoints de Machine Learning.
 Este módulo define as rotas da API relacionadas ao Machine Learning,
 incluindo features, dados de treinamento e predições.
 """
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Optional
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from m1_ml_book_flow_api.core.timing import TimedORJSONResponse
+from typing import Dict, List, Optional
 from ..services.ml_service import (
-    get_ml_features,
-    get_ml_training_data,
-    process_ml_predictions
+    get_ml_features_payload,
+    get_ml_training_data_payload,
+    stream_ml_training_records,
+    get_ml_training_stats,
+    process_ml_predictions_async,
+    process_ml_batch_predictions,
+    get_ml_models,
+    reload_ml_models,
+    get_similar_books
 )
 from ..models.MLFeatures import MLFeaturesResponse
-from ..models.MLTrainingData import MLTrainingDataResponse
-from ..models.MLPredictions import MLPredictionsResponse, PredictionRequest
+from ..models.MLTrainingData import MLTrainingDataResponse, MLTrainingStatsResponse
+from ..models.MLPredictions import MLPredictionsResponse, PredictionRequest, BatchPredictionRequest, SimilarBooksResponse
 from m1_ml_book_flow_api.core.security.security import get_current_user
 from m1_ml_book_flow_api.core.errors import ErrorResponse
 from m1_ml_book_flow_api.core.logger import Logger
+from ..utils.ndjson import wants_ndjson, ndjson_response
 
 # Router com dependência de autenticação em todas as rotas
 router = APIRouter(
@@ -61,19 +70,22 @@ def get_features_route(current_user: dict = Depends(get_current_user)):
         HTTPException: Se ocorrer erro no processamento
     """
     try:
-        Logger.info("Requisição de features ML recebida", 
-                   extra={"event": "ml_features_request", "user_id": current_user.get("user_id")})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug("Requisição de features ML recebida", 
+                       extra={"event": "ml_features_request", "user_id": current_user.get("user_id")})
         
-        result = get_ml_features()
+        result = get_ml_features_payload()
         
-        if result.total_records == 0:
+        if result["total_records"] == 0:
             Logger.warning("Nenhuma feature encontrada")
             raise HTTPException(status_code=404, detail="Nenhuma feature encontrada")
         
-        Logger.info(f"Features ML retornadas: {result.total_records} registros", 
-                   extra={"event": "ml_features_response", "total_records": result.total_records})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Features ML retornadas: {result['total_records']} registros", 
+                       extra={"event": "ml_features_response", "total_records": result["total_records"]})
         
-        return result
+        # Payload já no formato do response_model: serializa direto com orjson
+        return TimedORJSONResponse(result)
         
     except HTTPException:
         raise
@@ -93,7 +105,7 @@ def get_features_route(current_user: dict = Depends(get_current_user)):
     summary="Obter dados de treinamento para ML",
     description="Retorna dataset formatado para treinamento de modelos de Machine Learning."
 )
-def get_training_data_route(current_user: dict = Depends(get_current_user)):
+def get_training_data_route(request: Request, current_user: dict = Depends(get_current_user)):
     """
     Obtém dados de treinamento para Machine Learning.
     
@@ -110,7 +122,12 @@ def get_training_data_route(current_user: dict = Depends(get_current_user)):
     - Sugestões de divisão train/test/validation
     - Mapeamentos e normalizações aplicadas
     
+    Com `Accept: application/x-ndjson`, apenas os registros de treinamento são
+    enviados em streaming, um por linha, lidos do banco com cursor do lado do
+    servidor (as estatísticas ficam em `/ml/training-data/stats`).
+    
     Args:
+        request: Requisição HTTP (usada para negociar o formato da resposta)
         current_user: Usuário autenticado (injetado pela dependência)
         
     Returns:
@@ -120,19 +137,24 @@ def get_training_data_route(current_user: dict = Depends(get_current_user)):
         HTTPException: Se ocorrer erro no processamento
     """
     try:
-        Logger.info("Requisição de dados de treinamento ML recebida", 
-                   extra={"event": "ml_training_request", "user_id": current_user.get("user_id")})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug("Requisição de dados de treinamento ML recebida", 
+                       extra={"event": "ml_training_request", "user_id": current_user.get("user_id")})
         
-        result = get_ml_training_data()
+        if wants_ndjson(request):
+            return ndjson_response(stream_ml_training_records())
         
-        if result.total_records == 0:
+        result = get_ml_training_data_payload()
+        
+        if result["total_records"] == 0:
             Logger.warning("Nenhum dado de treinamento encontrado")
             raise HTTPException(status_code=404, detail="Nenhum dado de treinamento encontrado")
         
-        Logger.info(f"Dados de treinamento ML retornados: {result.total_records} registros", 
-                   extra={"event": "ml_training_response", "total_records": result.total_records})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Dados de treinamento ML retornados: {result['total_records']} registros", 
+                       extra={"event": "ml_training_response", "total_records": result["total_records"]})
         
-        return result
+        return TimedORJSONResponse(result)
         
     except HTTPException:
         raise
@@ -141,6 +163,53 @@ def get_training_data_route(current_user: dict = Depends(get_current_user)):
                     extra={"event": "ml_training_error", "error": str(e)})
         raise HTTPException(status_code=500, detail="Erro interno do servidor")
 
+# GET /api/v1/ml/training-data/stats
+@router.get(
+    "/ml/training-data/stats",
+    response_model=MLTrainingStatsResponse,
+    responses={
+        404: {"description": "Nenhum dado de treinamento encontrado", "model": ErrorResponse},
+        500: {"description": "Erro interno do servidor", "model": ErrorResponse},
+    },
+    summary="Obter estatísticas do dataset de treinamento",
+    description="Retorna apenas as estatísticas do dataset de treinamento, sem os registros."
+)
+def get_training_stats_route(current_user: dict = Depends(get_current_user)):
+    """
+    Obtém as estatísticas do dataset de treinamento para Machine Learning.
+    
+    Este endpoint retorna as mesmas estatísticas de `dataset_info` e `split_info`
+    do endpoint `/ml/training-data`, sem enviar os registros de treinamento.
+    
+    Args:
+        current_user: Usuário autenticado (injetado pela dependência)
+        
+    Returns:
+        MLTrainingStatsResponse: Estatísticas do dataset de treinamento
+        
+    Raises:
+        HTTPException: Se não houver dados ou ocorrer erro no processamento
+    """
+    try:
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug("Requisição de estatísticas do dataset ML recebida", 
+                       extra={"event": "ml_training_stats_request", "user_id": current_user.get("user_id")})
+        
+        result = get_ml_training_stats()
+        
+        if result.total_records == 0:
+            Logger.warning("Nenhum dado de treinamento encontrado")
+            raise HTTPException(status_code=404, detail="Nenhum dado de treinamento encontrado")
+        
+        return result
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        Logger.error(f"Erro ao obter estatísticas do dataset ML: {str(e)}", 
+                    extra={"event": "ml_training_stats_error", "error": str(e)})
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
 # POST /api/v1/ml/predictions
 @router.post(
     "/ml/predictions",
@@ -153,7 +222,7 @@ def get_training_data_route(current_user: dict = Depends(get_current_user)):
     summary="Realizar predições ML",
     description="Endpoint para receber e processar predições usando modelos de Machine Learning."
 )
-def make_predictions_route(
+async def make_predictions_route(
     request: PredictionRequest,
     current_user: dict = Depends(get_current_user)
 ):
@@ -166,7 +235,8 @@ def make_predictions_route(
     - `rating`: Predição de avaliação de livros
     - `price`: Predição de preço de livros
     - `category`: Classificação de categoria de livros
-    - `recommendation`: Sistema de recomendação de livros
+    - `recommendation`: Livros similares aos `book_ids` informados (livros curtidos);
+      a quantidade é definida por `prediction_params.k`
     
     **Estrutura da requisição:**
     - `model_type`: Tipo do modelo a ser usado
@@ -192,9 +262,10 @@ def make_predictions_route(
         HTTPException: Se ocorrer erro no processamento ou tipo de modelo inválido
     """
     try:
-        Logger.info(f"Requisição de predição ML recebida - Tipo: {request.model_type}", 
-                   extra={"event": "ml_prediction_request", "model_type": request.model_type, 
-                         "user_id": current_user.get("user_id")})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Requisição de predição ML recebida - Tipo: {request.model_type}", 
+                       extra={"event": "ml_prediction_request", "model_type": request.model_type, 
+                             "user_id": current_user.get("user_id")})
         
         supported_models = ["rating", "price", "category", "recommendation"]
         if request.model_type not in supported_models:
@@ -208,11 +279,13 @@ def make_predictions_route(
             Logger.warning("Features de entrada não fornecidas")
             raise HTTPException(status_code=400, detail="Features de entrada são obrigatórias")
         
-        result = process_ml_predictions(request)
+        # Predições concorrentes do mesmo tipo são agrupadas em micro-lotes
+        result = await process_ml_predictions_async(request)
         
-        Logger.info(f"Predições ML concluídas: {result.total_predictions} resultados em {result.execution_time_ms}ms", 
-                   extra={"event": "ml_prediction_response", "total_predictions": result.total_predictions, 
-                         "execution_time_ms": result.execution_time_ms})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Predições ML concluídas: {result.total_predictions} resultados em {result.execution_time_ms}ms", 
+                       extra={"event": "ml_prediction_response", "total_predictions": result.total_predictions, 
+                             "execution_time_ms": result.execution_time_ms})
         
         return result
         
@@ -225,4 +298,164 @@ def make_predictions_route(
     except Exception as e:
         Logger.error(f"Erro ao processar predições ML: {str(e)}", 
                     extra={"event": "ml_prediction_error", "error": str(e)})
-        raise HTTPException(status_code=500, detail="Erro interno do servidor")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+# POST /api/v1/ml/predictions/batch
+@router.post(
+    "/ml/predictions/batch",
+    response_model=MLPredictionsResponse,
+    responses={
+        400: {"description": "Dados de entrada inválidos", "model": ErrorResponse},
+        404: {"description": "Livros não encontrados", "model": ErrorResponse},
+        422: {"description": "Tipo de modelo não suportado ou lote inválido", "model": ErrorResponse},
+        500: {"description": "Erro interno do servidor", "model": ErrorResponse},
+    },
+    summary="Realizar predições ML em lote",
+    description="Processa várias linhas de features (ou IDs de livros) com uma única inferência vetorizada."
+)
+def make_batch_predictions_route(
+    request: BatchPredictionRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Realiza predições em lote usando modelos de Machine Learning.
+    
+    **Formatos de entrada (informe exatamente um):**
+    - `rows`: lista de dicionários de features (mesmo formato de `input_features`)
+    - `columns`: features em formato colunar, ex: `{"year": [2020, 2021], "price": [10.0, 20.0]}`
+    - `book_ids`: IDs de livros cadastrados; as features são resolvidas no servidor
+    
+    As predições são retornadas na mesma ordem da entrada. Tipos suportados:
+    `rating`, `price` e `category`.
+    
+    Args:
+        request: Dados da requisição de predição em lote
+        current_user: Usuário autenticado (injetado pela dependência)
+        
+    Returns:
+        MLPredictionsResponse: Resultados das predições, com `rows_per_second` em `metadata`
+        
+    Raises:
+        HTTPException: Se ocorrer erro no processamento ou a entrada for inválida
+    """
+    try:
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Requisição de predição ML em lote recebida - Tipo: {request.model_type}", 
+                       extra={"event": "ml_batch_prediction_request", "model_type": request.model_type, 
+                             "user_id": current_user.get("user_id")})
+        return process_ml_batch_predictions(request)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        Logger.error(f"Erro de validação em predições ML em lote: {str(e)}", 
+                    extra={"event": "ml_batch_prediction_validation_error", "error": str(e)})
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        Logger.error(f"Erro ao processar predições ML em lote: {str(e)}", 
+                    extra={"event": "ml_batch_prediction_error", "error": str(e)})
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+# GET /api/v1/ml/books/{book_id}/similar
+@router.get(
+    "/ml/books/{book_id}/similar",
+    response_model=SimilarBooksResponse,
+    responses={
+        404: {"description": "Livro não encontrado no índice de recomendação", "model": ErrorResponse},
+        500: {"description": "Erro interno do servidor", "model": ErrorResponse},
+    },
+    summary="Livros similares",
+    description="Retorna os livros mais similares a um livro, a partir do índice de vizinhos pré-calculado."
+)
+def get_similar_books_route(
+    book_id: int,
+    k: int = Query(
+        10,
+        ge=1,
+        le=100,
+        description="Quantidade de livros similares retornados"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Obtém os livros mais similares a um livro.
+    
+    A similaridade de cosseno entre os vetores dos livros (construídos a partir de
+    `/ml/features`) é pré-calculada na atualização do índice (inicialização e após
+    o scraping). A consulta apenas lê a tabela de vizinhos em memória.
+    
+    A quantidade de livros retornados é limitada ao número de vizinhos
+    pré-calculados por livro (RECOMMENDER_TOP_K).
+    
+    Args:
+        book_id: ID do livro de referência
+        k: Quantidade de livros similares
+        current_user: Usuário autenticado (injetado pela dependência)
+        
+    Returns:
+        SimilarBooksResponse: Livros similares com a similaridade de cosseno
+        
+    Raises:
+        HTTPException: Se o livro não estiver indexado ou ocorrer erro no processamento
+    """
+    try:
+        return get_similar_books(book_id, k)
+    except HTTPException:
+        raise
+    except Exception as e:
+        Logger.error(f"Erro ao obter livros similares: {str(e)}", 
+                    extra={"event": "ml_similar_books_error", "book_id": book_id, "error": str(e)})
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+
+# GET /api/v1/ml/models
+@router.get(
+    "/ml/models",
+    response_model=Dict,
+    responses={
+        500: {"description": "Erro interno do servidor", "model": ErrorResponse},
+    },
+    summary="Listar modelos ML carregados",
+    description="Retorna os modelos carregados no registro de modelos deste worker e suas versões."
+)
+def get_models_route(current_user: dict = Depends(get_current_user)):
+    """
+    Lista os modelos de Machine Learning carregados no worker.
+    
+    Args:
+        current_user: Usuário autenticado (injetado pela dependência)
+        
+    Returns:
+        Dict: Informações dos modelos ativos por tipo e diretório de artefatos
+    """
+    return get_ml_models()
+
+# POST /api/v1/ml/models/reload
+@router.post(
+    "/ml/models/reload",
+    response_model=Dict,
+    responses={
+        500: {"description": "Erro interno do servidor", "model": ErrorResponse},
+    },
+    summary="Recarregar modelos ML",
+    description="Força a recarga dos artefatos publicados, trocando as versões ativas de forma atômica."
+)
+def reload_models_route(current_user: dict = Depends(get_current_user)):
+    """
+    Recarrega os modelos de Machine Learning a partir do diretório de artefatos.
+    
+    A troca de versão é atômica: requisições em andamento terminam com a versão
+    anterior. Os demais workers detectam a nova versão na próxima verificação
+    periódica (ML_MODELS_RELOAD_INTERVAL_SECONDS).
+    
+    Args:
+        current_user: Usuário autenticado (injetado pela dependência)
+        
+    Returns:
+        Dict: Versões ativas por tipo de modelo após a recarga
+    """
+    try:
+        Logger.info("Recarga de modelos ML solicitada", 
+                   extra={"event": "ml_models_reload_request", "user_id": current_user.get("sub")})
+        return reload_ml_models()
+    except Exception as e:
+        Logger.error(f"Erro ao recarregar modelos ML: {str(e)}", 
+                    extra={"event": "ml_models_reload_error", "error": str(e)})
+        raise HTTPException(status_code=500, detail="Erro interno do servidor")
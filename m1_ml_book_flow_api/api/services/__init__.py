@@ -16,5 +16,6 @@ Módulos disponíveis:
     - top_rating_service: Lógica de negócio para livros mais bem avaliados (top rated)
     - scraping_service: Lógica de negócio para web scraping de livros (extração de dados)
     - scraping_trigger_service: Lógica de negócio para orquestração do processo de scraping
+    - profiling_service: Profile por amostragem do worker em execução (endpoint administrativo)
 """
 
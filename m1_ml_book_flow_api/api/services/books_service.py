@@ -5,22 +5,24 @@ Este módulo contém a lógica de negócio relacionada ao gerenciamento de livro
 incluindo listagem, busca, filtros e obtenção de detalhes. Funciona como
 camada intermediária entre as rotas (controllers) e os repositórios (data access).
 """
-from typing import List, Optional
+import logging
+from typing import Iterator, List, Optional
 from sqlalchemy.orm import Session
 from m1_ml_book_flow_api.core.logger import get_logger, log_error
-from ..models.Book import Book
 from ..models.BookDetails import BookDetails
 from ..repositories.books_repository import (
     list_books,
     search_books_by,
     get_book_by_id,
-    search_books_by_range_price
+    search_books_by_range_price,
+    stream_books
 )
+from ..utils.ndjson import NDJSON_BATCH_SIZE
 from fastapi import HTTPException, status
 
 books_logger = get_logger("books_service")
 
-def list_all_books(db: Session) -> List[Book]:
+def list_all_books(db: Session) -> List[dict]:
     """
     Lista todos os livros cadastrados no sistema.
 
@@ -31,13 +33,14 @@ def list_all_books(db: Session) -> List[Book]:
         db (Session): Sessão do banco de dados
 
     Returns:
-        List[Book]: Lista com todos os livros cadastrados no sistema.
+        List[dict]: Lista com todos os livros cadastrados no sistema (campos do modelo `Book`).
 
     Raises:
         HTTPException 404: Se não houver livros cadastrados
         HTTPException 500: Se ocorrer erro interno do servidor
     """
-    books_logger.info("Fetching all books", extra={"event": "list_all_books_start"})
+    if books_logger.isEnabledFor(logging.DEBUG):
+        books_logger.debug("Fetching all books", extra={"event": "list_all_books_start"})
     
     try:
         books = list_books(db)
@@ -51,14 +54,15 @@ def list_all_books(db: Session) -> List[Book]:
             )
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhum livro encontrado")
         
-        books_logger.info(
-            "Books listed successfully",
-            extra={
-                "event": "list_all_books_success",
-                "operation": "list_books",
-                "books_count": len(books)
-            }
-        )
+        if books_logger.isEnabledFor(logging.DEBUG):
+            books_logger.debug(
+                "Books listed successfully",
+                extra={
+                    "event": "list_all_books_success",
+                    "operation": "list_books",
+                    "books_count": len(books)
+                }
+            )
         return books
     except HTTPException:
         raise
@@ -76,20 +80,21 @@ def search_all_books(title: Optional[str] = None, category: Optional[str] = None
         db (Session): Sessão do banco de dados
 
     Returns:
-        List[Book]: Lista de livros que correspondem aos critérios de busca
+        List[dict]: Lista de livros (campos do modelo `Book`) que correspondem aos critérios de busca
 
     Raises:
         HTTPException 404: Se nenhum livro for encontrado
         HTTPException 500: Se ocorrer erro interno do servidor
     """
-    books_logger.info(
-        "Searching books",
-        extra={
-            "event": "search_all_books_start",
-            "title": title,
-            "category": category
-        }
-    )
+    if books_logger.isEnabledFor(logging.DEBUG):
+        books_logger.debug(
+            "Searching books",
+            extra={
+                "event": "search_all_books_start",
+                "title": title,
+                "category": category
+            }
+        )
     
     try:
         books = search_books_by(title, category, db)
@@ -104,15 +109,16 @@ def search_all_books(title: Optional[str] = None, category: Optional[str] = None
             )
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhum livro encontrado")
         
-        books_logger.info(
-            "Books search completed successfully",
-            extra={
-                "event": "search_all_books_success",
-                "title": title,
-                "category": category,
-                "books_count": len(books)
-            }
-        )
+        if books_logger.isEnabledFor(logging.DEBUG):
+            books_logger.debug(
+                "Books search completed successfully",
+                extra={
+                    "event": "search_all_books_success",
+                    "title": title,
+                    "category": category,
+                    "books_count": len(books)
+                }
+            )
         return books
     except HTTPException:
         raise
@@ -130,20 +136,21 @@ def search_books_with_price(min: Optional[float] = None, max: Optional[float] =
         db (Session): Sessão do banco de dados
 
     Returns:
-        List[Book]: Lista de livros na faixa de preço especificada
+        List[dict]: Lista de livros (campos do modelo `Book`) na faixa de preço especificada
 
     Raises:
         HTTPException 404: Se nenhum livro for encontrado na faixa de preço
         HTTPException 500: Se ocorrer erro interno do servidor
     """
-    books_logger.info(
-        "Searching books by price range",
-        extra={
-            "event": "search_books_with_price_start",
-            "min_price": min,
-            "max_price": max
-        }
-    )
+    if books_logger.isEnabledFor(logging.DEBUG):
+        books_logger.debug(
+            "Searching books by price range",
+            extra={
+                "event": "search_books_with_price_start",
+                "min_price": min,
+                "max_price": max
+            }
+        )
     
     try:
         books = search_books_by_range_price(min, max, db)
@@ -158,15 +165,16 @@ def search_books_with_price(min: Optional[float] = None, max: Optional[float] =
             )
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nenhum livro encontrado na faixa de preço especificada")
         
-        books_logger.info(
-            "Books price search completed successfully",
-            extra={
-                "event": "search_books_with_price_success",
-                "min_price": min,
-                "max_price": max,
-                "books_count": len(books)
-            }
-        )
+        if books_logger.isEnabledFor(logging.DEBUG):
+            books_logger.debug(
+                "Books price search completed successfully",
+                extra={
+                    "event": "search_books_with_price_success",
+                    "min_price": min,
+                    "max_price": max,
+                    "books_count": len(books)
+                }
+            )
         return books
     except HTTPException:
         raise
@@ -189,13 +197,14 @@ def get_book_details(book_id: int, db: Session) -> BookDetails:
         HTTPException 404: Se o livro não for encontrado
         HTTPException 500: Se ocorrer erro interno do servidor
     """
-    books_logger.info(
-        "Fetching book details",
-        extra={
-            "event": "get_book_details_start",
-            "book_id": book_id
-        }
-    )
+    if books_logger.isEnabledFor(logging.DEBUG):
+        books_logger.debug(
+            "Fetching book details",
+            extra={
+                "event": "get_book_details_start",
+                "book_id": book_id
+            }
+        )
     
     try:
         book = get_book_by_id(book_id, db)
@@ -209,16 +218,51 @@ def get_book_details(book_id: int, db: Session) -> BookDetails:
             )
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Livro não encontrado")
         
-        books_logger.info(
-            "Book details retrieved successfully",
-            extra={
-                "event": "get_book_details_success",
-                "book_id": book_id
-            }
-        )
+        if books_logger.isEnabledFor(logging.DEBUG):
+            books_logger.debug(
+                "Book details retrieved successfully",
+                extra={
+                    "event": "get_book_details_success",
+                    "book_id": book_id
+                }
+            )
         return book
     except HTTPException:
         raise
     except Exception as e:
         log_error(books_logger, e, "Error getting book details", {"book_id": book_id})
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro interno do servidor")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erro interno do servidor")
+
+def stream_all_books(
+    title: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None
+) -> Iterator[dict]:
+    """
+    Percorre os livros (com filtros opcionais) para respostas em streaming.
+
+    As linhas são lidas do banco em lotes de NDJSON_BATCH_SIZE à medida que a
+    resposta é enviada; um resultado vazio produz um stream vazio (sem 404).
+
+    Args:
+        title (Optional[str]): Título do livro para busca (busca parcial)
+        category (Optional[str]): Categoria do livro para busca (busca parcial)
+        min_price (Optional[float]): Preço mínimo (inclusivo)
+        max_price (Optional[float]): Preço máximo (inclusivo)
+
+    Returns:
+        Iterator[dict]: Livros com os campos do modelo `Book`
+    """
+    if books_logger.isEnabledFor(logging.DEBUG):
+        books_logger.debug(
+            "Streaming books",
+            extra={
+                "event": "stream_books_start",
+                "title": title,
+                "category": category,
+                "min_price": min_price,
+                "max_price": max_price
+            }
+        )
+    return stream_books(title, category, min_price, max_price, batch_size=NDJSON_BATCH_SIZE)
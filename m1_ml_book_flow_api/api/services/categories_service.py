@@ -5,6 +5,7 @@ Este módulo contém a lógica de negócio relacionada ao gerenciamento de categ
 incluindo listagem de todas as categorias disponíveis. Funciona como camada
 intermediária entre as rotas (controllers) e os repositórios (data access).
 """
+import logging
 from fastapi import HTTPException, status
 from ..repositories.categories_repository import list_categories
 from m1_ml_book_flow_api.core.logger import get_logger, log_error
@@ -26,10 +27,11 @@ def list_all_categories():
         HTTPException 404: Se não houver categorias cadastradas
         HTTPException 500: Se ocorrer erro interno do servidor
     """
-    categories_logger.info(
-        "Fetching all categories",
-        extra={"event": "list_all_categories_start"}
-    )
+    if categories_logger.isEnabledFor(logging.DEBUG):
+        categories_logger.debug(
+            "Fetching all categories",
+            extra={"event": "list_all_categories_start"}
+        )
     
     try:
         categories = list_categories()
@@ -46,14 +48,15 @@ def list_all_categories():
                 detail="Nenhuma categoria encontrada"
             )
         
-        categories_logger.info(
-            "Categories fetched successfully",
-            extra={
-                "event": "list_all_categories_success",
-                "categories_count": len(categories),
-                "operation": "list_categories"
-            }
-        )
+        if categories_logger.isEnabledFor(logging.DEBUG):
+            categories_logger.debug(
+                "Categories fetched successfully",
+                extra={
+                    "event": "list_all_categories_success",
+                    "categories_count": len(categories),
+                    "operation": "list_categories"
+                }
+            )
         return categories
     except HTTPException:
         raise
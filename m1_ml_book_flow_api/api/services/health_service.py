@@ -5,6 +5,7 @@ Este módulo contém a lógica de negócio relacionada à verificação de saúd
 disponibilidade da aplicação, incluindo verificação de conectividade com os dados.
 Funciona como camada intermediária entre as rotas (controllers) e os repositórios (data access).
 """
+import logging
 from fastapi import HTTPException, status
 from ..repositories.health_repository import get_books_count
 from m1_ml_book_flow_api.core.logger import get_logger, log_error
@@ -28,10 +29,11 @@ def check_api_health():
         HTTPException 404: Se não houver dados disponíveis
         HTTPException 500: Se ocorrer erro interno do servidor ou ao acessar os dados
     """
-    health_logger.info(
-        "Checking API health",
-        extra={"event": "health_check_start"}
-    )
+    if health_logger.isEnabledFor(logging.DEBUG):
+        health_logger.debug(
+            "Checking API health",
+            extra={"event": "health_check_start"}
+        )
     
     try:
         total_books = get_books_count()
@@ -49,15 +51,16 @@ def check_api_health():
                 detail="Nenhum dado encontrado"
             )
         
-        health_logger.info(
-            "Health check successful",
-            extra={
-                "event": "health_check_success",
-                "total_books": total_books,
-                "status": "ok",
-                "operation": "get_books_count"
-            }
-        )
+        if health_logger.isEnabledFor(logging.DEBUG):
+            health_logger.debug(
+                "Health check successful",
+                extra={
+                    "event": "health_check_success",
+                    "total_books": total_books,
+                    "status": "ok",
+                    "operation": "get_books_count"
+                }
+            )
         
         return {
             "status": "ok",
@@ -4,26 +4,143 @@ Serviço de Machine Learning para processamento de dados e predições.
 Este módulo contém a lógica de negócio para os endpoints de ML,
 incluindo processamento de features, dados de treinamento e predições.
 """
+import logging
+import asyncio
+import hashlib
+import json
+import os
 import time
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional, Sequence, Set, Tuple
+import numpy as np
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from ..models.Book import Book
 from ..models.MLFeatures import MLFeaturesResponse, BookFeature
-from ..models.MLTrainingData import MLTrainingDataResponse, TrainingRecord
-from ..models.MLPredictions import MLPredictionsResponse, PredictionResult, PredictionRequest
-from ..repositories.books_repository import list_books
+from ..models.MLTrainingData import MLTrainingDataResponse, MLTrainingStatsResponse, TrainingRecord
+from ..models.MLPredictions import MLPredictionsResponse, PredictionResult, PredictionRequest, BatchPredictionRequest, SimilarBooksResponse
+from ..repositories.books_repository import get_books_by_ids, stream_books
+from ..repositories.catalog_repository import list_books
+from ..utils.running_stats import RunningStats
+from ..utils.ndjson import NDJSON_BATCH_SIZE
+from m1_ml_book_flow_api.core.cache import TTLCache
+from m1_ml_book_flow_api.core.catalog_version import catalog_cached, catalog_version_watcher
+from m1_ml_book_flow_api.api.utils.singleflight import single_flight
 from m1_ml_book_flow_api.core.logger import Logger
+from m1_ml_book_flow_api.core.timing import span
+from m1_ml_book_flow_api.core.metrics import (
+    ML_MICROBATCH_QUEUE_DEPTH,
+    ML_MICROBATCH_BATCH_SIZE,
+    ML_PREDICTION_CACHE_REQUESTS,
+    ML_FEATURE_BUILD_DURATION,
+    ML_PREDICTION_DURATION
+)
+from m1_ml_book_flow_api.ml.featurizer import numeric_column, rows_to_columns
+from m1_ml_book_flow_api.ml.registry import model_registry
+from m1_ml_book_flow_api.ml.recommender import similarity_index
 
+# Versão reportada quando a predição é feita pelas heurísticas de fallback
+HEURISTIC_MODEL_VERSION = "heuristic-1.0.0"
+# Quantidade máxima de linhas aceitas em uma predição em lote
+ML_BATCH_MAX_ROWS = int(os.getenv("ML_BATCH_MAX_ROWS", "100000"))
+# Micro-batching das predições online (janela de espera e tamanho máximo do lote)
+ML_MICROBATCH_ENABLED = os.getenv("ML_MICROBATCH_ENABLED", "true").lower() == "true"
+ML_MICROBATCH_WINDOW_MS = float(os.getenv("ML_MICROBATCH_WINDOW_MS", "2"))
+ML_MICROBATCH_MAX_SIZE = int(os.getenv("ML_MICROBATCH_MAX_SIZE", "64"))
+# Cache de predições online (0 desativa o cache)
+ML_PREDICTION_CACHE_SIZE = int(os.getenv("ML_PREDICTION_CACHE_SIZE", "10000"))
+ML_PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("ML_PREDICTION_CACHE_TTL_SECONDS", "300"))
+# Quantidade padrão de recomendações retornadas
+RECOMMENDATIONS_DEFAULT_K = int(os.getenv("RECOMMENDATIONS_DEFAULT_K", "5"))
+
+# Colunas do dataset de treinamento
+FEATURE_COLUMNS = ["title_length", "author", "year", "category", "price", "available"]
+TARGET_COLUMNS = ["target_rating", "target_price", "target_category", "target_popularity"]
+
+class _DatasetStatsAccumulator:
+    """
+    Acumula as estatísticas do dataset de treinamento em uma única passagem.
+
+    Substitui as várias iterações sobre os registros (listas de ratings e preços,
+    conjunto de categorias e contagem de disponíveis) por atualizações online.
+    """
+    def __init__(self):
+        self.ratings = RunningStats()
+        self.prices = RunningStats()
+        self.categories = set()
+        self.available_count = 0
+
+    def add(self, rating: float, price: float, category: str, available: bool) -> None:
+        self.ratings.add(rating)
+        self.prices.add(price)
+        self.categories.add(category)
+        if available:
+            self.available_count += 1
+
+    def to_dataset_info(self) -> Dict[str, Any]:
+        total = self.ratings.count
+        rating_stats = self.ratings.to_dict()
+        price_stats = self.prices.to_dict()
+        return {
+            "total_records": total,
+            "rating_stats": {key: rating_stats[key] for key in ("min", "max", "avg", "std")},
+            "price_stats": {key: price_stats[key] for key in ("min", "max", "avg", "std")},
+            "categories": list(self.categories),
+            "availability_ratio": self.available_count / total if total else 0
+        }
+
+def _book_feature_row(book) -> Dict[str, Any]:
+    """Monta as features de treinamento/predição de um livro."""
+    return {
+        "title_length": len(book.title) if book.title else 0,
+        "author": book.author or "unknown",
+        "year": book.year or 2000,
+        "category": book.category or "unknown",
+        "price": book.price or 0.0,
+        "available": book.available
+    }
+
+def _training_record_fields(book) -> Dict[str, Any]:
+    """Monta os campos do `TrainingRecord` de um livro (features e targets)."""
+    # Calcular popularidade baseada em rating e disponibilidade
+    popularity = (book.rating * 0.8) + (1.0 if book.available else 0.0) * 0.2
+    return {
+        "id": book.id,
+        "features": _book_feature_row(book),
+        "target_rating": book.rating or 0.0,
+        "target_price": book.price or 0.0,
+        "target_category": book.category or "unknown",
+        "target_popularity": round(popularity, 4)
+    }
+
+def _build_split_info(total_records: int) -> Dict[str, Any]:
+    """Monta as sugestões de divisão train/test/validation do dataset."""
+    return {
+        "suggested_train_ratio": 0.7,
+        "suggested_test_ratio": 0.2,
+        "suggested_validation_ratio": 0.1,
+        "total_for_train": int(total_records * 0.7),
+        "total_for_test": int(total_records * 0.2),
+        "total_for_validation": int(total_records * 0.1)
+    }
+
+@catalog_cached()
+@single_flight("ml_features")
+@ML_FEATURE_BUILD_DURATION.labels(dataset="features").time()
 def get_ml_features() -> MLFeaturesResponse:
     """
     Obtém dados formatados como features para modelos ML.
     
     Processa os dados dos livros e os transforma em features numéricas
-    adequadas para algoritmos de machine learning.
+    adequadas para algoritmos de machine learning. O resultado fica em cache
+    por versão do catálogo e chamadas concorrentes sem cache compartilham um
+    único cálculo (single-flight).
     
     Returns:
         MLFeaturesResponse: Features processadas dos livros
     """
     try:
-        Logger.info("Iniciando processamento de features ML", extra={"event": "ml_features_start"})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug("Iniciando processamento de features ML", extra={"event": "ml_features_start"})
         
         # Buscar todos os livros do banco
         books = list_books()
@@ -92,8 +209,9 @@ def get_ml_features() -> MLFeaturesResponse:
             "total_categories": len(categories)
         }
         
-        Logger.info(f"Features ML processadas com sucesso: {len(features)} registros", 
-                   extra={"event": "ml_features_success", "total_records": len(features)})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Features ML processadas com sucesso: {len(features)} registros", 
+                       extra={"event": "ml_features_success", "total_records": len(features)})
         
         return MLFeaturesResponse(
             features=features,
@@ -106,6 +224,21 @@ def get_ml_features() -> MLFeaturesResponse:
                     extra={"event": "ml_features_error", "error": str(e)})
         raise
 
+@catalog_cached()
+def get_ml_features_payload() -> Dict[str, Any]:
+    """
+    Features para ML já convertidas em dicionários e listas (tipos JSON).
+    
+    A conversão é feita uma vez por versão do catálogo; a rota serializa o
+    resultado diretamente com orjson, sem revalidar o `MLFeaturesResponse`.
+    
+    Returns:
+        Dict[str, Any]: `MLFeaturesResponse` como dicionário
+    """
+    return get_ml_features().model_dump()
+
+@catalog_cached()
+@ML_FEATURE_BUILD_DURATION.labels(dataset="training_data").time()
 def get_ml_training_data() -> MLTrainingDataResponse:
     """
     Obtém dataset formatado para treinamento de modelos ML.
@@ -117,7 +250,8 @@ def get_ml_training_data() -> MLTrainingDataResponse:
         MLTrainingDataResponse: Dataset de treinamento estruturado
     """
     try:
-        Logger.info("Iniciando preparação de dados de treinamento ML", extra={"event": "ml_training_start"})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug("Iniciando preparação de dados de treinamento ML", extra={"event": "ml_training_start"})
         
         # Buscar todos os livros do banco
         books = list_books()
@@ -133,74 +267,27 @@ def get_ml_training_data() -> MLTrainingDataResponse:
                 split_info={}
             )
         
-        # Preparar dados de treinamento
+        # Preparar dados de treinamento e estatísticas em uma única passagem
         training_records = []
+        stats = _DatasetStatsAccumulator()
         
         for book in books:
-            features = {
-                "title_length": len(book.title) if book.title else 0,
-                "author": book.author or "unknown",
-                "year": book.year or 2000,
-                "category": book.category or "unknown",
-                "price": book.price or 0.0,
-                "available": book.available
-            }
-            
-            # Calcular popularidade baseada em rating e disponibilidade
-            popularity = (book.rating * 0.8) + (1.0 if book.available else 0.0) * 0.2
-            
-            record = TrainingRecord(
-                id=book.id,
-                features=features,
-                target_rating=book.rating or 0.0,
-                target_price=book.price or 0.0,
-                target_category=book.category or "unknown",
-                target_popularity=round(popularity, 4)
-            )
+            record = TrainingRecord(**_training_record_fields(book))
             training_records.append(record)
+            stats.add(record.target_rating, record.target_price, record.target_category, book.available)
         
-        # Informações do dataset
-        feature_columns = ["title_length", "author", "year", "category", "price", "available"]
-        target_columns = ["target_rating", "target_price", "target_category", "target_popularity"]
-        
-        # Estatísticas básicas
-        ratings = [r.target_rating for r in training_records]
-        prices = [r.target_price for r in training_records]
-        
-        dataset_info = {
-            "total_records": len(training_records),
-            "rating_stats": {
-                "min": min(ratings) if ratings else 0,
-                "max": max(ratings) if ratings else 0,
-                "avg": sum(ratings) / len(ratings) if ratings else 0
-            },
-            "price_stats": {
-                "min": min(prices) if prices else 0,
-                "max": max(prices) if prices else 0,
-                "avg": sum(prices) / len(prices) if prices else 0
-            },
-            "categories": list(set([r.target_category for r in training_records])),
-            "availability_ratio": sum([1 for r in training_records if r.features["available"]]) / len(training_records)
-        }
-        
-        # Informações de divisão (sugestão para train/test/validation)
-        split_info = {
-            "suggested_train_ratio": 0.7,
-            "suggested_test_ratio": 0.2,
-            "suggested_validation_ratio": 0.1,
-            "total_for_train": int(len(training_records) * 0.7),
-            "total_for_test": int(len(training_records) * 0.2),
-            "total_for_validation": int(len(training_records) * 0.1)
-        }
+        dataset_info = stats.to_dataset_info()
+        split_info = _build_split_info(len(training_records))
         
-        Logger.info(f"Dados de treinamento ML preparados: {len(training_records)} registros", 
-                   extra={"event": "ml_training_success", "total_records": len(training_records)})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Dados de treinamento ML preparados: {len(training_records)} registros", 
+                       extra={"event": "ml_training_success", "total_records": len(training_records)})
         
         return MLTrainingDataResponse(
             training_data=training_records,
             total_records=len(training_records),
-            feature_columns=feature_columns,
-            target_columns=target_columns,
+            feature_columns=FEATURE_COLUMNS,
+            target_columns=TARGET_COLUMNS,
             dataset_info=dataset_info,
             split_info=split_info
         )
@@ -210,12 +297,84 @@ def get_ml_training_data() -> MLTrainingDataResponse:
                     extra={"event": "ml_training_error", "error": str(e)})
         raise
 
+@catalog_cached()
+def get_ml_training_data_payload() -> Dict[str, Any]:
+    """
+    Dataset de treinamento já convertido em dicionários e listas (tipos JSON).
+    
+    A conversão é feita uma vez por versão do catálogo; a rota serializa o
+    resultado diretamente com orjson, sem revalidar o `MLTrainingDataResponse`.
+    
+    Returns:
+        Dict[str, Any]: `MLTrainingDataResponse` como dicionário
+    """
+    return get_ml_training_data().model_dump()
+
+def stream_ml_training_records() -> Iterator[Dict[str, Any]]:
+    """
+    Percorre os registros de treinamento para respostas em streaming (NDJSON).
+    
+    Os livros são lidos do banco com um cursor do lado do servidor em lotes de
+    NDJSON_BATCH_SIZE; cada registro tem os campos de `TrainingRecord`. As
+    estatísticas do dataset ficam em `/ml/training-data/stats`.
+    
+    Yields:
+        Dict[str, Any]: Registro de treinamento
+    """
+    if Logger.isEnabledFor(logging.DEBUG):
+        Logger.debug("Iniciando streaming de dados de treinamento ML", extra={"event": "ml_training_stream_start"})
+    for row in stream_books(batch_size=NDJSON_BATCH_SIZE):
+        # Linha já normalizada pelo repositório: dispensa a validação do modelo
+        yield _training_record_fields(Book.model_construct(**row))
+
+@catalog_cached()
+@ML_FEATURE_BUILD_DURATION.labels(dataset="training_stats").time()
+def get_ml_training_stats() -> MLTrainingStatsResponse:
+    """
+    Obtém apenas as estatísticas do dataset de treinamento.
+    
+    Percorre os livros uma única vez acumulando as estatísticas (contagem, mínimo,
+    máximo, média e desvio padrão) sem construir os registros de treinamento.
+    
+    Returns:
+        MLTrainingStatsResponse: Estatísticas e sugestões de divisão do dataset
+    """
+    try:
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug("Iniciando cálculo de estatísticas do dataset ML", extra={"event": "ml_training_stats_start"})
+        
+        stats = _DatasetStatsAccumulator()
+        for book in list_books():
+            stats.add(book.rating or 0.0, book.price or 0.0, book.category or "unknown", book.available)
+        
+        total_records = stats.ratings.count
+        
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Estatísticas do dataset ML calculadas: {total_records} registros", 
+                       extra={"event": "ml_training_stats_success", "total_records": total_records})
+        
+        return MLTrainingStatsResponse(
+            total_records=total_records,
+            dataset_info=stats.to_dataset_info() if total_records else {},
+            split_info=_build_split_info(total_records) if total_records else {}
+        )
+        
+    except Exception as e:
+        Logger.error(f"Erro ao calcular estatísticas do dataset ML: {str(e)}", 
+                    extra={"event": "ml_training_stats_error", "error": str(e)})
+        raise
+
 def process_ml_predictions(request: PredictionRequest) -> MLPredictionsResponse:
     """
     Processa predições usando modelos ML.
     
-    Simula predições baseadas no tipo de modelo solicitado.
-    Em uma implementação real, aqui seria carregado o modelo treinado.
+    Para os tipos rating, price e category usa o modelo ativo no registro de
+    modelos (carregado uma vez por worker a partir dos artefatos treinados).
+    Se nenhum artefato tiver sido publicado para o tipo, usa as heurísticas
+    de fallback.
+    
+    Requisições idênticas para a mesma versão do modelo são respondidas a partir
+    do cache de predições.
     
     Args:
         request: Dados da requisição de predição
@@ -225,133 +384,607 @@ def process_ml_predictions(request: PredictionRequest) -> MLPredictionsResponse:
     """
     try:
         start_time = time.time()
-        Logger.info(f"Iniciando predições ML - Tipo: {request.model_type}", 
-                   extra={"event": "ml_prediction_start", "model_type": request.model_type})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Iniciando predições ML - Tipo: {request.model_type}", 
+                       extra={"event": "ml_prediction_start", "model_type": request.model_type})
+        
+        cache_key, cached = _lookup_prediction_cache(request)
+        if cached is not None:
+            return _build_predictions_response(request, *cached, start_time, _cache_metadata(request, "hit"))
         
         predictions = []
         
-        # Simular predições baseadas no tipo de modelo
-        if request.model_type == "rating":
-            # Predição de rating baseada nas features
-            predicted_rating = _predict_rating(request.input_features)
-            predictions.append(PredictionResult(
-                book_id=request.input_features.get("book_id", 0),
-                prediction_value=predicted_rating,
-                confidence_score=0.85,
-                prediction_type="rating"
-            ))
-            
-        elif request.model_type == "price":
-            # Predição de preço
-            predicted_price = _predict_price(request.input_features)
+        if request.model_type in _HEURISTIC_MODELS:
+            columns = rows_to_columns([request.input_features], FEATURE_COLUMNS)
+            values, confidences, model_info = _run_inference(request.model_type, columns, 1)
             predictions.append(PredictionResult(
                 book_id=request.input_features.get("book_id", 0),
-                prediction_value=predicted_price,
-                confidence_score=0.78,
-                prediction_type="price"
-            ))
-            
-        elif request.model_type == "category":
-            # Classificação de categoria
-            predicted_category = _predict_category(request.input_features)
-            predictions.append(PredictionResult(
-                book_id=request.input_features.get("book_id", 0),
-                prediction_value=predicted_category,
-                confidence_score=0.92,
-                prediction_type="category"
+                prediction_value=values[0],
+                confidence_score=confidences[0],
+                prediction_type=request.model_type
             ))
             
         elif request.model_type == "recommendation":
             # Sistema de recomendação
-            recommendations = _get_recommendations(request.input_features, request.book_ids or [])
+            recommendations, model_info = _get_recommendations(
+                request.input_features, request.book_ids or [], request.prediction_params or {}
+            )
             predictions.extend(recommendations)
         
         else:
             raise ValueError(f"Tipo de modelo não suportado: {request.model_type}")
         
-        execution_time = (time.time() - start_time) * 1000  # em milissegundos
+        _store_prediction_cache(cache_key, predictions, model_info)
+        return _build_predictions_response(request, predictions, model_info, start_time, _cache_metadata(request, "miss"))
         
-        model_info = {
-            "model_type": request.model_type,
-            "model_version": "1.0.0",
-            "last_trained": "2024-01-15",
-            "algorithm": "Random Forest" if request.model_type in ["rating", "price"] else "Neural Network"
-        }
+    except Exception as e:
+        Logger.error(f"Erro ao processar predições ML: {str(e)}", 
+                    extra={"event": "ml_prediction_error", "error": str(e)})
+        raise
+
+def _active_model_version(model_type: str) -> str:
+    """Versão do modelo que responderá a uma predição do tipo informado."""
+    if model_type == "recommendation":
+        index = similarity_index.get()
+        return index.version if index is not None else ""
+    model = model_registry.get(model_type)
+    return model.version if model is not None else HEURISTIC_MODEL_VERSION
+
+def _prediction_cache_key(request: PredictionRequest) -> Tuple[str, str, str]:
+    """
+    Monta a chave do cache: (model_type, versão do modelo, hash canônico da entrada).
+    
+    O hash é calculado sobre o JSON canônico (chaves ordenadas, sem espaços) de
+    `input_features`, `book_ids` e `prediction_params`.
+    """
+    payload = json.dumps(
+        {"input_features": request.input_features, "book_ids": request.book_ids,
+         "prediction_params": request.prediction_params},
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return request.model_type, _active_model_version(request.model_type), digest
+
+def _lookup_prediction_cache(
+    request: PredictionRequest
+) -> Tuple[Optional[Tuple[str, str, str]], Optional[Tuple[List[PredictionResult], Dict[str, Any]]]]:
+    """
+    Procura a resposta de uma predição no cache.
+    
+    Invalida o cache inteiro quando a geração do registro de modelos ou a versão
+    do índice de recomendação mudam.
+    
+    Returns:
+        Tuple: Chave do cache (None se desativado) e entrada (predições, model_info) ou None
+    """
+    if not prediction_cache.enabled:
+        return None, None
+    index = similarity_index.get()
+    prediction_cache.ensure_version((model_registry.generation, index.version if index is not None else ""))
+    key = _prediction_cache_key(request)
+    cached = prediction_cache.get(key)
+    ML_PREDICTION_CACHE_REQUESTS.labels(
+        model_type=request.model_type, result="hit" if cached is not None else "miss"
+    ).inc()
+    return key, cached
+
+def _store_prediction_cache(
+    key: Optional[Tuple[str, str, str]],
+    predictions: List[PredictionResult],
+    model_info: Dict[str, Any]
+) -> None:
+    """Armazena a resposta no cache se a versão usada for a mesma da chave."""
+    if key is None or model_info.get("model_version") != key[1]:
+        # O modelo foi trocado durante a predição: não associa o resultado à versão antiga
+        return
+    prediction_cache.set(key, (predictions, model_info))
+
+def _cache_metadata(request: PredictionRequest, result: str) -> Dict[str, Any]:
+    """Metadados do cache de predições incluídos na resposta."""
+    if not prediction_cache.enabled:
+        return {"cache": "disabled"}
+    return {"cache": result, "cache_hits": prediction_cache.hits, "cache_misses": prediction_cache.misses}
+
+def _build_predictions_response(
+    request: PredictionRequest,
+    predictions: List[PredictionResult],
+    model_info: Dict[str, Any],
+    start_time: float,
+    extra_metadata: Optional[Dict[str, Any]] = None
+) -> MLPredictionsResponse:
+    """Monta a resposta de `/ml/predictions` e registra o log de conclusão."""
+    execution_time = (time.time() - start_time) * 1000  # em milissegundos
+    ML_PREDICTION_DURATION.labels(model_type=request.model_type, mode="online").observe(execution_time / 1000)
+    
+    metadata = {
+        "request_timestamp": time.time(),
+        "input_features_count": len(request.input_features),
+        "processing_status": "success",
+        **(extra_metadata or {})
+    }
+    
+    if Logger.isEnabledFor(logging.DEBUG):
+        Logger.debug(f"Predições ML concluídas: {len(predictions)} resultados em {execution_time:.2f}ms", 
+                   extra={"event": "ml_prediction_success", "total_predictions": len(predictions), 
+                         "execution_time_ms": execution_time})
+    
+    return MLPredictionsResponse(
+        predictions=predictions,
+        model_info=model_info,
+        execution_time_ms=round(execution_time, 2),
+        total_predictions=len(predictions),
+        metadata=metadata
+    )
+
+class MicroBatcher:
+    """
+    Agrupador assíncrono de predições online (micro-batching).
+    
+    Requisições concorrentes para o mesmo `model_type` são acumuladas por até
+    `window_ms` milissegundos (ou até `max_batch_size` itens) e executadas em uma
+    única inferência vetorizada, fora do event loop. Cada requisição recebe de
+    volta apenas o seu resultado.
+    
+    Attributes:
+        window_ms (float): Janela máxima de espera para formar um lote
+        max_batch_size (int): Tamanho máximo do lote (dispara a execução imediata)
+    """
+    def __init__(self, run_batch, window_ms: float, max_batch_size: int):
+        self._run_batch = run_batch
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[str, List[Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        # Referências fortes às tasks em execução (o event loop guarda apenas referências fracas)
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def submit(self, model_type: str, features: Dict[str, Any]) -> Tuple[Any, float, Dict[str, Any], int]:
+        """
+        Enfileira uma predição e aguarda o resultado do lote.
+        
+        Args:
+            model_type: Tipo do modelo (rating, price, category)
+            features: Features de entrada da predição
+            
+        Returns:
+            Tuple[Any, float, Dict[str, Any], int]: Valor previsto, score de confiança,
+            informações do modelo e tamanho do lote em que a predição foi executada
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(model_type, [])
+        pending.append((features, future))
+        ML_MICROBATCH_QUEUE_DEPTH.labels(model_type=model_type).inc()
+        
+        if len(pending) >= self.max_batch_size:
+            self._flush(model_type)
+        elif len(pending) == 1:
+            self._timers[model_type] = loop.call_later(self.window_ms / 1000, self._flush, model_type)
+        return await future
+    
+    def _flush(self, model_type: str) -> None:
+        timer = self._timers.pop(model_type, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(model_type, [])
+        if not pending:
+            return
+        ML_MICROBATCH_QUEUE_DEPTH.labels(model_type=model_type).dec(len(pending))
+        ML_MICROBATCH_BATCH_SIZE.labels(model_type=model_type).observe(len(pending))
+        task = asyncio.ensure_future(self._execute(model_type, pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def close(self) -> None:
+        """
+        Executa os lotes pendentes e aguarda os lotes em andamento (chamado no shutdown).
+        
+        Garante que nenhuma requisição fique aguardando um lote que não será executado.
+        """
+        for model_type in list(self._pending):
+            self._flush(model_type)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    async def _execute(self, model_type: str, pending: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        rows = [features for features, _ in pending]
+        try:
+            values, confidences, model_info = await run_in_threadpool(self._run_batch, model_type, rows)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), value, confidence in zip(pending, values, confidences):
+            if not future.done():
+                future.set_result((value, confidence, model_info, len(pending)))
+
+def _run_rows_inference(model_type: str, rows: List[Dict[str, Any]]) -> Tuple[List[Any], List[float], Dict[str, Any]]:
+    """Executa a inferência vetorizada para uma lista de linhas de features."""
+    return _run_inference(model_type, rows_to_columns(rows, FEATURE_COLUMNS), len(rows))
+
+async def process_ml_predictions_async(request: PredictionRequest) -> MLPredictionsResponse:
+    """
+    Processa uma predição online, agrupando requisições concorrentes em micro-lotes.
+    
+    Para os tipos rating, price e category a predição é enviada ao micro-batcher,
+    que executa uma única inferência para todas as requisições concorrentes do
+    mesmo tipo. Os demais tipos (ou com ML_MICROBATCH_ENABLED=false) são
+    processados individualmente por `process_ml_predictions`.
+    
+    Args:
+        request: Dados da requisição de predição
+        
+    Returns:
+        MLPredictionsResponse: Resultados das predições
+    """
+    if not ML_MICROBATCH_ENABLED or request.model_type not in _HEURISTIC_MODELS:
+        return await run_in_threadpool(process_ml_predictions, request)
+    
+    try:
+        start_time = time.time()
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Iniciando predições ML - Tipo: {request.model_type}", 
+                       extra={"event": "ml_prediction_start", "model_type": request.model_type})
+        
+        cache_key, cached = _lookup_prediction_cache(request)
+        if cached is not None:
+            return _build_predictions_response(request, *cached, start_time, _cache_metadata(request, "hit"))
+        
+        value, confidence, model_info, batch_size = await prediction_batcher.submit(request.model_type, request.input_features)
+        predictions = [PredictionResult(
+            book_id=request.input_features.get("book_id", 0),
+            prediction_value=value,
+            confidence_score=confidence,
+            prediction_type=request.model_type
+        )]
+        _store_prediction_cache(cache_key, predictions, model_info)
+        return _build_predictions_response(
+            request, predictions, model_info, start_time,
+            {"batch_size": batch_size, **_cache_metadata(request, "miss")}
+        )
+        
+    except Exception as e:
+        Logger.error(f"Erro ao processar predições ML: {str(e)}", 
+                    extra={"event": "ml_prediction_error", "error": str(e)})
+        raise
+
+def _resolve_batch_input(request: BatchPredictionRequest) -> Tuple[Dict[str, Sequence[Any]], List[int], str]:
+    """
+    Normaliza a entrada da predição em lote para o formato colunar.
+    
+    Aceita exatamente uma das formas: `rows` (lista de dicionários), `columns`
+    (dicionário coluna -> lista de valores) ou `book_ids` (features resolvidas
+    a partir dos livros cadastrados).
+    
+    Returns:
+        Tuple[Dict[str, Sequence[Any]], List[int], str]: Colunas de features,
+        IDs dos livros de cada linha e formato de entrada usado
+        
+    Raises:
+        ValueError: Se a entrada for inválida ou exceder ML_BATCH_MAX_ROWS
+        HTTPException 404: Se algum book_id não existir
+    """
+    provided = [name for name in ("rows", "columns", "book_ids") if getattr(request, name) is not None]
+    if len(provided) != 1:
+        raise ValueError("Informe exatamente um entre rows, columns ou book_ids")
+    input_format = provided[0]
+    
+    # Valida o tamanho do lote antes de consultar o banco ou montar as colunas
+    if input_format == "columns":
+        lengths = {len(values) for values in request.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Todas as colunas devem ter o mesmo tamanho")
+        n_rows = lengths.pop() if lengths else 0
+    else:
+        n_rows = len(getattr(request, input_format))
+    if n_rows > ML_BATCH_MAX_ROWS:
+        raise ValueError(f"O lote excede o limite de {ML_BATCH_MAX_ROWS} linhas")
+    
+    if input_format == "rows":
+        rows = request.rows
+        columns = rows_to_columns(rows, FEATURE_COLUMNS)
+        book_ids = [row.get("book_id", 0) for row in rows]
+    elif input_format == "columns":
+        columns = request.columns
+        book_ids = list(columns.get("book_id") or [0] * n_rows)
+    else:
+        book_ids = request.book_ids
+        books_by_id = {book.id: book for book in get_books_by_ids(book_ids)}
+        missing = [book_id for book_id in book_ids if book_id not in books_by_id]
+        if missing:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Livros não encontrados: {missing[:20]}")
+        columns = rows_to_columns([_book_feature_row(books_by_id[book_id]) for book_id in book_ids], FEATURE_COLUMNS)
+    
+    return columns, book_ids, input_format
+
+def process_ml_batch_predictions(request: BatchPredictionRequest) -> MLPredictionsResponse:
+    """
+    Processa predições em lote com uma única chamada de inferência vetorizada.
+    
+    As features de todas as linhas são codificadas em uma única matriz e o
+    modelo é executado uma vez sobre ela. Os resultados são retornados na
+    mesma ordem das linhas de entrada.
+    
+    Args:
+        request: Dados da requisição de predição em lote
+        
+    Returns:
+        MLPredictionsResponse: Resultados das predições, na ordem da entrada
+    """
+    try:
+        start_time = time.time()
+        if request.model_type not in _HEURISTIC_MODELS:
+            raise ValueError(f"Tipo de modelo não suportado em lote: {request.model_type}")
+        
+        columns, book_ids, input_format = _resolve_batch_input(request)
+        n_rows = len(book_ids)
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Iniciando predições ML em lote - Tipo: {request.model_type}, linhas: {n_rows}", 
+                       extra={"event": "ml_batch_prediction_start", "model_type": request.model_type, 
+                             "rows": n_rows, "input_format": input_format})
+        
+        inference_start = time.perf_counter()
+        values, confidences, model_info = _run_inference(request.model_type, columns, n_rows)
+        inference_time = time.perf_counter() - inference_start
+        
+        predictions = [
+            PredictionResult(
+                book_id=book_id or 0,
+                prediction_value=value,
+                confidence_score=confidence,
+                prediction_type=request.model_type
+            )
+            for book_id, value, confidence in zip(book_ids, values, confidences)
+        ]
+        
+        execution_time = (time.time() - start_time) * 1000  # em milissegundos
+        ML_PREDICTION_DURATION.labels(model_type=request.model_type, mode="batch").observe(execution_time / 1000)
         
         metadata = {
             "request_timestamp": time.time(),
-            "input_features_count": len(request.input_features),
+            "input_format": input_format,
+            "inference_time_ms": round(inference_time * 1000, 3),
+            "rows_per_second": round(n_rows / inference_time, 1) if inference_time > 0 else None,
             "processing_status": "success"
         }
         
-        Logger.info(f"Predições ML concluídas: {len(predictions)} resultados em {execution_time:.2f}ms", 
-                   extra={"event": "ml_prediction_success", "total_predictions": len(predictions), 
-                         "execution_time_ms": execution_time})
+        if Logger.isEnabledFor(logging.DEBUG):
+            Logger.debug(f"Predições ML em lote concluídas: {n_rows} resultados em {execution_time:.2f}ms", 
+                       extra={"event": "ml_batch_prediction_success", "total_predictions": n_rows, 
+                             "execution_time_ms": execution_time})
         
         return MLPredictionsResponse(
             predictions=predictions,
             model_info=model_info,
             execution_time_ms=round(execution_time, 2),
-            total_predictions=len(predictions),
+            total_predictions=n_rows,
             metadata=metadata
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        Logger.error(f"Erro ao processar predições ML: {str(e)}", 
-                    extra={"event": "ml_prediction_error", "error": str(e)})
+        Logger.error(f"Erro ao processar predições ML em lote: {str(e)}", 
+                    extra={"event": "ml_batch_prediction_error", "error": str(e)})
         raise
 
-def _predict_rating(features: Dict[str, Any]) -> float:
-    """Simula predição de rating baseada nas features."""
-    # Lógica simplificada de predição
-    base_rating = 3.0
-    
-    # Ajustes baseados nas features
-    if features.get("year", 2000) > 2020:
-        base_rating += 0.5
-    if features.get("price", 0) > 50:
-        base_rating += 0.3
-    if "bestseller" in str(features.get("category", "")).lower():
-        base_rating += 0.7
-    
-    return min(5.0, max(1.0, round(base_rating, 1)))
-
-def _predict_price(features: Dict[str, Any]) -> float:
-    """Simula predição de preço baseada nas features."""
-    base_price = 25.0
-    
-    # Ajustes baseados nas features
-    if features.get("year", 2000) > 2020:
-        base_price += 10.0
-    if features.get("title_length", 0) > 50:
-        base_price += 5.0
-    if "premium" in str(features.get("category", "")).lower():
-        base_price += 15.0
-    
-    return round(base_price, 2)
-
-def _predict_category(features: Dict[str, Any]) -> str:
-    """Simula classificação de categoria baseada nas features."""
+def get_ml_models() -> Dict[str, Any]:
+    """
+    Obtém as informações dos modelos carregados no registro deste worker.
+    
+    Returns:
+        Dict[str, Any]: Modelos ativos por tipo, geração do registro e diretório de artefatos
+    """
+    models = {}
+    for model_type in _HEURISTIC_MODELS:
+        model = model_registry.get(model_type)
+        models[model_type] = model.info() if model is not None else _heuristic_model_info(model_type)
+    return {
+        "models": models,
+        "generation": model_registry.generation,
+        "models_dir": model_registry.models_dir
+    }
+
+def reload_ml_models() -> Dict[str, Any]:
+    """
+    Recarrega os artefatos publicados no diretório de modelos.
+    
+    Returns:
+        Dict[str, Any]: Versões ativas por tipo e geração do registro após a recarga
+    """
+    versions = model_registry.load()
+    Logger.info("Modelos ML recarregados", 
+               extra={"event": "ml_models_reloaded", "versions": versions, "generation": model_registry.generation})
+    return {"versions": versions, "generation": model_registry.generation}
+
+@span("inference")
+def _run_inference(model_type: str, columns: Dict[str, Sequence[Any]], n_rows: int) -> Tuple[List[Any], List[float], Dict[str, Any]]:
+    """
+    Executa a inferência vetorizada de um tipo de modelo sobre dados colunares.
+    
+    Usa o modelo ativo no registro de modelos ou, na ausência de artefato
+    publicado, as heurísticas de fallback.
+    
+    Args:
+        model_type: Tipo do modelo (rating, price, category)
+        columns: Features de entrada em formato colunar
+        n_rows: Quantidade de linhas
+        
+    Returns:
+        Tuple[List[Any], List[float], Dict[str, Any]]: Valores previstos, scores de
+        confiança e informações do modelo usado
+    """
+    model = model_registry.get(model_type)
+    if model is not None:
+        values, confidences = model.predict_matrix(model.encoder.transform_columns(columns, n_rows))
+        return values, confidences, model.info()
+    predict, confidence_score = _HEURISTIC_MODELS[model_type]
+    return predict(columns, n_rows), [confidence_score] * n_rows, _heuristic_model_info(model_type)
+
+def _heuristic_model_info(model_type: str) -> Dict[str, Any]:
+    """Informações do modelo quando a predição é feita pelas heurísticas de fallback."""
+    return {
+        "model_type": model_type,
+        "model_version": HEURISTIC_MODEL_VERSION,
+        "last_trained": None,
+        "algorithm": "Heuristic"
+    }
+
+def _text_column(columns: Dict[str, Sequence[Any]], name: str, n_rows: int) -> List[str]:
+    """Extrai uma coluna textual em minúsculas (vazia se ausente)."""
+    values = columns.get(name) or [None] * n_rows
+    return [str(value).lower() if value is not None else "" for value in values]
+
+def _numeric_feature(columns: Dict[str, Sequence[Any]], name: str, default: float, n_rows: int) -> np.ndarray:
+    """Extrai uma coluna numérica como array, usando o padrão para valores ausentes."""
+    return numeric_column(columns.get(name) or [None] * n_rows, default)
+
+def _predict_rating(columns: Dict[str, Sequence[Any]], n_rows: int) -> List[float]:
+    """Simula predição de rating baseada nas features (vetorizada)."""
+    year = _numeric_feature(columns, "year", 2000, n_rows)
+    price = _numeric_feature(columns, "price", 0, n_rows)
+    bestseller = np.array(["bestseller" in category for category in _text_column(columns, "category", n_rows)], dtype=bool)
+    
+    # Lógica simplificada: rating base com ajustes baseados nas features
+    rating = 3.0 + 0.5 * (year > 2020) + 0.3 * (price > 50) + 0.7 * bestseller
+    return np.clip(np.round(rating, 1), 1.0, 5.0).tolist()
+
+def _predict_price(columns: Dict[str, Sequence[Any]], n_rows: int) -> List[float]:
+    """Simula predição de preço baseada nas features (vetorizada)."""
+    year = _numeric_feature(columns, "year", 2000, n_rows)
+    title_length = _numeric_feature(columns, "title_length", 0, n_rows)
+    premium = np.array(["premium" in category for category in _text_column(columns, "category", n_rows)], dtype=bool)
+    
+    # Preço base com ajustes baseados nas features
+    price = 25.0 + 10.0 * (year > 2020) + 5.0 * (title_length > 50) + 15.0 * premium
+    return np.round(price, 2).tolist()
+
+def _predict_category(columns: Dict[str, Sequence[Any]], n_rows: int) -> List[str]:
+    """Simula classificação de categoria baseada nas features (vetorizada)."""
+    year = _numeric_feature(columns, "year", 2000, n_rows)
+    price = _numeric_feature(columns, "price", 0, n_rows)
+    
     # Lógica simplificada de classificação
-    if features.get("year", 2000) > 2020:
-        return "Ficção Contemporânea"
-    elif features.get("price", 0) > 40:
-        return "Literatura Premium"
-    else:
-        return "Ficção Geral"
+    categories = np.where(
+        year > 2020,
+        "Ficção Contemporânea",
+        np.where(price > 40, "Literatura Premium", "Ficção Geral")
+    )
+    return categories.tolist()
 
-def _get_recommendations(features: Dict[str, Any], book_ids: List[int]) -> List[PredictionResult]:
-    """Simula sistema de recomendação."""
-    recommendations = []
+# Heurísticas de fallback (função de predição vetorizada, score de confiança) por tipo
+# de modelo, usadas enquanto não há artefato treinado publicado no registro de modelos
+_HEURISTIC_MODELS = {
+    "rating": (_predict_rating, 0.85),
+    "price": (_predict_price, 0.78),
+    "category": (_predict_category, 0.92),
+}
+
+def _load_index_features() -> List[BookFeature]:
+    """
+    Features dos livros usadas na construção do índice de similaridade.
     
-    # Simular recomendações baseadas nas features
-    for i, book_id in enumerate(book_ids[:5]):  # Limitar a 5 recomendações
-        score = 0.9 - (i * 0.1)  # Score decrescente
-        recommendations.append(PredictionResult(
+    Calculadas sem o cache versionado: durante a troca de versão do catálogo o
+    cache ainda pode conter as features da versão anterior.
+    """
+    return get_ml_features.__wrapped__().features
+
+def load_similarity_index() -> Dict[str, Any]:
+    """
+    Carrega o índice de similaridade na inicialização do worker.
+    
+    Com memória compartilhada ativa, apenas o primeiro worker constrói o índice;
+    os demais mapeiam somente leitura os arrays já publicados.
+    
+    Returns:
+        Dict[str, Any]: Informações do índice ativo
+    """
+    return similarity_index.get_or_build(_load_index_features, catalog_version_watcher.version).info()
+
+def refresh_similarity_index() -> Dict[str, Any]:
+    """
+    Reconstrói o índice de similaridade a partir das features atuais dos livros.
+    
+    Deve ser chamado quando o catálogo muda (inicialização e após o scraping).
+    
+    Returns:
+        Dict[str, Any]: Informações do novo índice
+    """
+    return similarity_index.refresh(_load_index_features, catalog_version_watcher.version).info()
+
+def _on_catalog_version(version: int) -> None:
+    """Reconstrói o índice de similaridade (se já carregado) quando o catálogo muda."""
+    if similarity_index.get() is not None:
+        similarity_index.refresh(_load_index_features, version)
+
+def get_similar_books(book_id: int, k: int = 10) -> SimilarBooksResponse:
+    """
+    Obtém os livros mais similares a um livro a partir do índice pré-calculado.
+    
+    Args:
+        book_id: ID do livro de referência
+        k: Quantidade de livros similares
+        
+    Returns:
+        SimilarBooksResponse: Livros similares por similaridade decrescente
+        
+    Raises:
+        HTTPException: 404 se o livro não estiver no índice
+    """
+    start_time = time.time()
+    index = similarity_index.get_or_build(_load_index_features)
+    if book_id not in index:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Livro {book_id} não encontrado no índice de recomendação"
+        )
+    similar_books = [
+        PredictionResult(
+            book_id=similar_id,
+            prediction_value=round(score, 4),
+            confidence_score=round(max(0.0, min(1.0, score)), 4),
+            prediction_type="similarity_score"
+        )
+        for similar_id, score in index.similar(book_id, k)
+    ]
+    return SimilarBooksResponse(
+        book_id=book_id,
+        similar_books=similar_books,
+        model_info=index.info(),
+        execution_time_ms=round((time.time() - start_time) * 1000, 2)
+    )
+
+def _get_recommendations(
+    features: Dict[str, Any],
+    book_ids: List[int],
+    params: Dict[str, Any]
+) -> Tuple[List[PredictionResult], Dict[str, Any]]:
+    """
+    Recomenda livros similares aos livros informados (livros curtidos).
+    
+    Usa `book_ids` como livros curtidos ou, se vazio, `input_features["book_id"]`.
+    A quantidade de recomendações vem de `prediction_params["k"]`.
+    """
+    liked_ids = list(book_ids) or ([features["book_id"]] if features.get("book_id") is not None else [])
+    k = int(params.get("k", RECOMMENDATIONS_DEFAULT_K))
+    index = similarity_index.get_or_build(_load_index_features)
+    recommendations = [
+        PredictionResult(
             book_id=book_id,
             prediction_value=score,
-            confidence_score=score,
+            confidence_score=round(max(0.0, min(1.0, score)), 4),
             prediction_type="recommendation_score"
-        ))
-    
-    return recommendations
\ No newline at end of file
+        )
+        for book_id, score in index.recommend(liked_ids, k)
+    ]
+    return recommendations, index.info()
+
+# Cache global do worker para as predições online
+prediction_cache = TTLCache(ML_PREDICTION_CACHE_SIZE, ML_PREDICTION_CACHE_TTL_SECONDS)
+
+# Micro-batcher global do worker para as predições online
+prediction_batcher = MicroBatcher(_run_rows_inference, ML_MICROBATCH_WINDOW_MS, ML_MICROBATCH_MAX_SIZE)
+
+# Mantém o índice de recomendação alinhado à versão do catálogo
+catalog_version_watcher.subscribe(_on_catalog_version)
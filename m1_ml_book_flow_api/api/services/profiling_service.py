@@ -0,0 +1,57 @@
+"""
+Módulo de serviço para profiling do worker em execução.
+
+Este módulo contém a lógica do profile sob demanda do endpoint administrativo:
+amostra as pilhas de todas as threads do worker por um tempo limitado (ver
+`core.profiler`) e devolve o resultado no formato collapsed stacks.
+Funciona como camada intermediária entre as rotas (controllers) e o amostrador.
+"""
+import asyncio
+import logging
+from fastapi import HTTPException, status
+from m1_ml_book_flow_api.core.logger import get_logger
+from m1_ml_book_flow_api.core.profiler import StackSampler, profiling_lock
+
+profiling_logger = get_logger("profiling_service")
+
+async def profile_worker(seconds: float, interval_ms: float, include_idle: bool = False) -> StackSampler:
+    """
+    Executa um profile por amostragem do worker atual.
+
+    A espera é assíncrona: o event loop continua atendendo as demais
+    requisições (que são justamente o que está sendo amostrado) enquanto a
+    thread do amostrador coleta as pilhas.
+
+    Args:
+        seconds (float): Duração do profile em segundos
+        interval_ms (float): Intervalo entre amostras em milissegundos
+        include_idle (bool): Mantém pilhas de threads ociosas
+
+    Returns:
+        StackSampler: Amostrador encerrado (amostras em `collapsed()`)
+
+    Raises:
+        HTTPException 409: Se já houver um profile em execução neste worker
+    """
+    if not profiling_lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Já existe um profile em execução neste worker"
+        )
+    try:
+        with StackSampler(interval_ms / 1000, include_idle) as sampler:
+            await asyncio.sleep(seconds)
+    finally:
+        profiling_lock.release()
+
+    profiling_logger.info(
+        "Worker profile completed",
+        extra={
+            "event": "profile_worker_complete",
+            "duration_ms": round(sampler.duration * 1000, 2),
+            "interval_ms": interval_ms,
+            "ticks": sampler.ticks,
+            "stacks": len(sampler.samples),
+        }
+    )
+    return sampler
@@ -8,23 +8,43 @@ Este módulo coordena o processo completo de web scraping:
 4. Mantém logs detalhados do progresso
 
 A abordagem de salvar página por página evita perda de dados em caso de erro.
+A versão do catálogo é incrementada uma única vez ao final da execução, para
+que os workers reconstruam snapshot, índices e caches uma vez por scraping e
+não a cada página.
 """
+import time
 from typing import Dict
 from sqlalchemy.orm import Session
 from m1_ml_book_flow_api.core.logger import get_logger, log_error
 from m1_ml_book_flow_api.api.services.scraping_service import scrape_page, get_total_pages, has_next_page
-from m1_ml_book_flow_api.api.repositories.scraping_repository import save_scraped_books
+from m1_ml_book_flow_api.api.repositories.scraping_repository import save_scraped_books, publish_catalog_version
+from m1_ml_book_flow_api.core.catalog_version import catalog_version_watcher
+from m1_ml_book_flow_api.core.metrics import BOOKS_SAVED, SCRAPE_PAGE_DURATION, SCRAPE_PAGES
 from fastapi import HTTPException, status
 
 scraping_logger = get_logger("scraping_service")
 
+def _publish_catalog_changes(db: Session, total_saved: int) -> None:
+    # Uma única versão (e uma única notificação) para todas as páginas salvas
+    if total_saved == 0:
+        return
+    try:
+        publish_catalog_version(db)
+    except Exception as e:
+        log_error(error=e, context="trigger_scraping", event="scraping_catalog_version_error")
+        return
+    # Aplica a nova versão neste worker; os demais recebem via LISTEN/NOTIFY
+    catalog_version_watcher.check()
+
 def trigger_scraping(db: Session) -> Dict:
     """
     Dispara o processo de web scraping e salva livros no banco de dados.
     
     O processo é executado página por página, salvando imediatamente no banco
     a cada página processada. Isso evita problemas de memória e perda de dados
-    em caso de erro durante o processo.
+    em caso de erro durante o processo. A versão do catálogo é publicada uma
+    vez ao final (inclusive se a execução for interrompida por erro depois de
+    alguma página salva).
     
     Args:
         db (Session): Sessão do banco de dados SQLAlchemy
@@ -59,7 +79,9 @@ def trigger_scraping(db: Session) -> Dict:
         # Process and save page by page
         while True:
             # Scrape current page
+            page_start = time.perf_counter()
             books_data = scrape_page(page, total_pages)
+            SCRAPE_PAGE_DURATION.observe(time.perf_counter() - page_start)
             
             if not books_data:
                 print(f"\n⚠️  Nenhum livro encontrado na página {page}, encerrando...")
@@ -75,14 +97,17 @@ def trigger_scraping(db: Session) -> Dict:
             )
             
             try:
-                saved_count = save_scraped_books(db, books_data)
+                saved_count = save_scraped_books(db, books_data, bump_version=False)
                 total_saved += saved_count
+                SCRAPE_PAGES.labels(result="saved").inc()
+                BOOKS_SAVED.inc(saved_count)
                 print(f"✅ Página {page} salva! {saved_count} livros salvos (Total acumulado: {total_saved})")
                 scraping_logger.info(
                     f"Page {page} saved successfully",
                     extra={"event": "scraping_page_saved", "page": page, "saved_count": saved_count, "total_saved": total_saved}
                 )
             except Exception as db_error:
+                SCRAPE_PAGES.labels(result="error").inc()
                 print(f"❌ ERRO ao salvar página {page}: {str(db_error)}")
                 scraping_logger.error(
                     f"Error saving page {page} to database: {str(db_error)}",
@@ -99,6 +124,8 @@ def trigger_scraping(db: Session) -> Dict:
             
             page += 1
         
+        _publish_catalog_changes(db, total_saved)
+        
         # Final summary
         print("\n" + "=" * 60)
         print(f"✅ SCRAPING CONCLUÍDO!")
@@ -141,6 +168,7 @@ def trigger_scraping(db: Session) -> Dict:
             context="trigger_scraping",
             event="scraping_error"
         )
+        _publish_catalog_changes(db, total_saved)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao executar scraping: {str(e)}"
@@ -4,10 +4,15 @@ Módulo de serviço para estatísticas por categoria de livros.
 Este módulo contém a lógica de negócio relacionada a estatísticas agrupadas por
 categoria de livros, incluindo quantidade e preço médio por categoria. Funciona como
 camada intermediária entre as rotas (controllers) e os repositórios (data access).
+
+Requisições concorrentes no mesmo processo compartilham um único cálculo
+(single-flight).
 """
 from fastapi import HTTPException, status
 from ..repositories.stats_categories_repository import get_stats_categories
+from ..utils.singleflight import single_flight
 
+@single_flight("stats_categories")
 def get_stats():
     """
     Retorna estatísticas agrupadas por categoria de livros.
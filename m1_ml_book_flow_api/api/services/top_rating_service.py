@@ -5,6 +5,7 @@ Este módulo contém a lógica de negócio relacionada aos livros com melhores
 avaliações, ordenados por rating em ordem decrescente. Funciona como camada
 intermediária entre as rotas (controllers) e os repositórios (data access).
 """
+import logging
 from typing import List
 from ..models.Book import Book
 from ..repositories.top_rating_repository import get_top_rating
@@ -32,13 +33,14 @@ def get_top_rating_books_service(limit: int = 10) -> List[Book]:
         HTTPException 404: Se não houver livros cadastrados
         HTTPException 500: Se ocorrer erro interno do servidor
     """
-    top_rating_logger.info(
-        "Fetching top rating books",
-        extra={
-            "event": "get_top_rating_books_start",
-            "limit": limit
-        }
-    )
+    if top_rating_logger.isEnabledFor(logging.DEBUG):
+        top_rating_logger.debug(
+            "Fetching top rating books",
+            extra={
+                "event": "get_top_rating_books_start",
+                "limit": limit
+            }
+        )
     
     try:
         ratings = get_top_rating(limit)
@@ -57,15 +59,16 @@ def get_top_rating_books_service(limit: int = 10) -> List[Book]:
                 detail="Nenhum livro com avaliação encontrado"
             )
         
-        top_rating_logger.info(
-            "Top rating books fetched successfully",
-            extra={
-                "event": "get_top_rating_books_success",
-                "books_count": len(ratings),
-                "limit": limit,
-                "operation": "get_top_rating_books"
-            }
-        )
+        if top_rating_logger.isEnabledFor(logging.DEBUG):
+            top_rating_logger.debug(
+                "Top rating books fetched successfully",
+                extra={
+                    "event": "get_top_rating_books_success",
+                    "books_count": len(ratings),
+                    "limit": limit,
+                    "operation": "get_top_rating_books"
+                }
+            )
         return ratings
     except HTTPException:
         raise
@@ -0,0 +1,8 @@
+"""
+Pacote de utilitários compartilhados pelos serviços da API.
+
+Módulos disponíveis:
+    - running_stats: Acumuladores estatísticos em passagem única (streaming)
+    - singleflight: Coalescência de chamadas concorrentes idênticas (single-flight)
+    - ndjson: Respostas em streaming no formato NDJSON
+"""
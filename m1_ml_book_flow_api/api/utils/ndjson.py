@@ -0,0 +1,61 @@
+"""
+Módulo de respostas em streaming no formato NDJSON (JSON delimitado por linha).
+
+Quando o cliente envia `Accept: application/x-ndjson`, as rotas de listagem
+devolvem um registro JSON por linha à medida que as linhas são lidas do banco
+(cursor do lado do servidor), em vez de montar a lista completa em memória.
+A memória por requisição fica limitada a um lote de NDJSON_BATCH_SIZE linhas,
+independentemente do tamanho do resultado.
+"""
+import os
+from typing import Any, Iterable, Iterator
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from m1_ml_book_flow_api.core.logger import get_logger
+
+ndjson_logger = get_logger("ndjson")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Linhas lidas por vez do cursor do banco e enviadas por chunk da resposta
+NDJSON_BATCH_SIZE = int(os.getenv("NDJSON_BATCH_SIZE", "1000"))
+
+def wants_ndjson(request: Request) -> bool:
+    """Se o cliente pediu a resposta em NDJSON (`Accept: application/x-ndjson`)."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def _encode(rows: Iterable[Any], batch_size: int) -> Iterator[bytes]:
+    chunk = []
+    try:
+        for row in rows:
+            chunk.append(orjson.dumps(row))
+            if len(chunk) >= batch_size:
+                chunk.append(b"")
+                yield b"\n".join(chunk)
+                chunk = []
+        if chunk:
+            chunk.append(b"")
+            yield b"\n".join(chunk)
+    except Exception as e:
+        # O status 200 já foi enviado: registra o erro e encerra a resposta (truncada)
+        ndjson_logger.error(
+            f"Erro durante o streaming NDJSON: {str(e)}",
+            extra={"event": "ndjson_stream_error", "error": str(e)}
+        )
+        raise
+
+def ndjson_response(rows: Iterable[Any], batch_size: int = NDJSON_BATCH_SIZE) -> StreamingResponse:
+    """
+    Cria uma resposta em streaming com um registro JSON por linha.
+
+    O iterador é consumido no threadpool (linhas do banco são lidas sob demanda)
+    e os registros são enviados em chunks de `batch_size` linhas.
+
+    Args:
+        rows (Iterable[Any]): Registros serializáveis pelo orjson (ex.: dicionários)
+        batch_size (int): Registros por chunk da resposta
+
+    Returns:
+        StreamingResponse: Resposta `application/x-ndjson`
+    """
+    return StreamingResponse(_encode(rows, batch_size), media_type=NDJSON_MEDIA_TYPE)
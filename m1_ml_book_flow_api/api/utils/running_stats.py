@@ -0,0 +1,78 @@
+"""
+Módulo de acumuladores estatísticos em passagem única (streaming).
+
+Este módulo fornece acumuladores online que calculam contagem, soma, mínimo,
+máximo, média e variância (algoritmo de Welford) à medida que os valores são
+recebidos, sem precisar manter a lista completa de valores em memória.
+"""
+import math
+from typing import Dict, Optional
+
+
+class RunningStats:
+    """
+    Acumulador online de estatísticas descritivas.
+
+    Atualiza contagem, soma, mínimo, máximo, média e variância em O(1) por valor,
+    usando o algoritmo de Welford para a variância (numericamente estável).
+
+    Attributes:
+        count (int): Quantidade de valores observados
+        total (float): Soma dos valores observados
+        min (Optional[float]): Menor valor observado (None se vazio)
+        max (Optional[float]): Maior valor observado (None se vazio)
+        mean (float): Média corrente dos valores
+    """
+    __slots__ = ("count", "total", "min", "max", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """
+        Adiciona um valor ao acumulador.
+
+        Args:
+            value (float): Valor observado
+        """
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Variância populacional dos valores observados (0 se vazio)."""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        """Desvio padrão populacional dos valores observados (0 se vazio)."""
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Exporta as estatísticas acumuladas.
+
+        Returns:
+            Dict[str, float]: Dicionário com count, min, max, avg, std e variance.
+                             Valores vazios são retornados como 0.
+        """
+        return {
+            "count": self.count,
+            "min": self.min if self.min is not None else 0,
+            "max": self.max if self.max is not None else 0,
+            "avg": self.mean if self.count else 0,
+            "std": self.std,
+            "variance": self.variance,
+        }
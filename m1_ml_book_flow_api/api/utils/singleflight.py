@@ -0,0 +1,109 @@
+"""
+Módulo de coalescência de chamadas concorrentes (single-flight).
+
+Quando várias requisições idênticas chegam ao mesmo tempo a um endpoint caro,
+apenas a primeira executa o cálculo; as demais, no mesmo processo, aguardam o
+cálculo em andamento e recebem o mesmo resultado (ou a mesma exceção). As rotas
+síncronas do FastAPI rodam no threadpool, por isso a espera usa primitivas de
+threading.
+"""
+import functools
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+from m1_ml_book_flow_api.core.metrics import SINGLEFLIGHT_CALLS
+
+
+class _Call:
+    """Cálculo em andamento compartilhado pelas chamadas de uma mesma chave."""
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes com a mesma chave em uma única execução.
+
+    Attributes:
+        name (str): Nome da operação (label das métricas)
+        executed (int): Total de chamadas que executaram o cálculo
+        coalesced (int): Total de chamadas que aguardaram um cálculo em andamento
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.executed = 0
+        self.coalesced = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Executa `func` ou aguarda a execução em andamento para a mesma chave.
+
+        Args:
+            key (Hashable): Chave que identifica chamadas idênticas
+            func (Callable): Função que calcula o resultado
+            *args, **kwargs: Argumentos repassados a `func`
+
+        Returns:
+            Any: Resultado de `func` (compartilhado entre as chamadas coalescidas)
+
+        Raises:
+            Exception: A exceção levantada por `func`, propagada a todas as chamadas
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        SINGLEFLIGHT_CALLS.labels(self.name, "executed" if leader else "coalesced").inc()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        """Contadores de chamadas executadas e coalescidas."""
+        return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+def single_flight(name: str) -> Callable:
+    """
+    Decorator que coalesce chamadas concorrentes com os mesmos argumentos.
+
+    Args:
+        name (str): Nome da operação (label das métricas)
+
+    Returns:
+        Callable: Decorator; a instância de `SingleFlight` fica em `wrapper.flight`
+    """
+    def decorator(func: Callable) -> Callable:
+        flight = SingleFlight(name)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = (args, tuple(sorted(kwargs.items())))
+            return flight.do(key, func, *args, **kwargs)
+
+        wrapper.flight = flight
+        return wrapper
+    return decorator
@@ -9,10 +9,14 @@ Módulos disponíveis:
     - database: Configuração e gerenciamento de conexão com banco de dados PostgreSQL
     - models: Modelos SQLAlchemy para entidades do banco de dados
     - logger: Configuração de logging estruturado em JSON
-    - middleware: Middlewares HTTP para logging, métricas e contexto
+    - middleware: Middlewares HTTP para logging, métricas, contexto e cache HTTP (ETag)
     - handlers: Handlers centralizados para tratamento de exceções
     - errors: Modelos de resposta padronizados para erros
     - exceptions: Exceções customizadas para diferentes tipos de erro HTTP
     - security: Funcionalidades de autenticação e autorização JWT
+    - metrics: Métricas Prometheus de domínio da aplicação
+    - cache: Cache LRU em memória com expiração por tempo (TTL)
+    - catalog_version: Versão do catálogo, LISTEN/NOTIFY e caches de leitura versionados
+    - profiler: Amostrador de pilhas (profiling sob demanda) no formato collapsed stacks
 """
 
@@ -0,0 +1,105 @@
+"""
+Módulo de cache em memória da aplicação.
+
+Este módulo fornece um cache LRU com expiração por tempo (TTL), seguro para uso
+concorrente entre threads. Cada worker mantém sua própria instância, sem
+dependência de serviços externos.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class TTLCache:
+    """
+    Cache LRU com expiração por tempo (TTL).
+
+    Quando o cache atinge `maxsize` entradas, a entrada usada há mais tempo é
+    descartada. Entradas expiradas são descartadas na leitura. O cache pode ser
+    associado a uma versão dos dados (`ensure_version`): quando a versão muda,
+    todas as entradas são invalidadas.
+
+    Attributes:
+        maxsize (int): Quantidade máxima de entradas (0 desativa o cache)
+        ttl (float): Tempo de vida de cada entrada em segundos
+        hits (int): Total de leituras encontradas no cache
+        misses (int): Total de leituras não encontradas no cache
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._version: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Se o cache armazena entradas."""
+        return self.maxsize > 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """
+        Obtém uma entrada do cache, marcando-a como usada recentemente.
+
+        Args:
+            key (Hashable): Chave da entrada
+            default (Optional[Any]): Valor retornado se a entrada não existir ou tiver expirado
+
+        Returns:
+            Any: Valor armazenado ou `default`
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Armazena uma entrada no cache, descartando a menos usada se estiver cheio.
+
+        Args:
+            key (Hashable): Chave da entrada
+            value (Any): Valor a armazenar
+            ttl (Optional[float]): Tempo de vida desta entrada em segundos (padrão: `self.ttl`)
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def ensure_version(self, version: Any) -> None:
+        """
+        Invalida todas as entradas se a versão dos dados mudou.
+
+        Args:
+            version (Any): Versão atual dos dados em cache
+        """
+        if version == self._version:
+            return
+        with self._lock:
+            if version != self._version:
+                self._data.clear()
+                self._version = version
+
+    def clear(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        """Contadores de uso do cache."""
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
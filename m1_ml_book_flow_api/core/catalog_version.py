@@ -0,0 +1,240 @@
+"""
+Módulo de versionamento do catálogo e notificação de mudanças entre processos.
+
+Cada commit que altera o catálogo incrementa a linha única da tabela
+`catalog_version` e emite `pg_notify('catalog_version', <versão>)` na mesma
+transação (a notificação só é entregue após o commit). Cada worker, em qualquer
+nó, mantém uma thread que escuta o canal com `LISTEN` e, como fallback, lê a
+versão do banco a cada CATALOG_VERSION_POLL_SECONDS.
+
+Quando a versão muda, os assinantes registrados são chamados (por exemplo, para
+reconstruir o snapshot do catálogo) e, em seguida, os caches criados com
+`catalog_cached` passam a ignorar os resultados calculados na versão anterior.
+"""
+import functools
+import inspect
+import os
+import select
+import threading
+from typing import Any, Callable, List, Optional, Sequence
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from m1_ml_book_flow_api.core.cache import TTLCache
+from m1_ml_book_flow_api.core.database import engine
+from m1_ml_book_flow_api.core.logger import get_logger
+from m1_ml_book_flow_api.core.models import CatalogVersionDB
+
+catalog_version_logger = get_logger("catalog_version")
+
+# Canal do LISTEN/NOTIFY do Postgres
+CATALOG_VERSION_CHANNEL = "catalog_version"
+# Intervalo do polling de fallback da versão do catálogo (segundos)
+CATALOG_VERSION_POLL_SECONDS = float(os.getenv("CATALOG_VERSION_POLL_SECONDS", "5"))
+# Se o watcher usa LISTEN/NOTIFY (False mantém apenas o polling)
+CATALOG_VERSION_LISTEN_ENABLED = os.getenv("CATALOG_VERSION_LISTEN_ENABLED", "true").lower() == "true"
+# Entradas máximas e TTL de segurança dos caches versionados
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "256"))
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "3600"))
+
+def bump_catalog_version(db: Session) -> int:
+    """
+    Incrementa a versão do catálogo e agenda a notificação dos demais processos.
+
+    Deve ser chamada dentro da transação que altera o catálogo, antes do commit:
+    o incremento e a notificação só se tornam visíveis quando ela é confirmada.
+
+    Args:
+        db (Session): Sessão do banco de dados da transação em andamento
+
+    Returns:
+        int: Nova versão do catálogo
+    """
+    statement = insert(CatalogVersionDB).values(id=1, version=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=[CatalogVersionDB.id],
+        set_={"version": CatalogVersionDB.version + 1, "updated_at": text("now()")}
+    ).returning(CatalogVersionDB.version)
+    version = db.execute(statement).scalar_one()
+    db.execute(text("SELECT pg_notify(:channel, :payload)"),
+               {"channel": CATALOG_VERSION_CHANNEL, "payload": str(version)})
+    return version
+
+def read_catalog_version() -> int:
+    """
+    Lê a versão atual do catálogo no banco de dados.
+
+    Returns:
+        int: Versão do catálogo (0 se nenhum commit foi registrado)
+    """
+    with engine.connect() as conn:
+        version = conn.execute(text("SELECT version FROM catalog_version WHERE id = 1")).scalar()
+    return int(version or 0)
+
+class CatalogVersionWatcher:
+    """
+    Acompanha a versão do catálogo via LISTEN/NOTIFY, com polling de fallback.
+
+    Attributes:
+        version (int): Última versão do catálogo observada por este processo
+        poll_seconds (float): Intervalo do polling de fallback
+        listen (bool): Se usa LISTEN/NOTIFY
+    """
+    def __init__(self, poll_seconds: float = CATALOG_VERSION_POLL_SECONDS, listen: bool = CATALOG_VERSION_LISTEN_ENABLED):
+        self.version = 0
+        self.poll_seconds = poll_seconds
+        self.listen = listen
+        self._subscribers: List[Callable[[int], None]] = []
+        self._dispatch_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable[[int], None]) -> Callable[[int], None]:
+        """
+        Registra uma função chamada com a nova versão sempre que o catálogo mudar.
+
+        Os assinantes são chamados na ordem de registro, antes de a nova versão
+        ser publicada em `version`.
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def set_version(self, version: int) -> bool:
+        """
+        Registra uma versão observada, notificando os assinantes se ela for nova.
+
+        Args:
+            version (int): Versão observada
+
+        Returns:
+            bool: True se a versão mudou
+        """
+        with self._dispatch_lock:
+            if version <= self.version:
+                return False
+            for callback in self._subscribers:
+                try:
+                    callback(version)
+                except Exception as e:
+                    catalog_version_logger.error(
+                        f"Erro ao processar mudança do catálogo: {str(e)}",
+                        extra={"event": "catalog_version_subscriber_error", "catalog_version": version, "error": str(e)}
+                    )
+            self.version = version
+        catalog_version_logger.info(
+            f"Versão do catálogo atualizada: {version}",
+            extra={"event": "catalog_version_changed", "catalog_version": version}
+        )
+        return True
+
+    def check(self) -> int:
+        """Lê a versão no banco de dados e notifica os assinantes se ela mudou."""
+        self.set_version(read_catalog_version())
+        return self.version
+
+    def start(self) -> None:
+        """Inicia a thread de acompanhamento (uma por processo)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-version-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Encerra a thread de acompanhamento."""
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.listen:
+                    self._listen_loop()
+                else:
+                    self.check()
+                    self._stop.wait(self.poll_seconds)
+            except Exception as e:
+                catalog_version_logger.warning(
+                    f"Falha ao acompanhar a versão do catálogo, usando polling: {str(e)}",
+                    extra={"event": "catalog_version_watch_error", "error": str(e)}
+                )
+                self._stop.wait(self.poll_seconds)
+
+    def _listen_loop(self) -> None:
+        raw = engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CATALOG_VERSION_CHANNEL}")
+            # Lê a versão após o LISTEN para não perder commits anteriores à assinatura
+            self.check()
+            while not self._stop.is_set():
+                readable, _, _ = select.select([conn], [], [], self.poll_seconds)
+                if not readable:
+                    # Polling de fallback: cobre notificações perdidas
+                    self.check()
+                    continue
+                conn.poll()
+                versions = [int(notify.payload) for notify in conn.notifies if notify.payload.isdigit()]
+                conn.notifies.clear()
+                if versions:
+                    self.set_version(max(versions))
+        finally:
+            raw.close()
+
+# Watcher global do processo
+catalog_version_watcher = CatalogVersionWatcher()
+
+_catalog_caches: List[TTLCache] = []
+
+def catalog_cached(
+    maxsize: int = CATALOG_CACHE_SIZE,
+    ttl: float = CATALOG_CACHE_TTL_SECONDS,
+    ignore: Sequence[str] = ("db",)
+) -> Callable:
+    """
+    Decorator que guarda os resultados de uma função associados à versão do catálogo.
+
+    Cada resultado é calculado em uma versão do catálogo; quando a versão muda, o
+    cache é invalidado. Argumentos em `ignore` (como a sessão do banco) não fazem
+    parte da chave e são usados apenas quando o resultado precisa ser calculado.
+
+    Args:
+        maxsize (int): Entradas máximas por função
+        ttl (float): Tempo de vida de segurança de cada entrada
+        ignore (Sequence[str]): Argumentos ignorados na chave do cache
+
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        cache = TTLCache(maxsize, ttl)
+        _catalog_caches.append(cache)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            version = catalog_version_watcher.version
+            cache.ensure_version(version)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple((name, value) for name, value in bound.arguments.items() if name not in ignore)
+            found = cache.get(key, _MISSING)
+            if found is not _MISSING:
+                return found
+            result = func(*args, **kwargs)
+            # Não associa à nova versão um resultado calculado durante a troca de versão
+            if catalog_version_watcher.version == version:
+                cache.set(key, result)
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+_MISSING = object()
+
+def clear_catalog_caches() -> None:
+    """Remove todas as entradas dos caches criados com `catalog_cached`."""
+    for cache in _catalog_caches:
+        cache.clear()
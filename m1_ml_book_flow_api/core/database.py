@@ -3,12 +3,32 @@ Módulo de configuração e gerenciamento do banco de dados.
 
 Este módulo configura a conexão com PostgreSQL usando SQLAlchemy e fornece
 funções para gerenciar sessões e inicializar o banco de dados.
+
+O engine é instrumentado com os eventos `before_cursor_execute` e
+`after_cursor_execute`: cada consulta é contada na requisição atual
+(`core.timing`), observada no histograma `bookflow_db_query_duration_seconds`
+por instrução normalizada e, acima de DB_SLOW_QUERY_MS, registrada em log.
 """
 import os
-from sqlalchemy import create_engine, text
+import re
+import threading
+import time
+from functools import lru_cache
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import OperationalError
+from .logger import get_logger
+from .metrics import DB_QUERY_DURATION
+from .timing import current_timings, record_query
+
+db_logger = get_logger("database")
+
+# Consultas mais lentas que isso (ms) são registradas em log (WARNING)
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+# Máximo de instruções distintas usadas como label do histograma (as demais entram como "other")
+DB_METRICS_MAX_STATEMENTS = int(os.getenv("DB_METRICS_MAX_STATEMENTS", "200"))
 
 # Configurações de conexão com o banco de dados
 # O Heroku fornece DATABASE_URL, então priorizamos isso
@@ -31,6 +51,90 @@ else:
 # pool_pre_ping: verifica conexões antes de usar para evitar erros de conexão expirada
 engine = create_engine(DATABASE_URL, pool_pre_ping=True, connect_args={"connect_timeout": 10})
 
+_SPACE_RE = re.compile(r"\s+")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\?")
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\(\?(?:, \?)+\)")
+_ROWS_RE = re.compile(r"\(\?\)(?:, \(\?\))+")
+_statement_labels = set()
+# Protege a verificação do limite e a inclusão (chamadas de threads do threadpool)
+_statement_labels_lock = threading.Lock()
+
+@lru_cache(maxsize=1024)
+def normalize_statement(statement: str) -> str:
+    """
+    Normaliza uma instrução SQL para agrupamento em métricas e logs.
+
+    Substitui parâmetros e literais por `?`, colapsa listas (`IN (?, ?, ?)` e
+    linhas de VALUES) e espaços, e limita o tamanho a 200 caracteres.
+
+    Args:
+        statement (str): Instrução SQL enviada ao driver
+
+    Returns:
+        str: Instrução normalizada (ex: "SELECT books.id FROM books WHERE books.id IN (?)")
+    """
+    normalized = _SPACE_RE.sub(" ", statement).strip()
+    normalized = _LITERAL_RE.sub("?", _PARAM_RE.sub("?", normalized))
+    normalized = _ROWS_RE.sub("(?)", _LIST_RE.sub("(?)", normalized))
+    return normalized[:200]
+
+def _statement_label(statement: str) -> str:
+    normalized = normalize_statement(statement)
+    if normalized in _statement_labels:
+        return normalized
+    with _statement_labels_lock:
+        if normalized in _statement_labels:
+            return normalized
+        if len(_statement_labels) >= DB_METRICS_MAX_STATEMENTS:
+            return "other"
+        _statement_labels.add(normalized)
+    return normalized
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    record_query(elapsed)
+    DB_QUERY_DURATION.labels(statement=_statement_label(statement)).observe(elapsed)
+    if elapsed * 1000 >= DB_SLOW_QUERY_MS:
+        timings = current_timings()
+        db_logger.warning(
+            "Slow query",
+            extra={
+                "event": "db_slow_query",
+                "statement": normalize_statement(statement),
+                "duration_ms": round(elapsed * 1000, 2),
+                "executemany": executemany,
+                "request_id": timings.request_id if timings is not None else None
+            }
+        )
+
+def _handle_error(exception_context):
+    # Consulta com erro não passa por after_cursor_execute: descarta o início registrado
+    if exception_context.connection is not None:
+        starts = exception_context.connection.info.get("query_start_time")
+        if starts:
+            starts.pop()
+
+def instrument_engine(target: Engine) -> Engine:
+    """
+    Registra os hooks de instrumentação de consultas SQL em um engine.
+
+    Args:
+        target (Engine): Engine SQLAlchemy
+
+    Returns:
+        Engine: O mesmo engine, instrumentado
+    """
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+    return target
+
+instrument_engine(engine)
+
 # Factory de sessões do banco de dados
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -88,7 +192,7 @@ def init_db():
         Exception: Se o banco de dados não estiver acessível ou houver erro na criação
     """
     # Importa modelos para garantir que sejam registrados com Base
-    from m1_ml_book_flow_api.core.models import BookDB  # noqa: F401
+    from m1_ml_book_flow_api.core.models import BookDB, CatalogVersionDB  # noqa: F401
     
     # Verifica conexão antes de criar tabelas
     if not check_database_exists():
@@ -5,19 +5,68 @@ Este módulo configura o sistema de logging da aplicação para usar formato JSO
 facilitando a integração com ferramentas de análise de logs e monitoramento.
 Fornece funções utilitárias para logging de requisições HTTP, eventos de autenticação
 e erros.
+
+A formatação e a escrita dos logs acontecem em uma thread de fundo
+(QueueHandler/QueueListener): quem loga (event loop ou thread da requisição)
+apenas coloca o registro em uma fila limitada. Com a fila cheia, o registro é
+descartado (LOG_QUEUE_POLICY=drop, contado em `bookflow_log_records_dropped_total`)
+ou quem loga espera espaço na fila (LOG_QUEUE_POLICY=block).
+
+O volume de logs é controlado por uma política configurável: nível mínimo
+(LOG_LEVEL, INFO em produção; os eventos de início/sucesso dos services são
+DEBUG), amostragem dos logs de requisição por prefixo de rota
+(LOG_ROUTE_SAMPLE_RATES) e registro obrigatório de erros e de requisições
+lentas (LOG_SLOW_REQUEST_MS).
 """
+import atexit
+import copy
 import logging
+import queue
+import random
 import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+import orjson
 from pythonjsonlogger import jsonlogger
 from datetime import datetime
 import os
+from typing import Dict, Optional
+from .metrics import LOG_RECORDS_DROPPED
+
+def _parse_sample_rates(value: str) -> Dict[str, float]:
+    rates = {}
+    for item in value.split(","):
+        if "=" in item:
+            prefix, rate = item.split("=", 1)
+            rates[prefix.strip().rstrip("/") or "/"] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+# Inclui pathname, lineno e funcName em cada log (custo extra de formatação e de tamanho)
+LOG_CALLER_INFO = os.getenv("LOG_CALLER_INFO", "false").lower() == "true"
+# Nível mínimo dos logs da aplicação (DEBUG inclui os eventos de início/sucesso de cada service)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Fração dos logs de requisição mantidos por prefixo de rota ("prefixo=taxa,..."; demais rotas: 1.0)
+LOG_ROUTE_SAMPLE_RATES = _parse_sample_rates(
+    os.getenv("LOG_ROUTE_SAMPLE_RATES", "/metrics=0,/api/v1/health=0.01")
+)
+# Requisições mais lentas que isso (ms) são sempre registradas, como as respostas 5xx
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+
+# Escrita dos logs em thread de fundo (false: escrita síncrona no handler de stdout)
+LOG_ASYNC_ENABLED = os.getenv("LOG_ASYNC_ENABLED", "true").lower() == "true"
+# Registros aguardando escrita; com a fila cheia aplica-se LOG_QUEUE_POLICY
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# drop: descarta o registro (nunca bloqueia a requisição); block: espera espaço na fila
+LOG_QUEUE_POLICY = os.getenv("LOG_QUEUE_POLICY", "drop").lower()
 
 class CustomJsonFormatter(jsonlogger.JsonFormatter):
     """
     Formatador JSON personalizado para logs estruturados.
 
     Estende JsonFormatter para adicionar campos padronizados a todos os logs,
-    incluindo timestamp, level, service e version.
+    incluindo timestamp, level, service e version. Substituído pelo
+    FastJsonFormatter no handler da aplicação; mantido como referência do
+    formato e para o benchmark de formatação (scripts/bench_log_formatter).
 
     Attributes:
         timestamp: Data e hora UTC do log em formato ISO
@@ -36,23 +85,145 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
         log_record['service'] = 'book-flow-api'
         log_record['version'] = '1.0.0'
 
+# Atributos próprios do LogRecord (o restante veio de `extra`)
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", logging.INFO, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "taskName"}
+
+class FastJsonFormatter(logging.Formatter):
+    """
+    Formatador JSON de logs estruturados com orjson.
+
+    Produz os mesmos campos do CustomJsonFormatter (timestamp, level, name,
+    message, campos de `extra`, service e version) com um custo menor por
+    registro: os campos fixos são montados uma única vez, o timestamp reutiliza
+    o prefixo do segundo corrente (em vez de `datetime.utcnow().isoformat()`) e
+    a serialização é feita pelo orjson. Os campos de origem (pathname, lineno,
+    funcName) só são incluídos com `caller_info=True`.
+
+    Attributes:
+        caller_info (bool): Inclui pathname, lineno e funcName em cada log
+    """
+    def __init__(self, service: str = "book-flow-api", version: str = "1.0.0", caller_info: bool = False):
+        super().__init__()
+        self.caller_info = caller_info
+        self._static = {"service": service, "version": version}
+        self._second: Optional[int] = None
+        self._second_prefix = ""
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        if second != self._second:
+            self._second_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = second
+        return f"{self._second_prefix}.{int((created - second) * 1e6):06d}"
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_record = {
+            "timestamp": self._timestamp(record.created),
+            "level": record.levelname,
+            "name": record.name,
+            "message": record.getMessage(),
+        }
+        if self.caller_info:
+            log_record["pathname"] = record.pathname
+            log_record["lineno"] = record.lineno
+            log_record["funcName"] = record.funcName
+        if record.exc_info:
+            log_record["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_record["exc_info"] = record.exc_text
+        if record.stack_info:
+            log_record["stack_info"] = record.stack_info
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                log_record[key] = value
+        log_record.update(self._static)
+        return orjson.dumps(log_record, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+# Formata tracebacks na thread de quem loga (os frames não sobrevivem até o listener)
+_exception_formatter = logging.Formatter()
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler com fila limitada e política para fila cheia.
+
+    O `prepare` só resolve o que depende do contexto de quem loga (mensagem com
+    argumentos e texto da exceção, que referencia frames vivos); a serialização
+    JSON fica para o handler de saída, na thread do QueueListener. Assim como no
+    `QueueHandler` da biblioteca padrão, o registro enfileirado é uma cópia: os
+    demais handlers continuam recebendo `args` e `exc_info` originais.
+
+    Attributes:
+        policy (str): "drop" descarta o registro com a fila cheia; "block" espera espaço
+        dropped (int): Total de registros descartados por fila cheia
+    """
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop"):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
 handler = logging.StreamHandler(sys.stdout)
-formatter = CustomJsonFormatter(
-    '%(timestamp)s %(level)s %(name)s %(message)s %(pathname)s %(lineno)d %(funcName)s'
-)
+formatter = FastJsonFormatter(caller_info=LOG_CALLER_INFO)
 handler.setFormatter(formatter)
 handler.setLevel(logging.DEBUG)
 
 root_logger = logging.getLogger()
 root_logger.handlers.clear()
-root_logger.addHandler(handler)
-root_logger.setLevel(logging.DEBUG)
+root_logger.setLevel(LOG_LEVEL)
+
+# Com a escrita assíncrona, o root logger só enfileira; o listener formata e escreve em stdout
+queue_handler = None
+queue_listener = None
+# Se a thread do QueueListener está em execução (stop_logging a encerra uma única vez)
+_listener_running = False
+if LOG_ASYNC_ENABLED:
+    queue_handler = BoundedQueueHandler(queue.Queue(LOG_QUEUE_SIZE), LOG_QUEUE_POLICY)
+    queue_listener = QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    queue_listener.start()
+    _listener_running = True
+    root_logger.addHandler(queue_handler)
+else:
+    root_logger.addHandler(handler)
+
+def stop_logging() -> None:
+    """
+    Escreve os registros pendentes na fila e encerra a thread de escrita dos logs.
+
+    Pode ser chamada mais de uma vez (ex.: no shutdown da aplicação e ao sair do processo).
+    """
+    global _listener_running
+    if _listener_running:
+        _listener_running = False
+        queue_listener.stop()
+
+atexit.register(stop_logging)
 
 logging.getLogger("uvicorn").setLevel(logging.WARNING)
 logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
 Logger = logging.getLogger("BookFlow")
-Logger.setLevel(logging.DEBUG)
+Logger.setLevel(LOG_LEVEL)
 
 def get_logger(name: str) -> logging.Logger:
     """
@@ -69,12 +240,69 @@ def get_logger(name: str) -> logging.Logger:
     """
     return logging.getLogger(f"BookFlow.{name}")
 
-def log_request(method: str, path: str, status_code: int, duration: float, user_id: str = None, **kwargs):
+def request_sample_rate(path: str) -> float:
+    """
+    Obtém a taxa de amostragem dos logs de requisição para um caminho.
+
+    Usa o prefixo mais longo de LOG_ROUTE_SAMPLE_RATES que corresponde ao
+    caminho; caminhos sem prefixo configurado são sempre registrados (1.0).
+
+    Args:
+        path (str): Caminho da requisição (ex: "/api/v1/health")
+
+    Returns:
+        float: Fração das requisições registradas, entre 0.0 e 1.0
+    """
+    best, rate = -1, 1.0
+    for prefix, prefix_rate in LOG_ROUTE_SAMPLE_RATES.items():
+        matches = prefix == "/" or path == prefix or path.startswith(prefix + "/")
+        if matches and len(prefix) > best:
+            best, rate = len(prefix), prefix_rate
+    return rate
+
+def sample_request(path: str) -> bool:
+    """
+    Sorteia se os logs de uma requisição serão registrados (amostragem por rota).
+
+    Args:
+        path (str): Caminho da requisição
+
+    Returns:
+        bool: True se a requisição foi amostrada
+    """
+    rate = request_sample_rate(path)
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+def request_log_level(status_code: int, duration_ms: float, sampled: bool) -> int:
+    """
+    Define o nível do log de término de uma requisição segundo a política de logging.
+
+    Respostas 5xx são sempre registradas como ERROR e requisições acima de
+    LOG_SLOW_REQUEST_MS como WARNING, mesmo fora da amostragem; as demais
+    são registradas como INFO apenas se a requisição foi amostrada.
+
+    Args:
+        status_code (int): Código de status HTTP da resposta
+        duration_ms (float): Duração da requisição em milissegundos
+        sampled (bool): Se a requisição foi amostrada (ver `sample_request`)
+
+    Returns:
+        int: Nível do log, ou logging.NOTSET se a requisição não deve ser registrada
+    """
+    if status_code >= 500:
+        return logging.ERROR
+    if duration_ms >= LOG_SLOW_REQUEST_MS:
+        return logging.WARNING
+    return logging.INFO if sampled else logging.NOTSET
+
+def log_request(method: str, path: str, status_code: int, duration: float, user_id: str = None,
+                level: int = logging.INFO, **kwargs):
     """
     Registra uma requisição HTTP com informações detalhadas.
 
     Cria um log estruturado para requisições HTTP, incluindo método, caminho,
-    código de status, duração e informações do usuário.
+    código de status, duração e informações do usuário. O dicionário de campos
+    só é montado se o nível estiver habilitado.
 
     Args:
         method (str): Método HTTP da requisição (GET, POST, etc.)
@@ -82,10 +310,14 @@ def log_request(method: str, path: str, status_code: int, duration: float, user_
         status_code (int): Código de status HTTP da resposta
         duration (float): Duração da requisição em segundos
         user_id (str, optional): ID do usuário autenticado (se disponível)
+        level (int): Nível do log. Padrão: logging.INFO
         **kwargs: Campos adicionais para incluir no log (request_id, client_ip, etc.)
     """
     logger = get_logger("http")
-    logger.info(
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(
+        level,
         "HTTP Request",
         extra={
             "http_method": method,
@@ -0,0 +1,141 @@
+"""
+Módulo de métricas Prometheus da aplicação.
+
+Este módulo centraliza as métricas de domínio expostas em `/metrics`, além das
+métricas HTTP padrão geradas pelo prometheus-fastapi-instrumentator. Todas as
+métricas usam o prefixo `bookflow_` e labels de baixa cardinalidade: rotas
+sempre pelo template (ex.: `/api/v1/books/{book_id}`), nunca pelo caminho bruto.
+
+Com vários workers do uvicorn, cada processo tem o seu registro e um scrape de
+`/metrics` veria apenas o worker que o atendeu. Com PROMETHEUS_MULTIPROC_DIR
+definido (antes de importar o prometheus_client), cada processo grava suas
+métricas em arquivos nesse diretório e `metrics_response` agrega todos os
+workers. O diretório deve ser esvaziado antes de iniciar os workers (ver
+Dockerfile).
+"""
+import os
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+# Diretório compartilhado entre os workers (modo multiprocesso); vazio = registro do processo
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+# Micro-batching de predições online
+ML_MICROBATCH_QUEUE_DEPTH = Gauge(
+    "bookflow_ml_microbatch_queue_depth",
+    "Predições aguardando o próximo lote do micro-batcher",
+    ["model_type"],
+    multiprocess_mode="livesum"
+)
+ML_MICROBATCH_BATCH_SIZE = Histogram(
+    "bookflow_ml_microbatch_batch_size",
+    "Quantidade de predições executadas em cada lote do micro-batcher",
+    ["model_type"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+)
+
+# Cache de predições online
+ML_PREDICTION_CACHE_REQUESTS = Counter(
+    "bookflow_ml_prediction_cache_requests_total",
+    "Consultas ao cache de predições por resultado (hit ou miss)",
+    ["model_type", "result"]
+)
+
+# Coalescência de requisições (single-flight)
+SINGLEFLIGHT_CALLS = Counter(
+    "bookflow_singleflight_calls_total",
+    "Chamadas single-flight por resultado (executed: executou o cálculo; coalesced: aguardou um cálculo em andamento)",
+    ["operation", "result"]
+)
+
+# Logging assíncrono (fila limitada do QueueHandler)
+LOG_RECORDS_DROPPED = Counter(
+    "bookflow_log_records_dropped_total",
+    "Registros de log descartados porque a fila de escrita estava cheia (LOG_QUEUE_POLICY=drop)"
+)
+
+# Latência por etapa da requisição (spans de core.timing); rota = template, nunca o caminho bruto
+REQUEST_STAGE_DURATION = Histogram(
+    "bookflow_request_stage_duration_seconds",
+    "Duração de cada etapa da requisição (auth, db, convert, serialize) por rota",
+    ["route", "stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+# Consultas SQL (hooks do engine em core.database)
+REQUEST_DB_QUERIES = Histogram(
+    "bookflow_request_db_queries",
+    "Consultas SQL executadas por requisição, por rota",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+)
+DB_QUERY_DURATION = Histogram(
+    "bookflow_db_query_duration_seconds",
+    "Duração das consultas SQL por instrução normalizada (literais e parâmetros substituídos por ?)",
+    ["statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+# Scraping (rate(bookflow_scrape_pages_total[1m]) = páginas por segundo)
+SCRAPE_PAGES = Counter(
+    "bookflow_scrape_pages_total",
+    "Páginas processadas pelo scraping por resultado (saved: salva no banco; error: erro ao salvar)",
+    ["result"]
+)
+SCRAPE_PAGE_DURATION = Histogram(
+    "bookflow_scrape_page_duration_seconds",
+    "Duração do download e parsing de uma página do scraping",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+BOOKS_SAVED = Counter(
+    "bookflow_books_saved_total",
+    "Livros salvos (inseridos ou atualizados) no banco pelo scraping"
+)
+
+# Catálogo
+CATALOG_BOOKS = Gauge(
+    "bookflow_catalog_books",
+    "Livros no snapshot do catálogo em memória",
+    multiprocess_mode="livemostrecent"
+)
+
+# Machine learning
+ML_FEATURE_BUILD_DURATION = Histogram(
+    "bookflow_ml_feature_build_duration_seconds",
+    "Duração da construção dos datasets de ML a partir do catálogo (sem cache)",
+    ["dataset"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+ML_PREDICTION_DURATION = Histogram(
+    "bookflow_ml_prediction_duration_seconds",
+    "Latência das predições por tipo de modelo e modo (online ou batch), incluindo respostas do cache",
+    ["model_type", "mode"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+def metrics_response() -> Response:
+    """
+    Gera a resposta do endpoint `/metrics` no formato de texto do Prometheus.
+
+    Em modo multiprocesso (PROMETHEUS_MULTIPROC_DIR), agrega as métricas de
+    todos os workers a partir dos arquivos do diretório compartilhado; caso
+    contrário, usa o registro do processo.
+
+    Returns:
+        Response: Métricas com o content type do Prometheus
+    """
+    registry = REGISTRY
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=PROMETHEUS_MULTIPROC_DIR)
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+def mark_worker_dead() -> None:
+    """
+    Remove os gauges `live*` do worker atual (modo multiprocesso), chamado no shutdown.
+
+    Sem isso, o último valor de um worker encerrado continuaria somado aos
+    gauges (ex.: fila do micro-batcher) até o diretório ser esvaziado.
+    """
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
@@ -1,141 +1,347 @@
 """
 Módulo de middlewares para requisições HTTP.
 
-Este módulo contém middlewares que interceptam requisições HTTP para adicionar
-funcionalidades transversais como logging, rastreamento de requisições, métricas
-e extração de contexto de autenticação.
+Este módulo contém middlewares ASGI que interceptam requisições HTTP para adicionar
+funcionalidades transversais como logging, rastreamento de requisições, métricas,
+extração de contexto de autenticação, cache HTTP (ETag) do catálogo e profiling
+de requisições (`?profile=1`).
 """
+import hashlib
+import os
 import time
 import uuid
 import logging
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-from .logger import log_request, log_error, get_logger
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .logger import log_request, log_error, get_logger, request_log_level, request_sample_rate, sample_request
+from .metrics import REQUEST_DB_QUERIES, REQUEST_STAGE_DURATION
+from .security.security import decode_access_token, is_admin
+from .errors import ErrorResponse
+from .profiler import StackSampler, profiling_lock
+from .timing import current_timings, reset_request_timings, server_timing_header, span, start_request_timings
+from .catalog_version import catalog_version_watcher
 
+# Tempo (segundos) que clientes podem reutilizar uma resposta do catálogo sem revalidar
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "60"))
+# Prefixos dos endpoints de leitura do catálogo que recebem ETag e Cache-Control
+HTTP_CACHE_PATHS = ("/api/v1/books", "/api/v1/categories", "/api/v1/stats")
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+# Compressão gzip das respostas (GZipMiddleware do Starlette)
+GZIP_ENABLED = os.getenv("GZIP_ENABLED", "true").lower() == "true"
+# Tamanho mínimo (bytes) do corpo para comprimir; respostas menores seguem sem compressão
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+# Nível de compressão (1 = mais rápido, 9 = menor payload)
+GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", "5"))
+
+
+class RequestObservabilityMiddleware:
     """
-    Middleware para logging detalhado de requisições HTTP.
+    Middleware ASGI de observabilidade das requisições HTTP.
+
+    Substitui os antigos LoggingMiddleware, RequestContextMiddleware e
+    MetricsMiddleware (baseados em BaseHTTPMiddleware, que criavam uma task e
+    reempacotavam o corpo da resposta a cada camada) por uma única passagem:
+
+    - Gera o `request_id` e o devolve no header `X-Request-ID`
+    - Extrai o contexto de autenticação do header Authorization (token JWT)
+    - Registra o início (DEBUG) e o término da requisição (status, duração, tamanho)
+      segundo a política de logging: amostragem por rota, com erros 5xx e
+      requisições lentas sempre registrados (ver `core.logger`)
+    - Adiciona o header `X-Process-Time-ms` (tempo até o início da resposta)
+    - Coleta a latência por etapa e as consultas SQL (`core.timing`): header
+      `Server-Timing` e histogramas por rota (template) e etapa
+    - Registra erros não tratados durante o processamento
 
-    Este middleware intercepta todas as requisições HTTP para registrar:
-    - Início da requisição (método, caminho, query params, IP, user-agent)
-    - Término da requisição (status code, duração, tamanho da resposta)
-    - Erros durante o processamento
-    - Geração de request_id único para rastreamento
+    Por ser ASGI puro, as mensagens da resposta passam sem cópia: respostas em
+    streaming (NDJSON) continuam em streaming e o GZipMiddleware vê o corpo
+    completo das respostas comuns (aplicando `GZIP_MINIMUM_SIZE`).
+
+    Adiciona ao request.state (`scope["state"]`):
+        - request_id: Identificador único da requisição
+        - user_id: ID do usuário extraído do token (payload.sub)
+        - username: Nome de usuário extraído do token (payload.username)
+        - auth_token / auth_claims: Token e claims já verificados, reutilizados
+          pela dependency `get_current_user` (a assinatura é verificada uma vez)
 
     Attributes:
+        app: Aplicação ASGI envolvida
         logger: Logger configurado para este middleware
     """
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
         self.logger = get_logger("middleware")
-        self.logger.setLevel(logging.DEBUG)
 
-    async def dispatch(self, request: Request, call_next):
-        request_id = str(uuid.uuid4())
+    @staticmethod
+    def _auth_context(authorization: str) -> dict:
+        if not authorization or not authorization.startswith("Bearer "):
+            return {}
+        try:
+            token = authorization.split(" ")[1]
+            payload = decode_access_token(token)
+            if payload:
+                return {
+                    "user_id": payload.get("sub"),
+                    "username": payload.get("username"),
+                    "auth_token": token,
+                    "auth_claims": payload,
+                }
+        except Exception:
+            pass
+        return {}
 
-        start_time = time.time()
-        method = request.method
-        path = request.url.path
-        query_params = str(request.query_params) if request.query_params else None
-        client_ip = request.client.host if request.client else None
-        user_agent = request.headers.get("user-agent")
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        request.state.request_id = request_id
+        start_time = time.perf_counter()
+        request_id = str(uuid.uuid4())
+        headers = Headers(scope=scope)
+        method = scope["method"]
+        path = scope["path"]
+        query_params = scope.get("query_string", b"").decode("latin-1") or None
+        client_ip = scope["client"][0] if scope.get("client") else None
 
-        self.logger.info(
-            "Request started",
-            extra={
-                "request_id": request_id,
-                "http_method": method,
-                "http_path": path,
-                "query_params": query_params,
-                "client_ip": client_ip,
-                "user_agent": user_agent,
-                "event": "request_start"
-            }
-        )
+        timings_token = start_request_timings(request_id)
+        timings = current_timings()
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        with span("auth"):
+            state.update(self._auth_context(headers.get("authorization")))
 
-        try:
-            response = await call_next(request)
-            duration = time.time() - start_time
-            user_id = getattr(request.state, 'user_id', None)
-
-            log_request(
-                method=method,
-                path=path,
-                status_code=response.status_code,
-                duration=duration,
-                user_id=user_id,
-                request_id=request_id,
-                client_ip=client_ip,
-                query_params=query_params,
-                response_size=response.headers.get("content-length"),
-                event="request_complete"
+        # Amostragem por rota decidida no início: início e término da mesma requisição ficam juntos
+        sampled = sample_request(path)
+        if sampled and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(
+                "Request started",
+                extra={
+                    "request_id": request_id,
+                    "http_method": method,
+                    "http_path": path,
+                    "query_params": query_params,
+                    "client_ip": client_ip,
+                    "user_agent": headers.get("user-agent"),
+                    "event": "request_start"
+                }
             )
 
-            response.headers["X-Request-ID"] = request_id
+        response = {"status_code": 500, "size": None}
 
-            return response
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status_code"] = message["status"]
+                response_headers = MutableHeaders(raw=message.setdefault("headers", []))
+                response["size"] = response_headers.get("content-length")
+                response_headers["X-Request-ID"] = request_id
+                elapsed = time.perf_counter() - start_time
+                response_headers["X-Process-Time-ms"] = str(round(elapsed * 1000, 2))
+                response_headers["Server-Timing"] = server_timing_header(timings, total=elapsed)
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                duration = time.perf_counter() - start_time
+                # Template da rota (ex.: /api/v1/books/{book_id}), preenchido pelo roteamento do FastAPI
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                for stage, stage_duration in timings.spans.items():
+                    REQUEST_STAGE_DURATION.labels(route=route, stage=stage).observe(stage_duration)
+                REQUEST_DB_QUERIES.labels(route=route).observe(timings.db_queries)
+                level = request_log_level(response["status_code"], duration * 1000, sampled)
+                if level != logging.NOTSET:
+                    log_request(
+                        method=method,
+                        path=path,
+                        status_code=response["status_code"],
+                        duration=duration,
+                        user_id=state.get("user_id"),
+                        level=level,
+                        request_id=request_id,
+                        client_ip=client_ip,
+                        query_params=query_params,
+                        response_size=response["size"],
+                        sample_rate=request_sample_rate(path),
+                        db_queries=timings.db_queries,
+                        db_time_ms=round(timings.db_seconds * 1000, 2),
+                        event="request_complete"
+                    )
+            await send(message)
 
+        try:
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            duration = time.time() - start_time
-
             log_error(
                 error=e,
                 context="HTTP Request",
                 request_id=request_id,
                 http_method=method,
                 http_path=path,
-                duration_ms=round(duration * 1000, 2),
+                duration_ms=round((time.perf_counter() - start_time) * 1000, 2),
                 client_ip=client_ip,
                 event="request_error"
             )
+            raise
+        finally:
+            reset_request_timings(timings_token)
 
-            raise e
+class CatalogETagMiddleware:
+    """
+    Middleware de cache HTTP (ETag/If-None-Match) para os endpoints de leitura do catálogo.
+
+    As respostas de `/books`, `/categories`, `/stats/*` e `/books/top-rated` só
+    mudam quando a versão do catálogo muda (ver `core.catalog_version`). O ETag
+    (fraco) é calculado a partir da versão do catálogo, do caminho, dos query
+    params e do formato pedido (JSON ou NDJSON), então pode ser verificado antes de executar a rota: se o cliente
+    envia um `If-None-Match` correspondente, a resposta é 304 sem ida ao banco.
 
+    O 304 só é respondido para requisições autenticadas (`request.state.user_id`
+    preenchido pelo RequestObservabilityMiddleware, que deve envolver este middleware);
+    requisições sem token válido seguem para a rota e recebem 401. Respostas 200
+    recebem `ETag`, `Cache-Control: private, max-age=HTTP_CACHE_MAX_AGE` e
+    `Vary: Authorization, Accept`.
 
-class RequestContextMiddleware(BaseHTTPMiddleware):
+    Respostas autenticadas também recebem `X-Cache-Key` (usuário do token,
+    caminho e query params normalizados). O micro-cache do nginx só armazena
+    respostas que trazem esse header, e sua chave inclui o token, então dados de
+    um usuário nunca são servidos a outro.
     """
-    Middleware para extração de contexto de autenticação.
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-    Este middleware extrai informações do token JWT do header Authorization
-    e adiciona ao estado da requisição para uso posterior nos handlers.
+    @staticmethod
+    def _is_catalog_read(request: Request) -> bool:
+        if request.method not in ("GET", "HEAD"):
+            return False
+        path = request.url.path.rstrip("/")
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in HTTP_CACHE_PATHS)
 
-    Adiciona ao request.state:
-        - user_id: ID do usuário extraído do token (payload.sub)
-        - username: Nome de usuário extraído do token (payload.username)
-    """
-    async def dispatch(self, request: Request, call_next):
-        authorization = request.headers.get("authorization")
-        if authorization and authorization.startswith("Bearer "):
-            try:
-                from ..core.security.security import decode_access_token
-                token = authorization.split(" ")[1]
-                payload = decode_access_token(token)
-                if payload:
-                    request.state.user_id = payload.get("sub")
-                    request.state.username = payload.get("username")
-            except Exception:
-                pass
-
-        response = await call_next(request)
-        return response
-
-class MetricsMiddleware(BaseHTTPMiddleware):
+    @staticmethod
+    def _resource(request: Request) -> str:
+        query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+        # JSON e NDJSON são representações diferentes do mesmo recurso
+        media = "|ndjson" if "application/x-ndjson" in request.headers.get("accept", "") else ""
+        return f"{request.url.path}?{query}{media}"
+
+    @staticmethod
+    def _etag(resource: str, version: int) -> str:
+        digest = hashlib.sha1(resource.encode()).hexdigest()[:16]
+        return f'W/"{version}-{digest}"'
+
+    @staticmethod
+    def _matches(if_none_match: str, etag: str) -> bool:
+        # Comparação fraca (RFC 9110): ignora o prefixo W/
+        candidates = [value.strip() for value in if_none_match.split(",")]
+        return "*" in candidates or etag[2:] in (value.removeprefix("W/") for value in candidates)
+
+    def _cache_headers(self, etag: str, resource: str, user_id) -> dict:
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"private, max-age={HTTP_CACHE_MAX_AGE}",
+            "Vary": "Authorization, Accept",
+        }
+        if user_id:
+            headers["X-Cache-Key"] = f"{user_id}:{resource}"
+        return headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope)
+        if not self._is_catalog_read(request):
+            await self.app(scope, receive, send)
+            return
+
+        resource = self._resource(request)
+        etag = self._etag(resource, catalog_version_watcher.version)
+        user_id = getattr(request.state, "user_id", None)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and user_id and self._matches(if_none_match, etag):
+            response = Response(status_code=304, headers=self._cache_headers(etag, resource, user_id))
+            await response(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                MutableHeaders(raw=message.setdefault("headers", [])).update(
+                    self._cache_headers(etag, resource, user_id)
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+class RequestProfilerMiddleware:
     """
-    Middleware para adicionar métricas de desempenho às respostas.
+    Middleware ASGI do modo de profiling por requisição (`?profile=1`).
+
+    Registrado apenas com PROFILING_ENABLED=true. Quando um administrador
+    (ADMIN_USERS) envia `profile=1` nos query params, a requisição é executada
+    normalmente com o StackSampler ativo e a resposta da rota é substituída
+    pelas pilhas amostradas (texto, formato collapsed stacks). O status
+    original vai no header `X-Profile-Status`. Para outros usuários o parâmetro
+    é ignorado e a requisição segue sem profiling.
 
-    Este middleware calcula o tempo de processamento de cada requisição
-    e adiciona um header customizado `X-Process-Time-ms` na resposta.
+    Todas as threads do worker são amostradas, então requisições concorrentes
+    também aparecem no resultado. Deve ficar dentro do RequestObservabilityMiddleware
+    (usa `request.state.auth_claims`).
 
-    O tempo é calculado em milissegundos e arredondado para 2 casas decimais.
+    Attributes:
+        app: Aplicação ASGI envolvida
+        logger: Logger configurado para este middleware
     """
-    async def dispatch(self, request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        duration = (time.time() - start_time) * 1000  # em ms
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.logger = get_logger("profiler")
 
-        response.headers["X-Process-Time-ms"] = str(round(duration, 2))
-        return response
\ No newline at end of file
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or b"profile=" not in scope.get("query_string", b"")
+            or QueryParams(scope["query_string"]).get("profile") != "1"
+            or not is_admin(scope.get("state", {}).get("auth_claims"))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if not profiling_lock.acquire(blocking=False):
+            response = JSONResponse(
+                status_code=409,
+                content=ErrorResponse(
+                    detail="Já existe um profile em execução neste worker",
+                    code="409",
+                    path=scope["path"],
+                ).model_dump(),
+            )
+            await response(scope, receive, send)
+            return
+
+        original = {"status_code": 500}
+
+        async def discard(message: Message) -> None:
+            # O corpo da rota é descartado; só o status é mantido
+            if message["type"] == "http.response.start":
+                original["status_code"] = message["status"]
+
+        try:
+            with StackSampler() as sampler:
+                await self.app(scope, receive, discard)
+        finally:
+            profiling_lock.release()
+
+        self.logger.info(
+            "Request profile completed",
+            extra={
+                "event": "request_profile_complete",
+                "http_path": scope["path"],
+                "http_status_code": original["status_code"],
+                "duration_ms": round(sampler.duration * 1000, 2),
+                "ticks": sampler.ticks,
+            }
+        )
+        response = PlainTextResponse(
+            sampler.collapsed(),
+            headers={
+                "X-Profile-Status": str(original["status_code"]),
+                "X-Profile-Samples": str(sampler.ticks),
+                "X-Profile-Duration-ms": str(round(sampler.duration * 1000, 2)),
+            },
+        )
+        await response(scope, receive, send)
@@ -3,7 +3,7 @@ Módulo de modelos de dados do banco de dados.
 
 Este módulo define os modelos SQLAlchemy que representam as tabelas do banco de dados.
 """
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime
 from sqlalchemy.sql import func
 from m1_ml_book_flow_api.core.database import Base
 
@@ -48,3 +48,21 @@ class BookDB(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+class CatalogVersionDB(Base):
+    """
+    Modelo que representa a versão do catálogo de livros no banco de dados.
+    
+    A tabela 'catalog_version' possui uma única linha (id = 1) cuja versão é
+    incrementada na mesma transação de cada commit que altera o catálogo. Os
+    processos da API usam essa versão para invalidar seus caches.
+    
+    Attributes:
+        id (int): ID da linha (sempre 1)
+        version (int): Versão atual do catálogo
+        updated_at (datetime, optional): Data e hora da última alteração (automático)
+    """
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
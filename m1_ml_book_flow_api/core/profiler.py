@@ -0,0 +1,136 @@
+"""
+Módulo de profiling por amostragem de pilhas do worker em execução.
+
+O StackSampler roda em uma thread de fundo e, a cada `interval` segundos, lê
+as pilhas de todas as threads do processo com `sys._current_frames()` (só a
+biblioteca padrão, sem dependências nem privilégios de ptrace). As amostras
+são agregadas no formato "collapsed stacks" (uma linha por pilha distinta,
+`thread;frame;frame;... contagem`), aceito diretamente por flamegraph.pl,
+speedscope e inferno.
+
+Usado pelo endpoint administrativo `GET /api/v1/admin/profile` (perfil do
+worker por alguns segundos) e pelo modo `?profile=1` do RequestProfilerMiddleware
+(perfil de uma única requisição). Ambos só existem com PROFILING_ENABLED. Só um
+profile roda por vez em cada worker (`profiling_lock`).
+
+Por padrão pilhas ociosas (event loop esperando no `select`, threads do
+threadpool esperando trabalho) são descartadas, para que o flamegraph mostre
+apenas onde o worker gasta CPU ou espera I/O da aplicação.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+# Endpoint administrativo e modo `?profile=1` por requisição (apenas administradores)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+# Duração máxima (segundos) de um profile pelo endpoint administrativo
+PROFILING_MAX_SECONDS = float(os.getenv("PROFILING_MAX_SECONDS", "30"))
+# Intervalo padrão entre amostras (milissegundos)
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "5"))
+
+# Um profile por vez no worker (amostrar todas as threads em paralelo duplicaria o custo)
+profiling_lock = threading.Lock()
+
+# Frames-folha de threads paradas esperando trabalho (arquivo, função)
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+}
+
+@lru_cache(maxsize=4096)
+def _module_name(filename: str) -> str:
+    # Caminho relativo à entrada mais longa do sys.path (ex.: m1_ml_book_flow_api.core.database)
+    path = os.path.abspath(filename)
+    roots = sorted((os.path.abspath(entry) for entry in sys.path), key=len, reverse=True)
+    for root in roots:
+        if path.startswith(root + os.sep):
+            path = path[len(root) + 1:]
+            break
+    else:
+        path = os.path.basename(path)
+    return path.removesuffix(".py").replace(os.sep, ".")
+
+def _frame_label(code) -> str:
+    return f"{_module_name(code.co_filename)}:{code.co_qualname}"
+
+class StackSampler:
+    """
+    Amostrador de pilhas das threads do processo.
+
+    Pode ser usado como context manager (`with StackSampler() as sampler: ...`)
+    ou com `start()`/`stop()`. A thread do próprio amostrador nunca é amostrada.
+
+    Attributes:
+        interval (float): Intervalo entre amostras (segundos)
+        include_idle (bool): Mantém pilhas de threads ociosas
+        samples (Counter): Contagem de amostras por pilha colapsada
+        ticks (int): Quantidade de leituras das pilhas feitas
+        duration (float): Duração (segundos) da amostragem
+    """
+    def __init__(self, interval: float = PROFILING_INTERVAL_MS / 1000, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.samples: Counter = Counter()
+        self.ticks = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start = 0.0
+
+    def start(self) -> "StackSampler":
+        """Inicia a amostragem em uma thread de fundo (daemon)."""
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        """Encerra a amostragem e aguarda a thread de fundo."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._start
+        return self
+
+    def __enter__(self) -> "StackSampler":
+        return self.start()
+
+    def __exit__(self, *exc) -> bool:
+        self.stop()
+        return False
+
+    def _is_idle(self, code) -> bool:
+        return (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id or (not self.include_idle and self._is_idle(frame.f_code)):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)).replace(";", "_"))
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+            self.ticks += 1
+
+    def collapsed(self) -> str:
+        """
+        Retorna as amostras no formato collapsed stacks.
+
+        Returns:
+            str: Uma linha por pilha distinta (`thread;raiz;...;folha contagem`),
+                 ordenadas da mais amostrada para a menos amostrada
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
@@ -5,6 +5,7 @@ Este pacote contém módulos relacionados à segurança da aplicação, incluind
 - Autenticação JWT (JSON Web Tokens)
 - Criação e validação de tokens
 - Dependency injection para proteção de rotas
+- Restrição de rotas administrativas (ADMIN_USERS)
 
 Módulos disponíveis:
     - security: Funções principais para criação, validação e decodificação de tokens JWT
@@ -4,13 +4,20 @@ Módulo de segurança para autenticação JWT.
 Este módulo fornece funções para criação, validação e decodificação de tokens JWT
 (JSON Web Tokens) para autenticação de usuários. Inclui suporte para access tokens
 e refresh tokens com diferentes tempos de expiração.
+
+Access tokens já verificados ficam em um cache LRU em memória (chave: SHA-256
+do token) até o seu `exp`, evitando repetir a verificação HMAC a cada
+requisição com o mesmo token.
 """
+import hashlib
+import time
 import jwt
 from datetime import datetime, timedelta
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 import os
+from m1_ml_book_flow_api.core.cache import TTLCache
 
 # Configurações de segurança
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "supersecretkey")  # Chave secreta para assinar tokens
@@ -18,9 +25,20 @@ ALGORITHM = "HS256"  # Algoritmo de criptografia para tokens
 ACCESS_TOKEN_EXPIRE_MINUTES = 15  # Tempo de expiração do access token em minutos
 REFRESH_TOKEN_EXPIRE_DAYS = 7  # Tempo de expiração do refresh token em dias
 
+# Cache de access tokens verificados (JWT_CACHE_ENABLED=false desativa)
+JWT_CACHE_ENABLED = os.getenv("JWT_CACHE_ENABLED", "true").lower() == "true"
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+
+# Usuários (claim `sub`) com acesso aos endpoints administrativos, separados por vírgula
+# (vazio por padrão: o acesso administrativo precisa ser habilitado explicitamente)
+ADMIN_USERS = {user.strip() for user in os.getenv("ADMIN_USERS", "").split(",") if user.strip()}
+
 # Instância HTTPBearer para validação automática de tokens
 security = HTTPBearer()
 
+# Claims dos access tokens verificados, válidas até o `exp` de cada token
+token_cache = TTLCache(JWT_CACHE_SIZE if JWT_CACHE_ENABLED else 0, ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     Cria um access token JWT.
@@ -77,6 +95,11 @@ def decode_access_token(token: str):
     Valida o token JWT, verifica se não está expirado e se é do tipo "access".
     Retorna o payload decodificado se válido.
 
+    Tokens válidos são guardados no `token_cache` (chave: SHA-256 do token) até
+    o seu `exp`; apresentações seguintes do mesmo token retornam as claims sem
+    nova verificação de assinatura. Só access tokens válidos entram no cache,
+    então tokens expirados, inválidos ou de outro tipo continuam rejeitados.
+
     Args:
         token (str): Token JWT a ser decodificado
 
@@ -86,10 +109,18 @@ def decode_access_token(token: str):
     Raises:
         HTTPException 401: Se o token estiver expirado, for inválido ou não for do tipo "access"
     """
+    key = hashlib.sha256(token.encode()).digest() if token_cache.enabled else None
+    if key is not None:
+        cached = token_cache.get(key)
+        if cached is not None:
+            return dict(cached)
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         if payload.get("type") != "access":
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Tipo de token inválido")
+        remaining = payload.get("exp", 0) - time.time()
+        if key is not None and remaining > 0:
+            token_cache.set(key, dict(payload), ttl=remaining)
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expirado")
@@ -122,17 +153,26 @@ def decode_refresh_token(token: str):
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token inválido")
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     """
     Dependency do FastAPI para obter o usuário atual autenticado.
 
     Extrai o token JWT do header Authorization e valida/decodifica para
     retornar o payload com informações do usuário autenticado.
 
+    O RequestObservabilityMiddleware já verifica o token ao montar o contexto
+    da requisição e guarda as claims em `request.state.auth_claims`; se o token
+    é o mesmo das credenciais, essas claims são reutilizadas e a assinatura não
+    é verificada de novo. Sem claims no estado (token inválido ou middleware
+    ausente), o token é decodificado aqui e os erros 401 são levantados.
+    Dentro de uma requisição o FastAPI executa a dependency uma única vez, mesmo
+    declarada no router e na assinatura da rota.
+
     Esta função pode ser usada como dependency em rotas protegidas para
     garantir que apenas usuários autenticados possam acessar o endpoint.
 
     Args:
+        request (Request): Requisição atual (contexto de autenticação do middleware)
         credentials (HTTPAuthorizationCredentials): Credenciais extraídas do header Authorization
 
     Returns:
@@ -148,4 +188,41 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             return {"message": f"Olá, usuário {user_id}"}
     """
     token = credentials.credentials
+    claims = getattr(request.state, "auth_claims", None)
+    if claims is not None and getattr(request.state, "auth_token", None) == token:
+        return claims
     return decode_access_token(token)
+
+
+def is_admin(claims: Optional[dict]) -> bool:
+    """
+    Indica se as claims de um token pertencem a um administrador.
+
+    Args:
+        claims (Optional[dict]): Payload do access token (ou None, sem autenticação)
+
+    Returns:
+        bool: True se o `sub` do token está em ADMIN_USERS
+    """
+    return bool(claims) and claims.get("sub") in ADMIN_USERS
+
+def get_admin_user(current_user: dict = Depends(get_current_user)):
+    """
+    Dependency do FastAPI que restringe a rota a administradores.
+
+    Autentica com `get_current_user` e exige que o usuário (`sub`) esteja em
+    ADMIN_USERS.
+
+    Args:
+        current_user (dict): Payload do token do usuário autenticado
+
+    Returns:
+        dict: Payload do token do administrador
+
+    Raises:
+        HTTPException 401: Se o token estiver ausente, expirado ou inválido
+        HTTPException 403: Se o usuário não for administrador
+    """
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso restrito a administradores")
+    return current_user
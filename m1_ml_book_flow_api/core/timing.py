@@ -0,0 +1,134 @@
+"""
+Módulo de medição de latência por etapa da requisição (spans).
+
+Cada requisição HTTP recebe, no RequestObservabilityMiddleware, um objeto
+RequestTimings guardado em uma ContextVar. Repositórios, services e a
+serialização da resposta marcam suas etapas com `span("etapa")` (context
+manager ou decorator); as durações de uma mesma etapa são somadas. Os hooks
+de SQL do engine (`core.database`) registram cada consulta com `record_query`.
+Fora de uma requisição (scripts, startup, testes de unidade) nada é registrado.
+
+Ao fim da requisição as etapas e as consultas SQL são enviadas no header
+`Server-Timing` (visível nas ferramentas de desenvolvedor do navegador) e
+observadas nos histogramas `bookflow_request_stage_duration_seconds` (por rota
+e etapa) e `bookflow_request_db_queries` (por rota). A rota é sempre o
+template (ex.: `/api/v1/books/{book_id}`).
+
+Etapas usadas pela API:
+    - auth: verificação do token JWT
+    - db: consultas ao banco de dados
+    - convert: conversão das linhas do banco nos modelos/dicionários da API
+    - serialize: serialização JSON da resposta
+    - inference: inferência dos modelos de ML
+"""
+import time
+from contextlib import ContextDecorator
+from contextvars import ContextVar, Token
+from typing import Dict, Optional
+from fastapi.responses import ORJSONResponse
+
+class RequestTimings:
+    """
+    Medições de uma requisição.
+
+    Attributes:
+        request_id (Optional[str]): ID da requisição (para correlacionar logs de consultas lentas)
+        spans (Dict[str, float]): Durações (segundos) por etapa
+        db_queries (int): Consultas SQL executadas
+        db_seconds (float): Tempo total das consultas SQL (segundos)
+    """
+    __slots__ = ("request_id", "spans", "db_queries", "db_seconds")
+
+    def __init__(self, request_id: Optional[str] = None):
+        self.request_id = request_id
+        self.spans: Dict[str, float] = {}
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def start_request_timings(request_id: Optional[str] = None) -> Token:
+    """
+    Inicia as medições da requisição atual.
+
+    Args:
+        request_id (Optional[str]): ID da requisição
+
+    Returns:
+        Token: Token para restaurar o contexto com `reset_request_timings`
+    """
+    return _request_timings.set(RequestTimings(request_id))
+
+def reset_request_timings(token: Token) -> None:
+    """Encerra as medições iniciadas por `start_request_timings`."""
+    _request_timings.reset(token)
+
+def current_timings() -> Optional[RequestTimings]:
+    """Medições da requisição atual, ou None fora de uma requisição."""
+    return _request_timings.get()
+
+def record_query(seconds: float) -> None:
+    """
+    Registra uma consulta SQL na requisição atual (sem efeito fora de uma requisição).
+
+    Args:
+        seconds (float): Duração da consulta
+    """
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_seconds += seconds
+
+class span(ContextDecorator):
+    """
+    Mede a duração de uma etapa da requisição atual.
+
+    Pode ser usado como context manager (`with span("db"): ...`) ou decorator
+    (`@span("db")`). O dicionário da requisição é compartilhado com as threads
+    do threadpool (rotas síncronas), pois o contexto é copiado por referência.
+
+    Attributes:
+        stage (str): Nome da etapa (token do header Server-Timing, sem espaços)
+    """
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._start = 0.0
+
+    def _recreate_cm(self) -> "span":
+        # Como decorator, cada chamada usa uma instância própria (chamadas concorrentes em threads)
+        return span(self.stage)
+
+    def __enter__(self) -> "span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        elapsed = time.perf_counter() - self._start
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.spans[self.stage] = timings.spans.get(self.stage, 0.0) + elapsed
+        return False
+
+def server_timing_header(timings: RequestTimings, total: Optional[float] = None) -> str:
+    """
+    Monta o valor do header Server-Timing.
+
+    Args:
+        timings (RequestTimings): Medições da requisição
+        total (Optional[float]): Duração total (segundos), enviada como a métrica `total`
+
+    Returns:
+        str: Valor do header (ex: 'auth;dur=0.08, db;dur=3.12, sql;dur=2.9;desc="2 queries", total;dur=4.5')
+    """
+    metrics = [f"{stage};dur={duration * 1000:.2f}" for stage, duration in timings.spans.items()]
+    if timings.db_queries:
+        metrics.append(f'sql;dur={timings.db_seconds * 1000:.2f};desc="{timings.db_queries} queries"')
+    if total is not None:
+        metrics.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(metrics)
+
+class TimedORJSONResponse(ORJSONResponse):
+    """ORJSONResponse cuja serialização é registrada na etapa `serialize`."""
+    def render(self, content) -> bytes:
+        with span("serialize"):
+            return super().render(content)
@@ -6,7 +6,7 @@ todos os componentes necessários para a execução da API, incluindo:
 
 - Carregamento de variáveis de ambiente
 - Configuração da aplicação FastAPI
-- Registro de middlewares (logging, contexto, métricas)
+- Registro de middlewares (logging, contexto, métricas, cache HTTP, compressão, profiling)
 - Registro de rotas da API
 - Configuração de handlers de exceção
 - Instrumentação Prometheus para métricas
@@ -19,9 +19,10 @@ de autenticação, estatísticas, categorias, web scraping e recomendações.
 from dotenv import load_dotenv
 load_dotenv()
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 
-from .api.routes import books, auth, health, stats_overview, categories, stats_categories, top_rating, scraping, ml
+from .api.routes import books, auth, health, stats_overview, categories, stats_categories, top_rating, scraping, ml, admin, metrics
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from m1_ml_book_flow_api.core.handlers import (
@@ -30,9 +31,19 @@ from m1_ml_book_flow_api.core.handlers import (
     generic_exception_handler,
 )
 from fastapi.security import HTTPBearer
-from .core.middleware import LoggingMiddleware, RequestContextMiddleware, MetricsMiddleware
-from .core.logger import Logger
+from .core.middleware import (
+    RequestObservabilityMiddleware, CatalogETagMiddleware, RequestProfilerMiddleware,
+    GZIP_ENABLED, GZIP_MINIMUM_SIZE, GZIP_COMPRESS_LEVEL
+)
+from .core.logger import Logger, stop_logging
+from .core.timing import TimedORJSONResponse
+from .core.profiler import PROFILING_ENABLED
+from .core.metrics import mark_worker_dead
 from .core.database import init_db
+from .core.catalog_version import catalog_version_watcher
+from .api.repositories.catalog_repository import refresh_catalog
+from .ml.registry import model_registry
+from .api.services.ml_service import load_similarity_index, prediction_batcher
 
 # Instância HTTPBearer para validação de tokens JWT (não utilizada diretamente aqui,
 # mas disponível para uso em outras partes da aplicação)
@@ -46,16 +57,22 @@ API pública desenvolvida como projeto da Pós Tech em Machine Learning da FIAP.
 """,
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # Serialização JSON com orjson em todas as rotas (etapa `serialize` do Server-Timing)
+    default_response_class=TimedORJSONResponse
 )
 
 # Registro de middlewares (ordem importa - são executados na ordem inversa de registro)
-# LoggingMiddleware: Registra todas as requisições HTTP com detalhes completos
-app.add_middleware(LoggingMiddleware)
-# RequestContextMiddleware: Extrai informações de autenticação do token JWT
-app.add_middleware(RequestContextMiddleware)
-# MetricsMiddleware: Adiciona métricas de desempenho às respostas
-app.add_middleware(MetricsMiddleware)
+# CatalogETagMiddleware: ETag/304 nos endpoints de leitura do catálogo (depende do contexto de autenticação)
+app.add_middleware(CatalogETagMiddleware)
+# RequestProfilerMiddleware: modo ?profile=1 para administradores (somente com PROFILING_ENABLED)
+if PROFILING_ENABLED:
+    app.add_middleware(RequestProfilerMiddleware)
+# RequestObservabilityMiddleware: request_id, contexto de autenticação (JWT), logging e tempo de processamento
+app.add_middleware(RequestObservabilityMiddleware)
+# GZipMiddleware: Comprime respostas acima de GZIP_MINIMUM_SIZE (respostas em streaming são comprimidas por chunk)
+if GZIP_ENABLED:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
 
 # Prefixo base para todas as rotas da API
 prefix_api = "/api/v1"
@@ -70,15 +87,20 @@ app.include_router(stats_overview.router, prefix=prefix_api, tags=["stats_overvi
 app.include_router(stats_categories.router, prefix=prefix_api, tags=["stats_categories"])
 app.include_router(scraping.router, prefix=prefix_api, tags=["scraping"])
 app.include_router(ml.router, prefix=prefix_api, tags=["machine_learning"])
+# Rotas administrativas (profile do worker) só existem com PROFILING_ENABLED
+if PROFILING_ENABLED:
+    app.include_router(admin.router, prefix=prefix_api, tags=["admin"])
+app.include_router(metrics.router)
 
 # Registro de handlers de exceção para tratamento centralizado de erros
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, generic_exception_handler)
 
-# Instrumentação Prometheus para coleta de métricas da API
-# Expõe endpoint /metrics para scraping pelo Prometheus
-Instrumentator().instrument(app).expose(app, endpoint="/metrics")
+# Instrumentação Prometheus das métricas HTTP (label `handler` = template da rota; rotas
+# inexistentes agrupadas em "none"). O endpoint /metrics fica em api/routes/metrics.py,
+# que agrega os workers em modo multiprocesso (PROMETHEUS_MULTIPROC_DIR)
+Instrumentator(should_group_untemplated=True, excluded_handlers=["/metrics"]).instrument(app)
 
 @app.on_event("startup")
 async def startup_event():
@@ -92,6 +114,14 @@ async def startup_event():
     2. Importa modelos do banco de dados para garantir que sejam registrados
     3. Inicializa o banco de dados criando todas as tabelas necessárias
     4. Registra log de sucesso ou erro da inicialização do banco
+    5. Lê a versão atual do catálogo (usada nas chaves dos caches)
+    6. Constrói o snapshot em memória do catálogo usado pelos endpoints de leitura
+    7. Carrega os modelos de ML publicados no registro de modelos do worker e
+       inicia a verificação de novas versões em uma thread de fundo
+    8. Carrega o índice de similaridade do sistema de recomendação (construído
+       por um único worker e compartilhado com os demais via memória mapeada)
+    9. Inicia o acompanhamento da versão do catálogo (LISTEN/NOTIFY com polling
+       de fallback), que invalida os caches quando outro worker ou nó faz commit
 
     Se a inicialização do banco de dados falhar, o erro é registrado mas a
     aplicação continua iniciando. Isso permite que problemas de conexão sejam
@@ -102,12 +132,45 @@ async def startup_event():
     # Inicializa tabelas do banco de dados
     try:
         # Importa modelos antes de inicializar o banco para garantir que sejam registrados
-        from m1_ml_book_flow_api.core.models import BookDB  # noqa: F401
+        from m1_ml_book_flow_api.core.models import BookDB, CatalogVersionDB  # noqa: F401
         init_db()
         Logger.info("Database initialized", extra={"event": "database_init", "service": "book-flow-api"})
     except Exception as e:
         Logger.exception(f"Error initializing database: {e}", extra={"event": "database_init_error", "service": "book-flow-api"})
 
+    # Lê a versão do catálogo antes de construir snapshot e índice (evita reconstruí-los ao iniciar o watcher)
+    try:
+        catalog_version = catalog_version_watcher.check()
+        Logger.info("Catalog version loaded", extra={"event": "catalog_version_init", "catalog_version": catalog_version, "service": "book-flow-api"})
+    except Exception as e:
+        Logger.exception(f"Error reading catalog version: {e}", extra={"event": "catalog_version_init_error", "service": "book-flow-api"})
+
+    # Constrói o snapshot colunar do catálogo (categorias, estatísticas, top rated, health e ML)
+    try:
+        snapshot = refresh_catalog()
+        Logger.info("Catalog snapshot built", extra={"event": "catalog_snapshot_init", "total_books": len(snapshot), "service": "book-flow-api"})
+    except Exception as e:
+        Logger.exception(f"Error building catalog snapshot: {e}", extra={"event": "catalog_snapshot_init_error", "service": "book-flow-api"})
+
+    # Carrega os modelos de ML uma única vez por worker (mantidos em memória)
+    try:
+        versions = model_registry.load()
+        # Novas versões publicadas são carregadas em uma thread de fundo
+        model_registry.start()
+        Logger.info("ML models loaded", extra={"event": "ml_models_init", "versions": versions, "service": "book-flow-api"})
+    except Exception as e:
+        Logger.exception(f"Error loading ML models: {e}", extra={"event": "ml_models_init_error", "service": "book-flow-api"})
+
+    # Pré-calcula (ou mapeia da memória compartilhada) a tabela de vizinhos do sistema de recomendação
+    try:
+        index_info = load_similarity_index()
+        Logger.info("Similarity index loaded", extra={"event": "ml_similarity_index_init", "indexed_books": index_info["indexed_books"], "service": "book-flow-api"})
+    except Exception as e:
+        Logger.exception(f"Error loading similarity index: {e}", extra={"event": "ml_similarity_index_init_error", "service": "book-flow-api"})
+
+    # Acompanha commits do catálogo feitos por qualquer worker ou nó
+    catalog_version_watcher.start()
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """
@@ -116,8 +179,14 @@ async def shutdown_event():
     Este evento é executado quando a aplicação FastAPI está sendo encerrada,
     permitindo realizar operações de limpeza e finalização.
 
-    Atualmente registra um log informando o encerramento da aplicação.
-    Operações adicionais como fechamento de conexões ou salvamento de estado
-    podem ser adicionadas aqui conforme necessário.
+    Executa os micro-lotes de predição pendentes, registra um log informando o
+    encerramento da aplicação, encerra o acompanhamento da versão do catálogo e,
+    em modo multiprocesso do Prometheus, remove os gauges deste worker. Por
+    fim, escreve os logs pendentes na fila e encerra a thread de escrita.
     """
+    await prediction_batcher.close()
+    model_registry.stop()
+    catalog_version_watcher.stop()
+    mark_worker_dead()
     Logger.info("Shutting down BookFlow API", extra={"event": "shutdown", "service": "book-flow-api", "version": "1.0.0"})
+    stop_logging()
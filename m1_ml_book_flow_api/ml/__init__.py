@@ -0,0 +1,14 @@
+"""
+Pacote de Machine Learning da aplicação.
+
+Este pacote contém os componentes usados para treinar e servir modelos de ML
+a partir dos dados de livros, sem dependências além do NumPy.
+
+Módulos disponíveis:
+    - featurizer: Codificação das features de entrada em matrizes numéricas
+    - estimators: Estimadores (regressão e classificação) com inferência vetorizada
+    - registry: Registro de modelos carregados em memória com troca atômica de versão
+    - recommender: Recomendação por similaridade entre itens com tabela de vizinhos pré-calculada
+    - shared_arrays: Arrays NumPy publicados em memória mapeada e compartilhados entre os workers
+    - train: CLI de treinamento offline que gera os artefatos dos modelos
+"""
@@ -0,0 +1,133 @@
+"""
+Módulo de estimadores de Machine Learning.
+
+Este módulo implementa estimadores simples em NumPy, com treinamento em forma
+fechada e inferência vetorizada sobre matrizes de features:
+
+- RidgeRegressor: regressão linear com regularização L2 (rating, preço)
+- NearestCentroidClassifier: classificação pelo centróide mais próximo (categoria)
+
+Cada estimador pode ser exportado para arrays NumPy e reconstruído a partir
+deles, permitindo a serialização em artefatos `.npz`.
+"""
+from typing import Dict, Sequence, Tuple
+import numpy as np
+
+class RidgeRegressor:
+    """
+    Regressão linear com regularização L2 (Ridge).
+
+    Attributes:
+        coef (np.ndarray): Coeficientes do modelo (n_features,)
+        intercept (float): Intercepto do modelo
+    """
+    kind = "ridge"
+    algorithm = "Ridge Regression"
+
+    def __init__(self, coef: np.ndarray, intercept: float):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+
+    @classmethod
+    def fit(cls, X: np.ndarray, y: np.ndarray, alpha: float = 1.0) -> "RidgeRegressor":
+        """
+        Treina o modelo resolvendo (XᵀX + αI)w = Xᵀy com os dados centralizados.
+
+        Args:
+            X (np.ndarray): Matriz de features (n_samples, n_features)
+            y (np.ndarray): Valores alvo (n_samples,)
+            alpha (float): Intensidade da regularização L2
+
+        Returns:
+            RidgeRegressor: Modelo treinado
+        """
+        x_mean = X.mean(axis=0)
+        y_mean = float(y.mean())
+        Xc = X - x_mean
+        gram = Xc.T @ Xc + alpha * np.eye(X.shape[1])
+        coef = np.linalg.solve(gram, Xc.T @ (y - y_mean))
+        return cls(coef, y_mean - float(x_mean @ coef))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Retorna as predições para cada linha de X."""
+        return X @ self.coef + self.intercept
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {"coef": self.coef, "intercept": np.array(self.intercept)}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "RidgeRegressor":
+        return cls(arrays["coef"], float(arrays["intercept"]))
+
+class NearestCentroidClassifier:
+    """
+    Classificador pelo centróide mais próximo.
+
+    A confiança de cada predição é a probabilidade softmax das distâncias
+    negativas aos centróides de cada classe.
+
+    Attributes:
+        classes (np.ndarray): Rótulos das classes
+        centroids (np.ndarray): Centróides de cada classe (n_classes, n_features)
+    """
+    kind = "nearest_centroid"
+    algorithm = "Nearest Centroid"
+
+    def __init__(self, classes: Sequence[str], centroids: np.ndarray):
+        self.classes = np.asarray(classes, dtype=str)
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self._centroid_norms = (self.centroids ** 2).sum(axis=1)
+
+    @classmethod
+    def fit(cls, X: np.ndarray, labels: Sequence[str]) -> "NearestCentroidClassifier":
+        """
+        Treina o classificador calculando o centróide de cada classe.
+
+        Args:
+            X (np.ndarray): Matriz de features (n_samples, n_features)
+            labels (Sequence[str]): Rótulo de cada amostra
+
+        Returns:
+            NearestCentroidClassifier: Classificador treinado
+        """
+        classes, codes = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+        sums = np.zeros((len(classes), X.shape[1]))
+        np.add.at(sums, codes, X)
+        counts = np.bincount(codes, minlength=len(classes)).reshape(-1, 1)
+        return cls(classes, sums / counts)
+
+    def predict_with_confidence(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retorna a classe prevista e a confiança para cada linha de X.
+
+        Args:
+            X (np.ndarray): Matriz de features (n_samples, n_features)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Rótulos previstos e scores de confiança (0-1)
+        """
+        # Distância euclidiana ao quadrado: ||x||² - 2x·c + ||c||²
+        distances = (X ** 2).sum(axis=1, keepdims=True) - 2 * X @ self.centroids.T + self._centroid_norms
+        logits = -distances
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        return self.classes[best], probabilities[np.arange(len(best)), best]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Retorna a classe prevista para cada linha de X."""
+        return self.predict_with_confidence(X)[0]
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {"classes": self.classes, "centroids": self.centroids}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "NearestCentroidClassifier":
+        return cls(arrays["classes"], arrays["centroids"])
+
+# Estimadores disponíveis, indexados pelo identificador salvo no artefato
+ESTIMATORS = {
+    RidgeRegressor.kind: RidgeRegressor,
+    NearestCentroidClassifier.kind: NearestCentroidClassifier,
+}
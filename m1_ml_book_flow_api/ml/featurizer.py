@@ -0,0 +1,159 @@
+"""
+Módulo de codificação de features para os modelos de ML.
+
+Este módulo converte as features de entrada (no mesmo formato de
+`TrainingRecord.features` e `PredictionRequest.input_features`) em matrizes
+NumPy padronizadas, prontas para inferência vetorizada.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+# Valores padrão usados quando uma feature não é informada
+DEFAULT_FEATURE_VALUES = {
+    "title_length": 0,
+    "year": 2000,
+    "price": 0.0,
+    "available": True,
+    "category": "unknown",
+}
+
+def rows_to_columns(rows: Sequence[Dict[str, Any]], columns: Sequence[str]) -> Dict[str, List[Any]]:
+    """
+    Converte uma lista de linhas (dicionários) em formato colunar.
+
+    Args:
+        rows (Sequence[Dict[str, Any]]): Linhas de features
+        columns (Sequence[str]): Colunas a extrair
+
+    Returns:
+        Dict[str, List[Any]]: Dicionário coluna -> lista de valores (None se ausente)
+    """
+    return {column: [row.get(column) for row in rows] for column in columns}
+
+def numeric_column(values: Sequence[Any], default: float) -> np.ndarray:
+    """Converte uma coluna em array float, substituindo valores ausentes pelo padrão."""
+    return np.fromiter(
+        (float(value) if value is not None else default for value in values),
+        dtype=np.float64,
+        count=len(values)
+    )
+
+class FeatureEncoder:
+    """
+    Codificador de features numéricas e categóricas.
+
+    Padroniza as colunas numéricas (média 0, desvio 1) e aplica one-hot encoding
+    na categoria, usando o vocabulário observado no treinamento. Categorias
+    desconhecidas geram um vetor nulo.
+
+    Attributes:
+        numeric_columns (List[str]): Colunas numéricas usadas pelo modelo
+        categories (List[str]): Vocabulário de categorias (vazio se não usa categoria)
+        mean (np.ndarray): Média de cada coluna numérica no treinamento
+        scale (np.ndarray): Desvio padrão de cada coluna numérica no treinamento
+    """
+    def __init__(self, numeric_columns: List[str], categories: List[str], mean: np.ndarray, scale: np.ndarray):
+        self.numeric_columns = list(numeric_columns)
+        self.categories = list(categories)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self._category_index = {category: idx for idx, category in enumerate(self.categories)}
+
+    @property
+    def n_features(self) -> int:
+        """Quantidade de colunas da matriz gerada."""
+        return len(self.numeric_columns) + len(self.categories)
+
+    @property
+    def input_columns(self) -> List[str]:
+        """Colunas de entrada lidas pelo codificador."""
+        return self.numeric_columns + (["category"] if self.categories else [])
+
+    @classmethod
+    def fit(cls, columns: Dict[str, Sequence[Any]], numeric_columns: List[str], use_category: bool = True) -> "FeatureEncoder":
+        """
+        Ajusta o codificador a partir de dados em formato colunar.
+
+        Args:
+            columns (Dict[str, Sequence[Any]]): Dados de treinamento por coluna
+            numeric_columns (List[str]): Colunas numéricas a usar
+            use_category (bool): Se deve aplicar one-hot na coluna "category"
+
+        Returns:
+            FeatureEncoder: Codificador ajustado
+        """
+        raw = np.column_stack([
+            numeric_column(columns[name], DEFAULT_FEATURE_VALUES[name]) for name in numeric_columns
+        ])
+        mean = raw.mean(axis=0)
+        scale = raw.std(axis=0)
+        scale[scale == 0] = 1.0
+        categories = []
+        if use_category:
+            categories = sorted({str(value) for value in columns["category"] if value is not None})
+        return cls(numeric_columns, categories, mean, scale)
+
+    def transform_columns(self, columns: Dict[str, Sequence[Any]], n_rows: Optional[int] = None) -> np.ndarray:
+        """
+        Codifica dados em formato colunar em uma matriz (n_rows, n_features).
+
+        Colunas ausentes são preenchidas com os valores padrão.
+
+        Args:
+            columns (Dict[str, Sequence[Any]]): Dados por coluna
+            n_rows (Optional[int]): Quantidade de linhas (inferida das colunas se None)
+
+        Returns:
+            np.ndarray: Matriz de features codificadas
+        """
+        if n_rows is None:
+            n_rows = len(next(iter(columns.values()))) if columns else 0
+        n_numeric = len(self.numeric_columns)
+        matrix = np.zeros((n_rows, self.n_features), dtype=np.float64)
+        for idx, name in enumerate(self.numeric_columns):
+            values = columns.get(name)
+            if values is None:
+                values = [None] * n_rows
+            matrix[:, idx] = numeric_column(values, DEFAULT_FEATURE_VALUES[name])
+        matrix[:, :n_numeric] -= self.mean
+        matrix[:, :n_numeric] /= self.scale
+        if self.categories and columns.get("category") is not None:
+            codes = np.fromiter(
+                (self._category_index.get(str(value), -1) for value in columns["category"]),
+                dtype=np.int64,
+                count=n_rows
+            )
+            known = codes >= 0
+            matrix[np.nonzero(known)[0], n_numeric + codes[known]] = 1.0
+        return matrix
+
+    def transform(self, rows: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """
+        Codifica uma lista de linhas (dicionários) em uma matriz de features.
+
+        Args:
+            rows (Sequence[Dict[str, Any]]): Linhas de features
+
+        Returns:
+            np.ndarray: Matriz de features codificadas
+        """
+        return self.transform_columns(rows_to_columns(rows, self.input_columns), n_rows=len(rows))
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Exporta o estado do codificador para serialização em `.npz`."""
+        return {
+            "encoder_numeric_columns": np.array(self.numeric_columns, dtype=str),
+            "encoder_categories": np.array(self.categories, dtype=str),
+            "encoder_mean": self.mean,
+            "encoder_scale": self.scale,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "FeatureEncoder":
+        """Reconstrói o codificador a partir dos arrays de um artefato `.npz`."""
+        return cls(
+            numeric_columns=[str(value) for value in arrays["encoder_numeric_columns"]],
+            categories=[str(value) for value in arrays["encoder_categories"]],
+            mean=arrays["encoder_mean"],
+            scale=arrays["encoder_scale"],
+        )
@@ -0,0 +1,377 @@
+"""
+Módulo do sistema de recomendação baseado em similaridade entre itens.
+
+Este módulo constrói vetores de itens a partir das features de
+`GET /api/v1/ml/features` e pré-calcula, no momento da atualização, uma tabela
+com os k vizinhos mais similares (similaridade de cosseno) de cada livro. As
+consultas ("livros similares a X" e "recomendações para estes livros curtidos")
+são respondidas apenas com leituras dessa tabela em memória.
+
+A similaridade é calculada em blocos de linhas, de modo que o uso de memória
+fica limitado a (bloco x total de livros) em vez de (total x total).
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from m1_ml_book_flow_api.core.logger import get_logger
+from .shared_arrays import (
+    ML_SHARED_ARRAYS_ENABLED,
+    ML_SHARED_RELOAD_INTERVAL_SECONDS,
+    SharedArrayStore,
+    shared_array_store
+)
+
+recommender_logger = get_logger("ml_recommender")
+
+# Quantidade de vizinhos pré-calculados por livro
+RECOMMENDER_TOP_K = int(os.getenv("RECOMMENDER_TOP_K", "50"))
+# Quantidade de linhas por bloco no cálculo da similaridade
+RECOMMENDER_BLOCK_SIZE = int(os.getenv("RECOMMENDER_BLOCK_SIZE", "1024"))
+
+# Features numéricas de `BookFeature` usadas no vetor do item
+NUMERIC_FEATURES = (
+    "year_normalized",
+    "price_normalized",
+    "rating_normalized",
+    "availability_flag",
+    "popularity_score",
+)
+# Peso do one-hot de categoria em relação às features numéricas
+CATEGORY_WEIGHT = float(os.getenv("RECOMMENDER_CATEGORY_WEIGHT", "1.0"))
+
+def build_item_vectors(features: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Constrói os vetores dos itens a partir das features dos livros.
+
+    As features numéricas são centralizadas (média 0) para que a similaridade
+    de cosseno reflita diferenças entre os livros, e a categoria entra como
+    one-hot ponderado por CATEGORY_WEIGHT.
+
+    Args:
+        features (Sequence[Any]): Objetos `BookFeature` (ou equivalentes com os mesmos atributos)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: IDs dos livros e matriz de vetores (n_livros, n_dimensões)
+    """
+    n_items = len(features)
+    book_ids = np.fromiter((feature.id for feature in features), dtype=np.int64, count=n_items)
+    numeric = np.column_stack([
+        np.fromiter((float(getattr(feature, name)) for feature in features), dtype=np.float64, count=n_items)
+        for name in NUMERIC_FEATURES
+    ]) if n_items else np.zeros((0, len(NUMERIC_FEATURES)))
+    numeric -= numeric.mean(axis=0) if n_items else 0.0
+
+    category_codes = np.fromiter((feature.category_encoded for feature in features), dtype=np.int64, count=n_items)
+    n_categories = int(category_codes.max()) + 1 if n_items else 0
+    categories = np.zeros((n_items, n_categories), dtype=np.float64)
+    categories[np.arange(n_items), category_codes] = CATEGORY_WEIGHT
+    return book_ids, np.hstack([numeric, categories])
+
+class SimilarityIndex:
+    """
+    Índice imutável de vizinhos mais similares por livro.
+
+    Todo o estado do índice fica em arrays NumPy (sem estruturas Python por
+    livro), de modo que pode ser mapeado a partir da memória compartilhada entre
+    os workers (ver `shared_arrays`).
+
+    Attributes:
+        book_ids (np.ndarray): IDs dos livros indexados
+        vectors (np.ndarray): Vetores normalizados dos livros (n_livros, n_dimensões)
+        neighbor_ids (np.ndarray): IDs dos k vizinhos de cada livro (n_livros, k), por similaridade decrescente
+        neighbor_scores (np.ndarray): Similaridade de cosseno correspondente (n_livros, k)
+        version (str): Versão do índice (data/hora de construção, ISO 8601)
+        build_time_ms (float): Tempo de construção do índice
+        catalog_version (int): Versão do catálogo usada na construção
+    """
+    def __init__(self, book_ids: np.ndarray, vectors: np.ndarray, neighbor_ids: np.ndarray,
+                 neighbor_scores: np.ndarray, version: str, build_time_ms: float = 0.0,
+                 sorted_ids: Optional[np.ndarray] = None, sorted_positions: Optional[np.ndarray] = None,
+                 catalog_version: int = 0):
+        self.book_ids = book_ids
+        self.vectors = vectors
+        self.neighbor_ids = neighbor_ids
+        self.neighbor_scores = neighbor_scores
+        self.version = version
+        self.build_time_ms = build_time_ms
+        self.catalog_version = catalog_version
+        if sorted_positions is None:
+            sorted_positions = np.argsort(book_ids, kind="stable")
+            sorted_ids = book_ids[sorted_positions]
+        self.sorted_ids = sorted_ids
+        self.sorted_positions = sorted_positions
+
+    @property
+    def size(self) -> int:
+        """Quantidade de livros indexados."""
+        return len(self.book_ids)
+
+    @property
+    def top_k(self) -> int:
+        """Quantidade de vizinhos pré-calculados por livro."""
+        return self.neighbor_ids.shape[1] if self.neighbor_ids.ndim == 2 else 0
+
+    def _positions(self, book_ids: Sequence[int]) -> np.ndarray:
+        """Posições no índice dos IDs informados (IDs desconhecidos são descartados)."""
+        if self.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        ids = np.asarray(book_ids, dtype=np.int64)
+        slots = np.minimum(np.searchsorted(self.sorted_ids, ids), self.size - 1)
+        return self.sorted_positions[slots[self.sorted_ids[slots] == ids]]
+
+    def __contains__(self, book_id: int) -> bool:
+        return len(self._positions([book_id])) > 0
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Exporta o índice para publicação em memória compartilhada."""
+        return {
+            "book_ids": self.book_ids,
+            "vectors": self.vectors,
+            "neighbor_ids": self.neighbor_ids,
+            "neighbor_scores": self.neighbor_scores,
+            "sorted_ids": self.sorted_ids,
+            "sorted_positions": self.sorted_positions,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], version: str, build_time_ms: float = 0.0,
+                    catalog_version: int = 0) -> "SimilarityIndex":
+        """Reconstrói o índice a partir de arrays publicados (possivelmente mapeados em memória)."""
+        return cls(version=version, build_time_ms=build_time_ms, catalog_version=catalog_version, **arrays)
+
+    @classmethod
+    def build(cls, book_ids: np.ndarray, vectors: np.ndarray, top_k: int = RECOMMENDER_TOP_K,
+              block_size: int = RECOMMENDER_BLOCK_SIZE) -> "SimilarityIndex":
+        """
+        Constrói o índice calculando a similaridade de cosseno em blocos.
+
+        Args:
+            book_ids (np.ndarray): IDs dos livros
+            vectors (np.ndarray): Vetores dos itens (n_livros, n_dimensões)
+            top_k (int): Vizinhos a manter por livro
+            block_size (int): Linhas por bloco no produto de matrizes
+
+        Returns:
+            SimilarityIndex: Índice pronto para consulta
+        """
+        start = time.perf_counter()
+        n_items = len(book_ids)
+        k = max(0, min(top_k, n_items - 1))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        unit = (vectors / norms).astype(np.float32)
+
+        neighbor_pos = np.zeros((n_items, k), dtype=np.int64)
+        neighbor_scores = np.zeros((n_items, k), dtype=np.float32)
+        if k > 0:
+            for begin in range(0, n_items, block_size):
+                end = min(begin + block_size, n_items)
+                block = unit[begin:end] @ unit.T
+                # O próprio livro nunca é vizinho de si mesmo
+                block[np.arange(end - begin), np.arange(begin, end)] = -np.inf
+                top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+                top_scores = np.take_along_axis(block, top, axis=1)
+                order = np.argsort(-top_scores, axis=1, kind="stable")
+                neighbor_pos[begin:end] = np.take_along_axis(top, order, axis=1)
+                neighbor_scores[begin:end] = np.take_along_axis(top_scores, order, axis=1)
+
+        return cls(
+            book_ids=np.asarray(book_ids, dtype=np.int64),
+            vectors=unit,
+            neighbor_ids=np.asarray(book_ids, dtype=np.int64)[neighbor_pos],
+            neighbor_scores=neighbor_scores,
+            version=datetime.now(timezone.utc).isoformat(),
+            build_time_ms=round((time.perf_counter() - start) * 1000, 2),
+        )
+
+    def similar(self, book_id: int, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Obtém os livros mais similares a um livro.
+
+        Args:
+            book_id (int): ID do livro de referência
+            k (int): Quantidade de livros retornados (limitada ao top_k do índice)
+
+        Returns:
+            List[Tuple[int, float]]: Pares (ID do livro, similaridade), por similaridade decrescente
+
+        Raises:
+            KeyError: Se o livro não estiver indexado
+        """
+        positions = self._positions([book_id])
+        if len(positions) == 0:
+            raise KeyError(book_id)
+        position = int(positions[0])
+        return list(zip(
+            self.neighbor_ids[position, :k].tolist(),
+            self.neighbor_scores[position, :k].tolist()
+        ))
+
+    def recommend(self, liked_ids: Sequence[int], k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Recomenda livros a partir de uma lista de livros curtidos.
+
+        O score de cada candidato é a média das similaridades com os livros
+        curtidos (somando apenas os vizinhos pré-calculados). Livros curtidos
+        e IDs desconhecidos são ignorados.
+
+        Args:
+            liked_ids (Sequence[int]): IDs dos livros curtidos
+            k (int): Quantidade de recomendações
+
+        Returns:
+            List[Tuple[int, float]]: Pares (ID do livro, score), por score decrescente
+        """
+        positions = np.unique(self._positions(list(liked_ids)))
+        if len(positions) == 0 or k <= 0:
+            return []
+        candidates = self.neighbor_ids[positions].ravel()
+        scores = self.neighbor_scores[positions].ravel()
+        unique_ids, inverse = np.unique(candidates, return_inverse=True)
+        totals = np.bincount(inverse, weights=scores) / len(positions)
+        keep = ~np.isin(unique_ids, np.asarray(liked_ids, dtype=np.int64))
+        unique_ids, totals = unique_ids[keep], totals[keep]
+        order = np.argsort(-totals, kind="stable")[:k]
+        return list(zip(unique_ids[order].tolist(), np.round(totals[order], 4).tolist()))
+
+    def info(self) -> Dict[str, Any]:
+        """Informações do índice retornadas em `model_info`."""
+        return {
+            "model_type": "recommendation",
+            "model_version": self.version,
+            "algorithm": "item_knn_cosine",
+            "indexed_books": self.size,
+            "top_k": self.top_k,
+            "build_time_ms": self.build_time_ms,
+            "catalog_version": self.catalog_version,
+        }
+
+class SimilarityIndexHolder:
+    """
+    Mantém o índice de similaridade ativo do worker.
+
+    O índice é imutável e a referência é substituída por inteiro a cada
+    atualização, então leitores nunca precisam de lock. Com um `SharedArrayStore`,
+    o índice é construído por um único worker e mapeado somente leitura pelos
+    demais; versões publicadas por outro worker (por exemplo, após um scraping)
+    são detectadas a cada ML_SHARED_RELOAD_INTERVAL_SECONDS.
+
+    Attributes:
+        store (Optional[SharedArrayStore]): Repositório de arrays compartilhados (None mantém o índice só no processo)
+    """
+    STORE_NAME = "similarity_index"
+
+    def __init__(self, store: Optional[SharedArrayStore] = None,
+                 reload_interval: float = ML_SHARED_RELOAD_INTERVAL_SECONDS):
+        self.store = store
+        self.reload_interval = reload_interval
+        self._index: Optional[SimilarityIndex] = None
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._shared_version: Optional[str] = None
+
+    def _build(self, load_features: Callable[[], Sequence[Any]], catalog_version: int = 0) -> SimilarityIndex:
+        book_ids, vectors = build_item_vectors(load_features())
+        index = SimilarityIndex.build(book_ids, vectors)
+        index.catalog_version = catalog_version
+        recommender_logger.info(
+            f"Índice de similaridade construído: {index.size} livros em {index.build_time_ms}ms",
+            extra={"event": "ml_similarity_index_built", "indexed_books": index.size,
+                   "top_k": index.top_k, "build_time_ms": index.build_time_ms}
+        )
+        return index
+
+    def _map(self, current: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> SimilarityIndex:
+        meta = current.get("meta", {})
+        index = SimilarityIndex.from_arrays(
+            arrays, meta.get("version", current["version"]), meta.get("build_time_ms", 0.0), meta.get("catalog_version", 0)
+        )
+        self._index = index
+        self._shared_version = current["version"]
+        self._last_check = time.monotonic()
+        return index
+
+    def _publish(self, index: SimilarityIndex) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        return index.to_arrays(), {"version": index.version, "build_time_ms": index.build_time_ms,
+                                   "catalog_version": index.catalog_version}
+
+    def _maybe_remap(self) -> None:
+        # Antes do primeiro get_or_build/refresh o CURRENT pode ser de uma execução anterior
+        if self.store is None or self._shared_version is None:
+            return
+        if time.monotonic() - self._last_check < self.reload_interval:
+            return
+        self._last_check = time.monotonic()
+        current = self.store.current(self.STORE_NAME)
+        if current is None or current["version"] == self._shared_version:
+            return
+        try:
+            self._map(current, self.store.load(self.STORE_NAME, current["version"]))
+        except FileNotFoundError:
+            # Versão substituída durante a leitura: a próxima verificação mapeia a mais recente
+            pass
+
+    def get(self) -> Optional[SimilarityIndex]:
+        """Índice ativo ou None se ainda não foi construído."""
+        self._maybe_remap()
+        return self._index
+
+    def refresh(self, load_features: Callable[[], Sequence[Any]], catalog_version: Optional[int] = None) -> SimilarityIndex:
+        """
+        Reconstrói o índice a partir das features atuais e o ativa.
+
+        Com memória compartilhada, o novo índice é publicado para os demais workers.
+        Se `catalog_version` for informado e outro worker do mesmo nó já tiver
+        publicado um índice dessa versão do catálogo, ele é apenas mapeado.
+
+        Args:
+            load_features (Callable[[], Sequence[Any]]): Função que retorna as features dos livros
+            catalog_version (Optional[int]): Versão do catálogo que motivou a reconstrução
+
+        Returns:
+            SimilarityIndex: Novo índice ativo
+        """
+        with self._lock:
+            if self.store is None:
+                self._index = self._build(load_features, catalog_version or 0)
+                return self._index
+            with self.store.lock(self.STORE_NAME):
+                current = self.store.current(self.STORE_NAME)
+                published = (current or {}).get("meta", {}).get("catalog_version", -1)
+                if catalog_version is None or current is None or published < catalog_version:
+                    arrays, meta = self._publish(self._build(load_features, catalog_version or 0))
+                    self.store.publish(self.STORE_NAME, arrays, meta)
+                    current = self.store.current(self.STORE_NAME)
+            return self._map(current, self.store.load(self.STORE_NAME, current["version"]))
+
+    def get_or_build(self, load_features: Callable[[], Sequence[Any]], catalog_version: int = 0) -> SimilarityIndex:
+        """
+        Retorna o índice ativo, construindo-o (ou mapeando o publicado por outro worker) na primeira chamada.
+
+        Args:
+            load_features (Callable[[], Sequence[Any]]): Função que retorna as features dos livros
+            catalog_version (int): Versão do catálogo registrada em um índice construído; um
+                                   índice publicado para outra versão (ou por outra execução do
+                                   servidor) não é reaproveitado
+        """
+        index = self.get()
+        if index is not None:
+            return index
+        with self._lock:
+            if self._index is not None:
+                return self._index
+            if self.store is None:
+                self._index = self._build(load_features, catalog_version)
+                return self._index
+            # Um índice de outra versão do catálogo é obsoleto mesmo dentro da mesma execução
+            current, arrays = self.store.load_or_build(
+                self.STORE_NAME, lambda: self._publish(self._build(load_features, catalog_version)),
+                expected_meta={"catalog_version": catalog_version}
+            )
+            return self._map(current, arrays)
+
+# Índice global do worker (compartilhado entre os workers com ML_SHARED_ARRAYS_ENABLED=true)
+similarity_index = SimilarityIndexHolder(shared_array_store if ML_SHARED_ARRAYS_ENABLED else None)
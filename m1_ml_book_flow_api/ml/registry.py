@@ -0,0 +1,290 @@
+"""
+Módulo de registro de modelos de Machine Learning.
+
+Este módulo carrega os artefatos de modelos treinados (arquivos `.npz` gerados
+pela CLI `m1_ml_book_flow_api.ml.train`) uma única vez por worker e os mantém
+em memória. Novas versões publicadas no diretório de modelos são detectadas
+periodicamente por uma thread de fundo (fora do caminho das requisições e do
+event loop) e trocadas de forma atômica: requisições em andamento continuam
+usando a versão antiga e as novas passam a usar a versão recém-carregada.
+
+Estrutura do diretório de modelos:
+    {ML_MODELS_DIR}/{model_type}/{version}.npz   # artefato do modelo
+    {ML_MODELS_DIR}/{model_type}/LATEST          # versão ativa do modelo
+"""
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from m1_ml_book_flow_api.core.logger import get_logger
+from .estimators import ESTIMATORS
+from .featurizer import FeatureEncoder
+
+registry_logger = get_logger("ml_registry")
+
+# Diretório onde os artefatos dos modelos são publicados
+ML_MODELS_DIR = os.getenv(
+    "ML_MODELS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "models")
+)
+# Intervalo mínimo entre verificações de novas versões no diretório (segundos)
+ML_MODELS_RELOAD_INTERVAL_SECONDS = float(os.getenv("ML_MODELS_RELOAD_INTERVAL_SECONDS", "30"))
+
+# Tipos de modelo servidos pelo registro
+MODEL_TYPES = ("rating", "price", "category")
+
+LATEST_FILENAME = "LATEST"
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    Modelo carregado em memória, pronto para inferência.
+
+    Attributes:
+        model_type (str): Tipo do modelo (rating, price, category)
+        version (str): Versão do artefato
+        trained_at (str): Data/hora do treinamento (ISO 8601)
+        encoder (FeatureEncoder): Codificador das features de entrada
+        estimator (Any): Estimador treinado (RidgeRegressor, NearestCentroidClassifier)
+        metrics (Dict[str, float]): Métricas de validação registradas no treinamento
+    """
+    model_type: str
+    version: str
+    trained_at: str
+    encoder: FeatureEncoder
+    estimator: Any
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def algorithm(self) -> str:
+        return self.estimator.algorithm
+
+    def predict_matrix(self, X: np.ndarray) -> Tuple[List[Any], List[float]]:
+        """
+        Executa a inferência vetorizada sobre uma matriz de features já codificada.
+
+        Args:
+            X (np.ndarray): Matriz de features (n_samples, n_features)
+
+        Returns:
+            Tuple[List[Any], List[float]]: Valores previstos e scores de confiança (0-1)
+        """
+        if hasattr(self.estimator, "predict_with_confidence"):
+            labels, confidences = self.estimator.predict_with_confidence(X)
+            return labels.tolist(), np.round(confidences, 4).tolist()
+        values = self.estimator.predict(X)
+        if self.model_type == "rating":
+            values = np.clip(values, 0.0, 5.0)
+        elif self.model_type == "price":
+            values = np.maximum(values, 0.0)
+        confidence = float(min(1.0, max(0.0, self.metrics.get("r2", 0.0))))
+        return np.round(values, 2).tolist(), [round(confidence, 4)] * len(values)
+
+    def predict(self, rows: Sequence[Dict[str, Any]]) -> Tuple[List[Any], List[float]]:
+        """
+        Executa a inferência para uma lista de linhas de features.
+
+        Args:
+            rows (Sequence[Dict[str, Any]]): Linhas no formato de `input_features`
+
+        Returns:
+            Tuple[List[Any], List[float]]: Valores previstos e scores de confiança (0-1)
+        """
+        return self.predict_matrix(self.encoder.transform(rows))
+
+    def info(self) -> Dict[str, Any]:
+        """Informações do modelo retornadas em `model_info`."""
+        return {
+            "model_type": self.model_type,
+            "model_version": self.version,
+            "last_trained": self.trained_at,
+            "algorithm": self.algorithm,
+            "metrics": self.metrics,
+        }
+
+def _atomic_write(path: str, write) -> None:
+    """Escreve um arquivo em um caminho temporário e o move atomicamente para o destino."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as handle:
+        write(handle)
+    os.replace(tmp_path, path)
+
+def save_model(
+    model_type: str,
+    version: str,
+    encoder: FeatureEncoder,
+    estimator: Any,
+    metrics: Dict[str, float],
+    models_dir: str = ML_MODELS_DIR,
+    activate: bool = True
+) -> str:
+    """
+    Serializa um modelo treinado em `{models_dir}/{model_type}/{version}.npz`.
+
+    O artefato é escrito em um arquivo temporário e movido atomicamente, e só
+    depois o ponteiro LATEST é atualizado, para que os workers nunca leiam um
+    artefato parcial.
+
+    Args:
+        model_type (str): Tipo do modelo
+        version (str): Versão do artefato
+        encoder (FeatureEncoder): Codificador ajustado
+        estimator (Any): Estimador treinado
+        metrics (Dict[str, float]): Métricas de validação
+        models_dir (str): Diretório raiz dos modelos
+        activate (bool): Se deve apontar LATEST para a nova versão
+
+    Returns:
+        str: Caminho do artefato salvo
+    """
+    model_dir = os.path.join(models_dir, model_type)
+    os.makedirs(model_dir, exist_ok=True)
+    metadata = {
+        "model_type": model_type,
+        "version": version,
+        "estimator": estimator.kind,
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "metrics": metrics,
+    }
+    arrays = {**encoder.to_arrays(), **estimator.to_arrays(), "metadata": np.array(json.dumps(metadata))}
+    path = os.path.join(model_dir, f"{version}.npz")
+    _atomic_write(path, lambda handle: np.savez(handle, **arrays))
+    if activate:
+        _atomic_write(os.path.join(model_dir, LATEST_FILENAME), lambda handle: handle.write(version.encode()))
+    return path
+
+def load_model(path: str) -> LoadedModel:
+    """
+    Carrega um artefato `.npz` gerado por `save_model`.
+
+    Args:
+        path (str): Caminho do artefato
+
+    Returns:
+        LoadedModel: Modelo pronto para inferência
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files}
+    metadata = json.loads(str(arrays.pop("metadata")))
+    estimator = ESTIMATORS[metadata["estimator"]].from_arrays(arrays)
+    return LoadedModel(
+        model_type=metadata["model_type"],
+        version=metadata["version"],
+        trained_at=metadata["trained_at"],
+        encoder=FeatureEncoder.from_arrays(arrays),
+        estimator=estimator,
+        metrics=metadata.get("metrics", {}),
+    )
+
+class ModelRegistry:
+    """
+    Registro de modelos carregados em memória (um por worker).
+
+    Os modelos ficam em um dicionário imutável que é substituído por inteiro a
+    cada recarga. Como a troca da referência é atômica, leitores nunca veem um
+    estado parcial e nunca precisam de lock. A verificação de novas versões
+    (leitura dos arquivos LATEST e `np.load`) roda na thread iniciada por
+    `start()`; `get()` é apenas a leitura do dicionário.
+
+    Attributes:
+        models_dir (str): Diretório raiz dos artefatos
+        reload_interval (float): Intervalo entre verificações de novas versões
+        generation (int): Contador incrementado a cada troca de versão
+    """
+    def __init__(self, models_dir: str = ML_MODELS_DIR, reload_interval: float = ML_MODELS_RELOAD_INTERVAL_SECONDS):
+        self.models_dir = models_dir
+        self.reload_interval = reload_interval
+        self.generation = 0
+        self._models: Dict[str, LoadedModel] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _read_latest(self, model_type: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.models_dir, model_type, LATEST_FILENAME)) as handle:
+                return handle.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _reload_locked(self) -> bool:
+        models = dict(self._models)
+        changed = False
+        for model_type in MODEL_TYPES:
+            version = self._read_latest(model_type)
+            current = models.get(model_type)
+            if version is None or (current is not None and current.version == version):
+                continue
+            path = os.path.join(self.models_dir, model_type, f"{version}.npz")
+            try:
+                models[model_type] = load_model(path)
+                changed = True
+                registry_logger.info(
+                    f"Modelo carregado: {model_type} v{version}",
+                    extra={"event": "ml_model_loaded", "model_type": model_type, "model_version": version}
+                )
+            except Exception as e:
+                registry_logger.error(
+                    f"Erro ao carregar modelo {model_type} v{version}: {str(e)}",
+                    extra={"event": "ml_model_load_error", "model_type": model_type, "model_version": version, "error": str(e)}
+                )
+        if changed:
+            # Troca atômica: leitores passam a ver o novo dicionário por inteiro
+            self._models = models
+            self.generation += 1
+        return changed
+
+    def load(self) -> Dict[str, str]:
+        """
+        Carrega (ou recarrega) as versões apontadas por LATEST.
+
+        Returns:
+            Dict[str, str]: Versões ativas por tipo de modelo
+        """
+        with self._lock:
+            self._reload_locked()
+        return self.versions()
+
+    def start(self) -> None:
+        """Inicia a thread que verifica novas versões a cada `reload_interval` (uma por processo)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ml-model-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Encerra a thread de verificação de novas versões."""
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.load()
+            except Exception as e:
+                registry_logger.warning(
+                    f"Erro ao verificar novas versões de modelos: {str(e)}",
+                    extra={"event": "ml_model_reload_error", "error": str(e)}
+                )
+
+    def get(self, model_type: str) -> Optional[LoadedModel]:
+        """
+        Obtém o modelo ativo de um tipo.
+
+        Args:
+            model_type (str): Tipo do modelo
+
+        Returns:
+            Optional[LoadedModel]: Modelo ativo ou None se não houver artefato publicado
+        """
+        return self._models.get(model_type)
+
+    def versions(self) -> Dict[str, str]:
+        """Versões ativas por tipo de modelo."""
+        return {model_type: model.version for model_type, model in self._models.items()}
+
+# Registro global do worker
+model_registry = ModelRegistry()
@@ -0,0 +1,190 @@
+"""
+Módulo de arrays NumPy compartilhados entre os workers do uvicorn.
+
+Com `--workers N`, cada worker é um processo separado e qualquer matriz mantida
+em memória seria duplicada N vezes. Este módulo publica os arrays como arquivos
+`.npy` em um diretório em memória (`/dev/shm` por padrão) e cada worker os mapeia
+somente leitura com `np.load(mmap_mode="r")`: as páginas ficam no page cache do
+sistema operacional e são compartilhadas por todos os processos.
+
+A construção é feita por um único processo: um lock de arquivo (`fcntl.flock`)
+garante que, na inicialização, apenas o primeiro worker construa os arrays e os
+demais apenas os mapeiem.
+
+Cada publicação registra o ML_SHARED_RUN_ID da execução do servidor, gerado
+pelo comando de inicialização (Dockerfile/heroku.yml) antes de subir os
+workers. Na inicialização, só são reaproveitados arrays da mesma execução e
+com os metadados esperados (ex.: a versão do catálogo usada na construção).
+
+Estrutura do diretório:
+    {ML_SHARED_DIR}/{name}/{version}/{array}.npy   # arrays de uma versão
+    {ML_SHARED_DIR}/{name}/CURRENT                 # metadados da versão ativa (JSON)
+    {ML_SHARED_DIR}/{name}.lock                    # lock de construção
+"""
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import numpy as np
+from m1_ml_book_flow_api.core.logger import get_logger
+
+shared_logger = get_logger("ml_shared_arrays")
+
+def _default_shared_dir() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "bookflow")
+
+# Diretório onde os arrays compartilhados são publicados
+ML_SHARED_DIR = os.getenv("ML_SHARED_DIR", _default_shared_dir())
+# Se os arrays do sistema de recomendação são compartilhados entre os workers
+ML_SHARED_ARRAYS_ENABLED = os.getenv("ML_SHARED_ARRAYS_ENABLED", "true").lower() == "true"
+# Intervalo mínimo entre verificações de uma nova versão publicada por outro worker (segundos)
+ML_SHARED_RELOAD_INTERVAL_SECONDS = float(os.getenv("ML_SHARED_RELOAD_INTERVAL_SECONDS", "5"))
+
+# Identificador da execução do servidor, comum a todos os workers (gerado pelo comando de inicialização)
+ML_SHARED_RUN_ID = os.getenv("ML_SHARED_RUN_ID", "")
+
+CURRENT_FILENAME = "CURRENT"
+
+class SharedArrayStore:
+    """
+    Repositório de conjuntos de arrays publicados em arquivos mapeados em memória.
+
+    Attributes:
+        directory (str): Diretório raiz dos arrays publicados
+    """
+    def __init__(self, directory: str = ML_SHARED_DIR):
+        self.directory = directory
+
+    def _path(self, name: str, *parts: str) -> str:
+        return os.path.join(self.directory, name, *parts)
+
+    @contextmanager
+    def lock(self, name: str) -> Iterator[None]:
+        """Lock exclusivo entre processos para a construção de um conjunto de arrays."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"{name}.lock"), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def current(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Metadados da versão ativa de um conjunto de arrays.
+
+        Args:
+            name (str): Nome do conjunto
+
+        Returns:
+            Optional[Dict[str, Any]]: Metadados (version, run_id, published_at, meta) ou None
+        """
+        try:
+            with open(self._path(name, CURRENT_FILENAME)) as handle:
+                return json.load(handle)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def publish(self, name: str, arrays: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Publica uma nova versão de um conjunto de arrays e a torna ativa.
+
+        Os arquivos são escritos em um diretório temporário, que é renomeado
+        atomicamente; só então o ponteiro CURRENT é atualizado. Versões antigas
+        são removidas (workers que ainda as mapeiam continuam válidos, pois o
+        arquivo só é liberado quando o último mapeamento é fechado).
+
+        Args:
+            name (str): Nome do conjunto
+            arrays (Dict[str, np.ndarray]): Arrays a publicar
+            meta (Optional[Dict[str, Any]]): Metadados adicionais (serializáveis em JSON)
+
+        Returns:
+            str: Versão publicada
+        """
+        version = f"{time.time_ns()}-{os.getpid()}"
+        root = self._path(name)
+        os.makedirs(root, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=root)
+        for key, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{key}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+        os.replace(tmp_dir, self._path(name, version))
+
+        current = {"version": version, "run_id": ML_SHARED_RUN_ID, "published_at": time.time(), "meta": meta or {}}
+        tmp_current = self._path(name, f".{CURRENT_FILENAME}.tmp-{os.getpid()}")
+        with open(tmp_current, "w") as handle:
+            json.dump(current, handle)
+        os.replace(tmp_current, self._path(name, CURRENT_FILENAME))
+
+        for entry in os.listdir(root):
+            if entry not in (version, CURRENT_FILENAME) and not entry.startswith("."):
+                shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+        return version
+
+    def load(self, name: str, version: str) -> Dict[str, np.ndarray]:
+        """
+        Mapeia somente leitura os arrays de uma versão publicada.
+
+        Args:
+            name (str): Nome do conjunto
+            version (str): Versão publicada
+
+        Returns:
+            Dict[str, np.ndarray]: Arrays mapeados em memória (`np.memmap`)
+        """
+        version_dir = self._path(name, version)
+        return {
+            filename[:-4]: np.load(os.path.join(version_dir, filename), mmap_mode="r", allow_pickle=False)
+            for filename in os.listdir(version_dir)
+            if filename.endswith(".npy")
+        }
+
+    def load_or_build(
+        self,
+        name: str,
+        build: Callable[[], Tuple[Dict[str, np.ndarray], Dict[str, Any]]],
+        expected_meta: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """
+        Mapeia a versão ativa publicada por esta execução do servidor ou a constrói.
+
+        Apenas um processo constrói os arrays; os demais aguardam o lock e
+        mapeiam a versão publicada. A versão ativa só é reaproveitada se foi
+        publicada com o mesmo ML_SHARED_RUN_ID e se seus metadados contêm os
+        valores de `expected_meta`; caso contrário é considerada obsoleta
+        (ex.: deixada por uma execução anterior) e reconstruída.
+
+        Args:
+            name (str): Nome do conjunto
+            build (Callable): Função que retorna (arrays, metadados) a publicar
+            expected_meta (Optional[Dict[str, Any]]): Metadados exigidos da versão ativa
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, np.ndarray]]: Metadados da versão ativa e arrays mapeados
+        """
+        with self.lock(name):
+            current = self.current(name)
+            if not self._is_reusable(current, expected_meta):
+                arrays, meta = build()
+                self.publish(name, arrays, meta)
+                current = self.current(name)
+                shared_logger.info(
+                    f"Arrays compartilhados publicados: {name} v{current['version']}",
+                    extra={"event": "ml_shared_arrays_published", "array_set": name, "version": current["version"]}
+                )
+            return current, self.load(name, current["version"])
+
+    @staticmethod
+    def _is_reusable(current: Optional[Dict[str, Any]], expected_meta: Optional[Dict[str, Any]]) -> bool:
+        if current is None or current.get("run_id") != ML_SHARED_RUN_ID:
+            return False
+        meta = current.get("meta", {})
+        return all(meta.get(key) == value for key, value in (expected_meta or {}).items())
+
+# Repositório global de arrays compartilhados
+shared_array_store = SharedArrayStore()
@@ -0,0 +1,143 @@
+"""
+CLI de treinamento offline dos modelos de Machine Learning.
+
+Este módulo treina os modelos servidos em `POST /api/v1/ml/predictions` a partir
+do mesmo pipeline de dados do endpoint `/api/v1/ml/training-data` e publica os
+artefatos no diretório de modelos, onde são carregados pelo `ModelRegistry`.
+
+Uso:
+    python -m m1_ml_book_flow_api.ml.train
+    python -m m1_ml_book_flow_api.ml.train --models rating price --output-dir /models
+"""
+import argparse
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from .estimators import NearestCentroidClassifier, RidgeRegressor
+from .featurizer import FeatureEncoder, rows_to_columns
+from .registry import ML_MODELS_DIR, MODEL_TYPES, save_model
+
+# Configuração de cada modelo: alvo, colunas numéricas usadas e uso da categoria.
+# O alvo nunca aparece entre as features do próprio modelo.
+MODEL_SPECS = {
+    "rating": {"target": "target_rating", "numeric_columns": ["title_length", "year", "price", "available"], "use_category": True},
+    "price": {"target": "target_price", "numeric_columns": ["title_length", "year", "available"], "use_category": True},
+    "category": {"target": "target_category", "numeric_columns": ["title_length", "year", "price", "available"], "use_category": False},
+}
+
+def load_training_rows() -> Tuple[List[Dict[str, Any]], Dict[str, List[Any]]]:
+    """
+    Carrega o dataset de treinamento pelo pipeline de dados da API.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Dict[str, List[Any]]]: Linhas de features e
+        colunas de targets do dataset
+    """
+    from m1_ml_book_flow_api.api.services.ml_service import get_ml_training_data, TARGET_COLUMNS
+
+    dataset = get_ml_training_data()
+    rows = [record.features for record in dataset.training_data]
+    targets = {
+        column: [getattr(record, column) for record in dataset.training_data]
+        for column in TARGET_COLUMNS
+    }
+    return rows, targets
+
+def _fit(model_type: str, X: np.ndarray, y: np.ndarray, alpha: float):
+    if model_type == "category":
+        return NearestCentroidClassifier.fit(X, y)
+    return RidgeRegressor.fit(X, y.astype(np.float64), alpha=alpha)
+
+def _evaluate(model_type: str, estimator, X: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+    if model_type == "category":
+        return {"accuracy": round(float((estimator.predict(X) == y).mean()), 4)}
+    y = y.astype(np.float64)
+    predictions = estimator.predict(X)
+    residual = ((y - predictions) ** 2).sum()
+    total = ((y - y.mean()) ** 2).sum()
+    return {
+        "r2": round(float(1 - residual / total) if total > 0 else 0.0, 4),
+        "mae": round(float(np.abs(y - predictions).mean()), 4),
+    }
+
+def train_model(
+    model_type: str,
+    rows: Sequence[Dict[str, Any]],
+    targets: Dict[str, Sequence[Any]],
+    alpha: float = 1.0,
+    test_ratio: float = 0.2,
+    seed: int = 42
+):
+    """
+    Treina um modelo, avaliando-o em um conjunto de validação separado.
+
+    As métricas são calculadas no conjunto de validação e o modelo final é
+    re-treinado com o dataset completo.
+
+    Args:
+        model_type (str): Tipo do modelo (rating, price, category)
+        rows (Sequence[Dict[str, Any]]): Linhas de features
+        targets (Dict[str, Sequence[Any]]): Colunas de targets
+        alpha (float): Regularização dos modelos de regressão
+        test_ratio (float): Proporção do conjunto de validação
+        seed (int): Semente da divisão aleatória
+
+    Returns:
+        Tuple[FeatureEncoder, Any, Dict[str, float]]: Codificador, estimador e métricas
+    """
+    spec = MODEL_SPECS[model_type]
+    columns = rows_to_columns(rows, spec["numeric_columns"] + ["category"])
+    y = np.asarray(targets[spec["target"]])
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(rows))
+    n_test = int(len(rows) * test_ratio)
+    test_idx, train_idx = order[:n_test], order[n_test:]
+
+    metrics: Dict[str, float] = {"train_records": len(rows)}
+    if n_test > 0 and len(train_idx) > 0:
+        train_columns = {name: [values[i] for i in train_idx] for name, values in columns.items()}
+        test_columns = {name: [values[i] for i in test_idx] for name, values in columns.items()}
+        encoder = FeatureEncoder.fit(train_columns, spec["numeric_columns"], spec["use_category"])
+        estimator = _fit(model_type, encoder.transform_columns(train_columns), y[train_idx], alpha)
+        metrics.update(_evaluate(model_type, estimator, encoder.transform_columns(test_columns), y[test_idx]))
+
+    encoder = FeatureEncoder.fit(columns, spec["numeric_columns"], spec["use_category"])
+    estimator = _fit(model_type, encoder.transform_columns(columns), y, alpha)
+    return encoder, estimator, metrics
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Ponto de entrada da CLI de treinamento.
+
+    Args:
+        argv (Optional[Sequence[str]]): Argumentos da linha de comando
+
+    Returns:
+        int: Código de saída do processo
+    """
+    parser = argparse.ArgumentParser(description="Treina e publica os modelos de ML da BookFlow API.")
+    parser.add_argument("--models", nargs="+", choices=MODEL_TYPES, default=list(MODEL_TYPES),
+                        help="Modelos a treinar (padrão: todos)")
+    parser.add_argument("--output-dir", default=ML_MODELS_DIR, help="Diretório onde os artefatos são publicados")
+    parser.add_argument("--version", default=None, help="Versão dos artefatos (padrão: timestamp UTC)")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Regularização L2 dos modelos de regressão")
+    parser.add_argument("--no-activate", action="store_true", help="Não atualiza o ponteiro LATEST")
+    args = parser.parse_args(argv)
+
+    version = args.version or datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    rows, targets = load_training_rows()
+    if not rows:
+        print("❌ Nenhum registro de treinamento encontrado")
+        return 1
+
+    print(f"📚 Registros de treinamento: {len(rows)}")
+    for model_type in args.models:
+        encoder, estimator, metrics = train_model(model_type, rows, targets, alpha=args.alpha)
+        path = save_model(model_type, version, encoder, estimator, metrics,
+                          models_dir=args.output_dir, activate=not args.no_activate)
+        print(f"✅ Modelo {model_type} v{version} ({estimator.algorithm}) salvo em {path} - métricas: {metrics}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,6 @@
+"""
+Pacote de scripts utilitários e benchmarks da aplicação.
+
+Os scripts deste pacote são executados via `python -m m1_ml_book_flow_api.scripts.<nome>`
+e não fazem parte do caminho de atendimento das requisições.
+"""
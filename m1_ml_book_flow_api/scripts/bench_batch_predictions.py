@@ -0,0 +1,102 @@
+"""
+Benchmark de throughput das predições ML (linhas por segundo).
+
+Compara, para o mesmo conjunto de linhas sintéticas:
+- inferência linha a linha (uma chamada ao modelo por linha, como em `/ml/predictions`)
+- inferência vetorizada (uma única chamada para todas as linhas, como em `/ml/predictions/batch`)
+- o endpoint HTTP de predição unitária versus o endpoint em lote (via TestClient, sem rede)
+
+Uso:
+    python -m m1_ml_book_flow_api.scripts.bench_batch_predictions --rows 10000
+"""
+import argparse
+import time
+import numpy as np
+from m1_ml_book_flow_api.ml.train import train_model
+
+CATEGORIES = ["Fiction", "Romance", "Mystery", "History", "Poetry", "Science"]
+
+def synthetic_rows(n_rows: int, seed: int = 7):
+    """Gera linhas de features sintéticas no formato de `input_features`."""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "book_id": i,
+            "title_length": int(rng.integers(5, 80)),
+            "year": int(rng.integers(1990, 2025)),
+            "price": round(float(rng.uniform(5, 90)), 2),
+            "available": bool(rng.integers(0, 2)),
+            "category": CATEGORIES[int(rng.integers(0, len(CATEGORIES)))],
+        }
+        for i in range(n_rows)
+    ]
+
+def _rate(n_rows: int, seconds: float) -> str:
+    return f"{n_rows / seconds:>14,.0f} linhas/s ({seconds * 1000:9.2f} ms)"
+
+def bench_model(model_type: str, rows, loop_rows: int) -> None:
+    targets = {
+        "target_rating": [1 + (row["title_length"] % 5) for row in rows],
+        "target_price": [row["price"] for row in rows],
+        "target_category": [row["category"] for row in rows],
+    }
+    from m1_ml_book_flow_api.ml.registry import LoadedModel
+    encoder, estimator, metrics = train_model(model_type, rows, targets)
+    model = LoadedModel(model_type, "bench", "", encoder, estimator, metrics)
+
+    sample = rows[:loop_rows]
+    start = time.perf_counter()
+    for row in sample:
+        model.predict([row])
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.predict(rows)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"[{model_type:8}] linha a linha: {_rate(len(sample), loop_seconds)}")
+    print(f"[{model_type:8}] vetorizado:    {_rate(len(rows), batch_seconds)}")
+
+def bench_http(rows, single_requests: int) -> None:
+    import jwt
+    from datetime import datetime, timedelta
+    from fastapi.testclient import TestClient
+    from m1_ml_book_flow_api.main import app
+    from m1_ml_book_flow_api.core.security.security import SECRET_KEY, ALGORITHM
+
+    token = jwt.encode(
+        {"sub": "bench", "type": "access", "exp": datetime.utcnow() + timedelta(minutes=30)},
+        SECRET_KEY, algorithm=ALGORITHM
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    client = TestClient(app)
+
+    start = time.perf_counter()
+    for row in rows[:single_requests]:
+        client.post("/api/v1/ml/predictions", json={"model_type": "rating", "input_features": row}, headers=headers)
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    response = client.post("/api/v1/ml/predictions/batch", json={"model_type": "rating", "rows": rows}, headers=headers)
+    batch_seconds = time.perf_counter() - start
+    response.raise_for_status()
+
+    print(f"[http    ] /ml/predictions:       {_rate(single_requests, single_seconds)}")
+    print(f"[http    ] /ml/predictions/batch: {_rate(len(rows), batch_seconds)}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de throughput das predições ML.")
+    parser.add_argument("--rows", type=int, default=10000, help="Linhas do lote")
+    parser.add_argument("--loop-rows", type=int, default=2000, help="Linhas avaliadas no modo linha a linha")
+    parser.add_argument("--http-requests", type=int, default=200, help="Requisições unitárias no benchmark HTTP")
+    parser.add_argument("--skip-http", action="store_true", help="Não executa o benchmark HTTP")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    for model_type in ("rating", "price", "category"):
+        bench_model(model_type, rows, min(args.loop_rows, args.rows))
+    if not args.skip_http:
+        bench_http(rows, min(args.http_requests, args.rows))
+
+if __name__ == "__main__":
+    main()
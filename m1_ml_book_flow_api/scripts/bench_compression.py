@@ -0,0 +1,77 @@
+"""
+Benchmark do impacto da compressão gzip nas respostas de listagem.
+
+Para uma lista de N livros (formato de `/books`), mede, sem compressão e com
+GZipMiddleware em cada nível pedido:
+- tamanho do corpo enviado (e a razão em relação ao original)
+- latência por requisição no servidor (serialização + compressão)
+- tempo estimado de transferência em um link de `--mbps` megabits/s
+
+Também mede a mesma lista enviada em NDJSON (streaming comprimido por chunk).
+
+Uso:
+    python -m m1_ml_book_flow_api.scripts.bench_compression --books 20000 --levels 1 5 9 --mbps 50
+"""
+import argparse
+import logging
+import time
+from typing import List, Optional
+import orjson
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.testclient import TestClient
+from m1_ml_book_flow_api.api.utils.ndjson import ndjson_response
+from m1_ml_book_flow_api.scripts.bench_json_serialization import _rows
+
+def _build_app(rows: List[dict], level: Optional[int], minimum_size: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/books")
+    def books():
+        return ORJSONResponse(rows)
+
+    @app.get("/books.ndjson")
+    def books_ndjson():
+        return ndjson_response(iter(rows))
+
+    if level is not None:
+        app.add_middleware(GZipMiddleware, minimum_size=minimum_size, compresslevel=level)
+    return app
+
+def _measure(client: TestClient, path: str, repeat: int) -> dict:
+    headers = {"Accept-Encoding": "gzip"}
+    client.get(path, headers=headers)  # aquecimento
+    wire_bytes, start = 0, time.perf_counter()
+    for _ in range(repeat):
+        with client.stream("GET", path, headers=headers) as response:
+            wire_bytes = sum(len(chunk) for chunk in response.iter_raw())
+    return {"ms": (time.perf_counter() - start) / repeat * 1000, "bytes": wire_bytes}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de compressão gzip das respostas.")
+    parser.add_argument("--books", type=int, default=20000, help="Livros na resposta")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 5, 9], help="Níveis de compressão")
+    parser.add_argument("--minimum-size", type=int, default=1024, help="GZIP_MINIMUM_SIZE")
+    parser.add_argument("--mbps", type=float, default=50.0, help="Banda do cliente (megabits/s)")
+    parser.add_argument("--repeat", type=int, default=5, help="Requisições medidas por variante")
+    args = parser.parse_args()
+    # Os logs por requisição do cliente de teste poluiriam a tabela
+    for name in ("httpx", "asyncio"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    rows = _rows(args.books)
+    original = len(orjson.dumps(rows))
+    print(f"{args.books} livros, corpo original {original / 1e6:.2f} MB, link {args.mbps:g} Mbit/s")
+    print(f"{'variante':>18} {'bytes':>12} {'razão':>7} {'servidor ms':>12} {'transfer. ms':>13} {'total ms':>9}")
+    for level in [None] + args.levels:
+        client = TestClient(_build_app(rows, level, args.minimum_size))
+        for path in ("/books", "/books.ndjson"):
+            result = _measure(client, path, args.repeat)
+            transfer_ms = result["bytes"] * 8 / (args.mbps * 1e6) * 1000
+            name = f"{'identity' if level is None else f'gzip-{level}'}{' ndjson' if path.endswith('ndjson') else ''}"
+            print(f"{name:>18} {result['bytes']:>12} {result['bytes'] / original:>7.3f} "
+                  f"{result['ms']:>12.1f} {transfer_ms:>13.1f} {result['ms'] + transfer_ms:>9.1f}")
+
+if __name__ == "__main__":
+    main()
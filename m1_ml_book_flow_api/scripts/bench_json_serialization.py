@@ -0,0 +1,73 @@
+"""
+Benchmark de serialização das respostas de listagem de livros.
+
+Compara, para uma lista de N livros, o caminho completo de uma rota FastAPI:
+- antes: modelos `Book`, validação contra `response_model=List[Book]` e
+  `JSONResponse` (json da biblioteca padrão)
+- depois: dicionários já no formato de `Book` devolvidos em `ORJSONResponse`
+
+Reporta tempo por requisição e bytes/segundo de corpo de resposta.
+
+Uso:
+    python -m m1_ml_book_flow_api.scripts.bench_json_serialization --books 100000 --repeat 5
+"""
+import argparse
+import time
+from typing import List
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+from m1_ml_book_flow_api.api.models.Book import Book
+
+def _rows(n_books: int) -> List[dict]:
+    return [
+        {
+            "id": i,
+            "title": f"Livro {i}",
+            "author": f"Autor {i % 500}",
+            "year": 1950 + i % 70,
+            "category": f"Categoria {i % 50}",
+            "price": round(10 + (i % 9000) / 100, 2),
+            "rating": float(i % 5 + 1),
+            "available": i % 3 != 0,
+            "image": f"https://books.toscrape.com/media/cache/{i:08d}.jpg",
+        }
+        for i in range(n_books)
+    ]
+
+def _build_app(rows: List[dict]) -> FastAPI:
+    models = [Book(**row) for row in rows]
+    app = FastAPI()
+
+    @app.get("/before", response_model=List[Book], response_class=JSONResponse)
+    def before():
+        return models
+
+    @app.get("/after", response_model=List[Book])
+    def after():
+        return ORJSONResponse(rows)
+
+    return app
+
+def _measure(client: TestClient, path: str, repeat: int) -> dict:
+    client.get(path)  # aquecimento
+    size, start = 0, time.perf_counter()
+    for _ in range(repeat):
+        size = len(client.get(path).content)
+    elapsed = (time.perf_counter() - start) / repeat
+    return {"ms": elapsed * 1000, "bytes": size, "mb_per_s": size / elapsed / 1e6}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de serialização da listagem de livros.")
+    parser.add_argument("--books", type=int, default=100000, help="Livros na resposta")
+    parser.add_argument("--repeat", type=int, default=5, help="Requisições medidas por variante")
+    args = parser.parse_args()
+
+    client = TestClient(_build_app(_rows(args.books)))
+    results = {name: _measure(client, f"/{name}", args.repeat) for name in ("before", "after")}
+    for name, result in results.items():
+        print(f"{name:>6}: {result['ms']:9.1f} ms/req  {result['bytes'] / 1e6:7.2f} MB  {result['mb_per_s']:8.1f} MB/s")
+    print(f"speedup: {results['before']['ms'] / results['after']['ms']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark de throughput dos formatadores de log JSON (registros/segundo).
+
+Formata o mesmo conjunto de registros típicos da API (log HTTP do middleware,
+com ~10 campos em `extra`, e logs de service) com:
+- CustomJsonFormatter (python-json-logger, formato anterior)
+- FastJsonFormatter com campos de origem (LOG_CALLER_INFO=true)
+- FastJsonFormatter sem campos de origem (padrão)
+
+Mede apenas a formatação (sem escrita), que é o trabalho feito pela thread de
+escrita dos logs para cada registro.
+
+Uso:
+    python -m m1_ml_book_flow_api.scripts.bench_log_formatter --records 200000
+"""
+import argparse
+import logging
+import time
+from typing import List
+from m1_ml_book_flow_api.core.logger import CustomJsonFormatter, FastJsonFormatter
+
+def _records(n: int) -> List[logging.LogRecord]:
+    records = []
+    for i in range(n):
+        if i % 2:
+            extra = {
+                "http_method": "GET", "http_path": "/api/v1/books", "http_status_code": 200,
+                "duration_ms": 12.5, "user_id": "1", "request_id": f"req-{i}", "client_ip": "10.0.0.1",
+                "query_params": None, "response_size": "5123", "sample_rate": 1.0, "event": "request_complete",
+            }
+            record = logging.LogRecord("BookFlow.http", logging.INFO, __file__, 10, "HTTP Request", (), None)
+        else:
+            extra = {"event": "list_all_books_success", "operation": "list_books", "books_count": i}
+            record = logging.LogRecord("BookFlow.books_service", logging.INFO, __file__, 20,
+                                       "Books listed successfully", (), None, func="list_all_books")
+        record.__dict__.update(extra)
+        records.append(record)
+    return records
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de throughput dos formatadores de log.")
+    parser.add_argument("--records", type=int, default=200000, help="Registros formatados por formatador")
+    args = parser.parse_args()
+
+    records = _records(args.records)
+    formatters = {
+        "CustomJsonFormatter": CustomJsonFormatter(
+            '%(timestamp)s %(level)s %(name)s %(message)s %(pathname)s %(lineno)d %(funcName)s'
+        ),
+        "FastJsonFormatter (caller info)": FastJsonFormatter(caller_info=True),
+        "FastJsonFormatter": FastJsonFormatter(),
+    }
+    baseline = None
+    for name, formatter in formatters.items():
+        start = time.perf_counter()
+        size = sum(len(formatter.format(record)) for record in records)
+        rate = args.records / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{name:>32}: {rate:>10,.0f} registros/s  {size / args.records:6.0f} bytes/registro  {rate / baseline:4.1f}x")
+
+if __name__ == "__main__":
+    main()
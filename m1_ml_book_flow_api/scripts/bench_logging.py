@@ -0,0 +1,117 @@
+"""
+Benchmark da latência das requisições com logging ligado e desligado.
+
+Uma rota que loga como os services da API (início, sucesso e o log HTTP do
+middleware) é chamada com `--concurrency` requisições simultâneas em processo
+(httpx + ASGITransport). Variantes:
+- off: logging desativado (`logging.disable`), referência
+- sync: StreamHandler com o CustomJsonFormatter no root logger (como antes)
+- async: BoundedQueueHandler + QueueListener (formatação e escrita em thread de fundo)
+
+Os logs vão para um arquivo temporário. `--sink-delay-ms` simula um destino
+lento (pipe do stdout para o coletor de logs do container) atrasando cada
+escrita; nesse caso a variante `async` mostra os descartes da política drop.
+
+Uso:
+    python -m m1_ml_book_flow_api.scripts.bench_logging --requests 3000 --concurrency 50 --sink-delay-ms 0.2
+"""
+import argparse
+import asyncio
+import logging
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener
+from typing import Optional, Tuple
+import httpx
+from fastapi import FastAPI
+from m1_ml_book_flow_api.core.logger import (
+    BoundedQueueHandler, CustomJsonFormatter, get_logger, root_logger, stop_logging
+)
+from m1_ml_book_flow_api.core.middleware import RequestObservabilityMiddleware
+
+class _SlowStream:
+    def __init__(self, stream, delay: float):
+        self.stream, self.delay = stream, delay
+
+    def write(self, data: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        return self.stream.write(data)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    logger = get_logger("bench_service")
+
+    @app.get("/books")
+    def books():
+        logger.info("Listando livros", extra={"event": "list_books_start"})
+        result = [{"id": i} for i in range(10)]
+        logger.info("Livros listados com sucesso", extra={"event": "list_books_success", "total_books": len(result)})
+        return result
+
+    app.add_middleware(RequestObservabilityMiddleware)
+    return app
+
+def _configure(variant: str, stream, queue_size: int, policy: str) -> Tuple[Optional[BoundedQueueHandler], Optional[QueueListener]]:
+    logging.disable(logging.CRITICAL if variant == "off" else logging.NOTSET)
+    output = logging.StreamHandler(stream)
+    output.setFormatter(CustomJsonFormatter(
+        '%(timestamp)s %(level)s %(name)s %(message)s %(pathname)s %(lineno)d %(funcName)s'
+    ))
+    root_logger.handlers.clear()
+    if variant != "async":
+        root_logger.addHandler(output)
+        return None, None
+    handler = BoundedQueueHandler(queue.Queue(queue_size), policy)
+    listener = QueueListener(handler.queue, output)
+    listener.start()
+    root_logger.addHandler(handler)
+    return handler, listener
+
+async def _run(app: FastAPI, total: int, concurrency: int) -> list:
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(n: int):
+            for _ in range(n):
+                start = time.perf_counter()
+                (await client.get("/books")).raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+    return sorted(latencies)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de latência com logging síncrono e assíncrono.")
+    parser.add_argument("--requests", type=int, default=3000, help="Requisições por variante")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requisições simultâneas")
+    parser.add_argument("--sink-delay-ms", type=float, default=0.0, help="Atraso por escrita no destino dos logs")
+    parser.add_argument("--queue-size", type=int, default=10000, help="LOG_QUEUE_SIZE")
+    parser.add_argument("--policy", choices=("drop", "block"), default="drop", help="LOG_QUEUE_POLICY")
+    args = parser.parse_args()
+    stop_logging()
+    for name in ("httpx", "asyncio"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    app = _build_app()
+    print(f"{args.requests} requisições, concorrência {args.concurrency}, atraso do destino {args.sink_delay_ms}ms")
+    print(f"{'variante':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'descartados':>12}")
+    with tempfile.TemporaryFile("w") as sink:
+        stream = _SlowStream(sink, args.sink_delay_ms / 1000)
+        for variant in ("off", "sync", "async"):
+            handler, listener = _configure(variant, stream, args.queue_size, args.policy)
+            start = time.perf_counter()
+            latencies = asyncio.run(_run(app, args.requests, args.concurrency))
+            elapsed = time.perf_counter() - start
+            if listener is not None:
+                listener.stop()
+            print(f"{variant:>8} {len(latencies) / elapsed:>8.0f} {latencies[len(latencies) // 2] * 1000:>8.2f} "
+                  f"{latencies[int(len(latencies) * 0.99) - 1] * 1000:>8.2f} "
+                  f"{handler.dropped if handler is not None else '-':>12}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark do custo por requisição da pilha de middlewares.
+
+Compara, em uma rota mínima (JSON pequeno) e em uma rota NDJSON em streaming:
+- sem middleware (referência)
+- antes: três middlewares BaseHTTPMiddleware (logging, contexto de
+  autenticação e tempo de processamento), reproduzidos aqui como estavam
+- depois: RequestObservabilityMiddleware (ASGI puro, uma única passagem)
+
+As requisições são disparadas em processo (httpx + ASGITransport, sem rede)
+com `--concurrency` requisições simultâneas, no estilo do wrk. Reporta
+requisições/segundo, latência média e p99 e o overhead por requisição em
+relação à referência. Por padrão os logs são desativados (`logging.disable`)
+para medir só o middleware (`--with-logging` mantém o handler da aplicação).
+
+Uso:
+    python -m m1_ml_book_flow_api.scripts.bench_middleware --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from typing import Optional
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from m1_ml_book_flow_api.api.utils.ndjson import ndjson_response
+from m1_ml_book_flow_api.core.logger import log_request, get_logger
+from m1_ml_book_flow_api.core.middleware import RequestObservabilityMiddleware
+from m1_ml_book_flow_api.core.security.security import create_access_token, decode_access_token
+
+class _LegacyLogging(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id, start = str(uuid.uuid4()), time.time()
+        request.state.request_id = request_id
+        get_logger("middleware").info("Request started", extra={"request_id": request_id, "event": "request_start"})
+        response = await call_next(request)
+        log_request(method=request.method, path=request.url.path, status_code=response.status_code,
+                    duration=time.time() - start, user_id=getattr(request.state, "user_id", None),
+                    request_id=request_id, event="request_complete")
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+class _LegacyContext(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        authorization = request.headers.get("authorization")
+        if authorization and authorization.startswith("Bearer "):
+            payload = decode_access_token(authorization.split(" ")[1])
+            if payload:
+                request.state.user_id = payload.get("sub")
+        return await call_next(request)
+
+class _LegacyMetrics(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start = time.time()
+        response = await call_next(request)
+        response.headers["X-Process-Time-ms"] = str(round((time.time() - start) * 1000, 2))
+        return response
+
+def _build_app(stack: Optional[str]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"status": "ok"}
+
+    @app.get("/stream")
+    def stream():
+        return ndjson_response(({"id": i} for i in range(200)), batch_size=20)
+
+    if stack == "before":
+        app.add_middleware(_LegacyLogging)
+        app.add_middleware(_LegacyContext)
+        app.add_middleware(_LegacyMetrics)
+    elif stack == "after":
+        app.add_middleware(RequestObservabilityMiddleware)
+    return app
+
+async def _run(app: FastAPI, path: str, total: int, concurrency: int, headers: dict) -> dict:
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path, headers=headers)  # aquecimento
+
+        async def worker(n: int):
+            for _ in range(n):
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do overhead dos middlewares por requisição.")
+    parser.add_argument("--requests", type=int, default=5000, help="Requisições por variante")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requisições simultâneas")
+    parser.add_argument("--with-logging", action="store_true", help="Mantém a escrita dos logs de requisição")
+    args = parser.parse_args()
+    if not args.with_logging:
+        logging.disable(logging.CRITICAL)
+    for name in ("httpx", "asyncio"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1', 'username': 'bench'})}"}
+    print(f"{args.requests} requisições, concorrência {args.concurrency}")
+    print(f"{'rota':>8} {'variante':>10} {'req/s':>9} {'média ms':>9} {'p99 ms':>8} {'overhead µs/req':>16}")
+    for path in ("/ping", "/stream"):
+        baseline = None
+        for stack in (None, "before", "after"):
+            result = asyncio.run(_run(_build_app(stack), path, args.requests, args.concurrency, headers))
+            per_request_us = 1e6 / result["rps"]
+            baseline = baseline or per_request_us
+            print(f"{path:>8} {stack or 'nenhum':>10} {result['rps']:>9.0f} {result['mean_ms']:>9.2f} "
+                  f"{result['p99_ms']:>8.2f} {per_request_us - baseline:>16.0f}")
+
+if __name__ == "__main__":
+    main()
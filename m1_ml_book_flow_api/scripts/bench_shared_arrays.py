@@ -0,0 +1,74 @@
+"""
+Benchmark de memória dos arrays do sistema de recomendação por worker.
+
+Simula N workers que carregam o índice de similaridade e mede, para cada
+processo, a memória privada (USS) e a memória proporcional (PSS) lidas de
+`/proc/self/smaps_rollup` (Linux). Compara:
+- índice construído em cada processo (memória duplicada por worker)
+- índice publicado uma vez e mapeado somente leitura (memória compartilhada)
+
+Uso:
+    python -m m1_ml_book_flow_api.scripts.bench_shared_arrays --books 20000 --workers 4
+"""
+import argparse
+import multiprocessing
+import tempfile
+import numpy as np
+from m1_ml_book_flow_api.ml.recommender import SimilarityIndex
+from m1_ml_book_flow_api.ml.shared_arrays import SharedArrayStore
+
+def _memory_kb() -> dict:
+    values = {}
+    with open("/proc/self/smaps_rollup") as handle:
+        for line in handle:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Private_Clean:", "Private_Dirty:"):
+                values[parts[0][:-1]] = int(parts[1])
+    return {"rss": values["Rss"], "pss": values["Pss"], "uss": values["Private_Clean"] + values["Private_Dirty"]}
+
+def _synthetic_vectors(n_books: int, seed: int = 7) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n_books, 32))
+
+def _worker(mode: str, n_books: int, directory: str, barrier, results) -> None:
+    baseline = _memory_kb()
+    if mode == "private":
+        index = SimilarityIndex.build(np.arange(n_books), _synthetic_vectors(n_books))
+    else:
+        store = SharedArrayStore(directory)
+        current = store.current("bench")
+        index = SimilarityIndex.from_arrays(store.load("bench", current["version"]), current["version"])
+    # Toca todas as páginas, como as consultas fariam ao longo do tempo
+    checksum = float(index.neighbor_scores.sum()) + float(index.vectors.sum())
+    barrier.wait()
+    after = _memory_kb()
+    results.put({key: after[key] - baseline[key] for key in after} | {"checksum": checksum})
+    barrier.wait()
+
+def run(mode: str, n_books: int, n_workers: int, directory: str) -> dict:
+    ctx = multiprocessing.get_context("fork")
+    barrier, results = ctx.Barrier(n_workers), ctx.Queue()
+    processes = [ctx.Process(target=_worker, args=(mode, n_books, directory, barrier, results)) for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    measurements = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {key: sum(m[key] for m in measurements) for key in ("rss", "pss", "uss")}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de memória do índice de similaridade por worker.")
+    parser.add_argument("--books", type=int, default=20000, help="Livros indexados")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Quantidades de workers simulados")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir="/dev/shm") as directory:
+        index = SimilarityIndex.build(np.arange(args.books), _synthetic_vectors(args.books))
+        SharedArrayStore(directory).publish("bench", index.to_arrays())
+        for n_workers in args.workers:
+            for mode in ("private", "shared"):
+                totals = run(mode, args.books, n_workers, directory)
+                print(f"[{mode:7}] workers={n_workers}: PSS total {totals['pss'] / 1024:8.1f} MiB | "
+                      f"USS total {totals['uss'] / 1024:8.1f} MiB")
+
+if __name__ == "__main__":
+    main()
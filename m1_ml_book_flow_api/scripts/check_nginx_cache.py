@@ -0,0 +1,91 @@
+"""
+Verificação do micro-cache do nginx para as leituras autenticadas do catálogo.
+
+Executar com o ambiente do docker-compose no ar (`docker compose up`). O script:
+1. Faz login e verifica MISS seguido de HIT para o mesmo token e a mesma URL
+2. Faz um segundo login (outro token, do mesmo ou de outro usuário) e verifica
+   que ele nunca recebe a resposta armazenada para o primeiro token (MISS)
+3. Dispara uma rajada de requisições idênticas e conta quantas chegaram ao
+   uvicorn (respostas servidas pelo cache repetem o `X-Request-ID` original)
+
+Uso:
+    python -m m1_ml_book_flow_api.scripts.check_nginx_cache --base-url http://localhost:8000 \\
+        --user admin:password123 --burst 200
+"""
+import argparse
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+
+def _login(base_url: str, credentials: str) -> str:
+    username, password = credentials.split(":", 1)
+    request = urllib.request.Request(
+        f"{base_url}/api/v1/login",
+        data=json.dumps({"username": username, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())["access_token"]
+
+def _get(base_url: str, path: str, token: str) -> Tuple[int, Dict[str, str]]:
+    request = urllib.request.Request(f"{base_url}{path}", headers={"Authorization": f"Bearer {token}"})
+    with urllib.request.urlopen(request) as response:
+        response.read()
+        return response.status, {key.lower(): value for key, value in response.headers.items()}
+
+def _check(condition: bool, message: str) -> bool:
+    print(f"  {'OK  ' if condition else 'FAIL'} {message}")
+    return condition
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verifica o micro-cache do nginx.")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="URL do nginx")
+    parser.add_argument("--path", default="/api/v1/stats/overview", help="Endpoint de leitura do catálogo")
+    parser.add_argument("--user", default="admin:password123", help="Credenciais do usuário (usuario:senha)")
+    parser.add_argument("--other-user", default=None, help="Credenciais do segundo login (padrão: --user)")
+    parser.add_argument("--burst", type=int, default=200, help="Requisições idênticas simultâneas")
+    parser.add_argument("--concurrency", type=int, default=50, help="Threads da rajada")
+    args = parser.parse_args()
+
+    token = _login(args.base_url, args.user)
+    # Parâmetro único: garante uma chave de cache ainda não usada
+    path = f"{args.path}{'&' if '?' in args.path else '?'}_check={time.time_ns()}"
+    results = []
+
+    print(f"Mesmo usuário, mesma URL ({path}):")
+    _, first = _get(args.base_url, path, token)
+    _, second = _get(args.base_url, path, token)
+    results.append(_check(first.get("x-cache-status") == "MISS", f"primeira requisição: {first.get('x-cache-status')}"))
+    results.append(_check(second.get("x-cache-status") == "HIT", f"segunda requisição: {second.get('x-cache-status')}"))
+    results.append(_check("x-cache-key" in first, f"X-Cache-Key: {first.get('x-cache-key')}"))
+
+    print("Outro token, mesma URL:")
+    # Tokens emitidos no mesmo segundo para o mesmo usuário são idênticos
+    time.sleep(1.1)
+    _, other = _get(args.base_url, path, _login(args.base_url, args.other_user or args.user))
+    results.append(_check(other.get("x-cache-status") == "MISS", f"requisição: {other.get('x-cache-status')}"))
+    if args.other_user:
+        results.append(_check(other.get("x-cache-key") != first.get("x-cache-key"),
+                              f"X-Cache-Key: {other.get('x-cache-key')}"))
+
+    print(f"Rajada de {args.burst} requisições idênticas (URL nova):")
+    burst_path = f"{path}-burst"
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        responses = list(executor.map(lambda _: _get(args.base_url, burst_path, token)[1], range(args.burst)))
+    elapsed = time.perf_counter() - start
+    upstream = len({headers.get("x-request-id") for headers in responses})
+    statuses: Dict[str, int] = {}
+    for headers in responses:
+        statuses[headers.get("x-cache-status", "-")] = statuses.get(headers.get("x-cache-status", "-"), 0) + 1
+    print(f"  status do cache: {statuses} em {elapsed * 1000:.0f}ms")
+    results.append(_check(upstream <= 2, f"requisições que chegaram ao uvicorn: {upstream}"))
+
+    print("\nResultado:", "OK" if all(results) else "FALHOU")
+    raise SystemExit(0 if all(results) else 1)
+
+if __name__ == "__main__":
+    main()
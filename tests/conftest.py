@@ -148,4 +148,52 @@ def mock_health_not_found():
 @pytest.fixture
 def mock_get_book_not_found():
     with patch('m1_ml_book_flow_api.api.services.books_service.get_book_by_id', return_value=None):
-        yield
\ No newline at end of file
+        yield
+
+def sample_books_models():
+    from m1_ml_book_flow_api.api.models.Book import Book
+    return [
+        Book(**sample_book(id=1, title="Livro A", category="Ficção", price=20.0, rating=4.0, available=True)),
+        Book(**sample_book(id=2, title="Livro B", category="Romance", price=30.0, rating=5.0, available=False)),
+        Book(**sample_book(id=3, title="Livro C", category="Ficção", price=40.0, rating=3.0, available=True)),
+    ]
+
+@pytest.fixture
+def mock_ml_books_success():
+    with patch('m1_ml_book_flow_api.api.services.ml_service.list_books', return_value=sample_books_models()):
+        yield
+
+@pytest.fixture
+def mock_ml_books_empty():
+    with patch('m1_ml_book_flow_api.api.services.ml_service.list_books', return_value=[]):
+        yield
+
+def sample_catalog_snapshot():
+    from m1_ml_book_flow_api.api.repositories.catalog_repository import CatalogSnapshot
+    rows = [
+        (book.id, book.title, book.author, book.year, book.category, book.price, book.rating, book.available, book.image)
+        for book in sample_books_models()
+    ]
+    return CatalogSnapshot.from_rows(rows, version=1)
+
+@pytest.fixture
+def mock_catalog_snapshot():
+    from m1_ml_book_flow_api.api.repositories.catalog_repository import CatalogStore
+    store = CatalogStore()
+    snapshot = store.set_snapshot(sample_catalog_snapshot())
+    with patch('m1_ml_book_flow_api.api.repositories.catalog_repository.catalog_store', store):
+        yield snapshot
+
+@pytest.fixture(autouse=True)
+def clear_catalog_caches():
+    from m1_ml_book_flow_api.core.catalog_version import clear_catalog_caches
+    clear_catalog_caches()
+    yield
+    clear_catalog_caches()
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    from m1_ml_book_flow_api.core.security.security import token_cache
+    token_cache.clear()
+    yield
+    token_cache.clear()
@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 import pytest
 from fastapi.testclient import TestClient
 from m1_ml_book_flow_api.main import app
@@ -126,4 +126,152 @@ def test_with_zero_max_price(auth_header, mock_price_range_success):
 
 def test_with_range_price(auth_header, mock_price_range_success):
     response = client.get("/api/v1/books/price_range?min=30.0&max=40.0", headers=auth_header)
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+def test_read_endpoints_from_catalog_snapshot(auth_header, mock_catalog_snapshot):
+    assert client.get("/api/v1/categories", headers=auth_header).json() == ["Ficção", "Romance"]
+    assert client.get("/api/v1/health").json()["total_books"] == 3
+    overview = client.get("/api/v1/stats/overview", headers=auth_header).json()
+    assert overview["total_books"] == 3 and overview["middle_price"] == 30.0
+    assert client.get("/api/v1/stats/categories", headers=auth_header).json() == [
+        {"category_name": "Ficção", "quantity_books": 2, "category_price": 30.0},
+        {"category_name": "Romance", "quantity_books": 1, "category_price": 30.0},
+    ]
+    top = client.get("/api/v1/books/top-rated?number_items=2", headers=auth_header).json()
+    assert [book["title"] for book in top] == ["Livro B", "Livro A"]
+
+def test_stats_overview_ignores_books_without_rating(auth_header):
+    from m1_ml_book_flow_api.api.repositories.catalog_repository import CatalogSnapshot, CatalogStore
+    rows = [
+        (1, "Livro A", "Autor A", 2020, "Ficção", 20.0, 4.0, True, ""),
+        (2, "Livro B", "Autor B", 2021, "Ficção", 40.0, None, True, ""),
+    ]
+    store = CatalogStore()
+    store.set_snapshot(CatalogSnapshot.from_rows(rows, version=1))
+    with patch('m1_ml_book_flow_api.api.repositories.catalog_repository.catalog_store', store):
+        overview = client.get("/api/v1/stats/overview", headers=auth_header).json()
+    assert overview["total_books"] == 2
+    assert overview["distribution_ratings"] == {"4.0": 1}
+
+def test_catalog_store_builds_first_snapshot_once():
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from m1_ml_book_flow_api.api.repositories.catalog_repository import CatalogStore
+    store = CatalogStore()
+    calls = []
+
+    def slow_fetch(db):
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        return []
+
+    with patch('m1_ml_book_flow_api.api.repositories.catalog_repository._fetch_rows', side_effect=slow_fetch), \
+         patch('m1_ml_book_flow_api.api.repositories.catalog_repository.get_db', side_effect=lambda: iter([MagicMock()])):
+        assert not store.is_loaded
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            snapshots = list(pool.map(lambda _: store.get(), range(8)))
+    assert len(calls) == 1 and store.is_loaded
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+
+def test_catalog_version_change_refreshes_snapshot_and_caches(auth_header, mock_catalog_snapshot):
+    from m1_ml_book_flow_api.api.repositories import catalog_repository
+    from m1_ml_book_flow_api.core.catalog_version import CatalogVersionWatcher
+    watcher = CatalogVersionWatcher(listen=False)
+    seen = []
+    watcher.subscribe(lambda version: seen.append((version, watcher.version)))
+    watcher.subscribe(catalog_repository._on_catalog_version)
+    rows = [(9, "Livro Z", "Autor Z", 2024, "Poesia", 10.0, 5.0, True, "")]
+    with patch('m1_ml_book_flow_api.core.catalog_version.catalog_version_watcher', watcher), \
+         patch('m1_ml_book_flow_api.api.repositories.catalog_repository._fetch_rows', return_value=rows):
+        assert client.get("/api/v1/categories", headers=auth_header).json() == ["Ficção", "Romance"]
+        assert watcher.set_version(1)
+        assert not watcher.set_version(1)
+        assert seen == [(1, 0)]
+        assert client.get("/api/v1/categories", headers=auth_header).json() == ["Poesia"]
+
+def test_scraping_publishes_catalog_version_once_per_run():
+    from m1_ml_book_flow_api.api.services import scraping_trigger_service
+    db = MagicMock()
+    pages = {1: [{"title": "Livro A", "price": 10.0}], 2: [{"title": "Livro B", "price": 20.0}], 3: []}
+    service = 'm1_ml_book_flow_api.api.services.scraping_trigger_service'
+    with patch(f'{service}.get_total_pages', return_value=3), \
+         patch(f'{service}.scrape_page', side_effect=lambda page, total: pages[page]), \
+         patch(f'{service}.has_next_page', return_value=True), \
+         patch('m1_ml_book_flow_api.api.repositories.scraping_repository.bump_catalog_version', return_value=1) as mock_bump, \
+         patch(f'{service}.catalog_version_watcher') as mock_watcher:
+        result = scraping_trigger_service.trigger_scraping(db)
+    assert result["saved_count"] == 2
+    assert db.commit.call_count == 3
+    mock_bump.assert_called_once_with(db)
+    mock_watcher.check.assert_called_once_with()
+
+def test_catalog_etag_revalidation(auth_header, mock_catalog_snapshot):
+    from m1_ml_book_flow_api.core.catalog_version import CatalogVersionWatcher
+    watcher = CatalogVersionWatcher(listen=False)
+    with patch('m1_ml_book_flow_api.core.middleware.catalog_version_watcher', watcher):
+        first = client.get("/api/v1/categories", headers=auth_header)
+        etag = first.headers["etag"]
+        assert first.status_code == 200
+        assert first.headers["cache-control"].startswith("private, max-age=")
+        assert first.headers["vary"].startswith("Authorization, Accept")
+        assert first.headers["x-cache-key"].endswith(":/api/v1/categories?")
+
+        cached = client.get("/api/v1/categories", headers={**auth_header, "If-None-Match": etag})
+        assert cached.status_code == 304 and cached.content == b""
+        assert client.get("/api/v1/categories", headers={"If-None-Match": etag}).status_code != 304
+        other_query = client.get("/api/v1/books/top-rated?number_items=1", headers={**auth_header, "If-None-Match": etag})
+        assert other_query.status_code == 200
+
+        watcher.set_version(2)
+        changed = client.get("/api/v1/categories", headers={**auth_header, "If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+def test_book_rows_keep_model_defaults():
+    from m1_ml_book_flow_api.api.models.Book import Book
+    from m1_ml_book_flow_api.api.repositories.books_repository import _row_to_dict
+    row = _row_to_dict((7, "Livro", None, None, None, 10.0, None, True, None))
+    assert row == Book(**row).model_dump()
+    assert row["author"] == "" and row["year"] == 0 and row["rating"] == 0.0
+
+def test_books_ndjson_stream_from_server_side_cursor(auth_header):
+    import json
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from m1_ml_book_flow_api.core.database import Base
+    from m1_ml_book_flow_api.core.models import BookDB
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    def book(i):
+        return {"id": i, "title": f"Livro {i}", "author": "Autor", "year": 2020, "category": "Ficção",
+                "price": 10.0 * i, "rating": 4.0, "available": True, "image": ""}
+
+    with Session() as db:
+        db.add_all([BookDB(**book(i)) for i in range(1, 6)])
+        db.commit()
+    with patch('m1_ml_book_flow_api.api.repositories.books_repository.SessionLocal', Session), \
+         patch('m1_ml_book_flow_api.api.services.books_service.NDJSON_BATCH_SIZE', 2):
+        headers = {**auth_header, "Accept": "application/x-ndjson"}
+        response = client.get("/api/v1/books/price_range?min=20&max=40", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == [2, 3, 4]
+        assert rows[0] == book(2)
+        response = client.get("/api/v1/books/search?title=Livro 5", headers=headers)
+        assert [json.loads(line)["id"] for line in response.text.splitlines()] == [5]
+
+def test_large_responses_are_gzip_compressed(auth_header):
+    books = [{"id": i, "title": f"Livro {i}", "author": "Autor", "year": 2020, "category": "Ficção",
+              "price": 10.0, "rating": 4.0, "available": True, "image": ""} for i in range(100)]
+    headers = {**auth_header, "Accept-Encoding": "gzip"}
+    with patch('m1_ml_book_flow_api.api.services.books_service.list_books', return_value=books):
+        response = client.get("/api/v1/books", headers=headers)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == books
+    with patch('m1_ml_book_flow_api.api.services.books_service.list_books', return_value=books[:1]):
+        small = client.get("/api/v1/books", headers=headers)
+    assert "content-encoding" not in small.headers
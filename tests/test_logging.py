@@ -0,0 +1,65 @@
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from m1_ml_book_flow_api.main import app
+
+client = TestClient(app)
+
+def test_log_queue_drops_records_when_full():
+    import logging
+    import queue
+    from m1_ml_book_flow_api.core.logger import BoundedQueueHandler
+    handler = BoundedQueueHandler(queue.Queue(1), policy="drop")
+    for i in range(3):
+        handler.handle(logging.LogRecord("BookFlow.test", logging.INFO, __file__, 1, "registro %s", (i,), None))
+    assert handler.dropped == 2
+    record = handler.queue.get_nowait()
+    assert record.getMessage() == "registro 0" and record.args is None
+
+def test_log_queue_prepare_keeps_caller_record_intact():
+    import logging
+    import queue
+    import sys
+    from m1_ml_book_flow_api.core.logger import BoundedQueueHandler
+    handler = BoundedQueueHandler(queue.Queue(1), policy="drop")
+    try:
+        raise ValueError("falha")
+    except ValueError:
+        exc_info = sys.exc_info()
+    record = logging.LogRecord("BookFlow.test", logging.ERROR, __file__, 1, "erro %s", ("x",), exc_info)
+    handler.handle(record)
+    assert record.args == ("x",) and record.exc_info is exc_info
+    queued = handler.queue.get_nowait()
+    assert queued is not record
+    assert queued.getMessage() == "erro x" and queued.exc_info is None and "ValueError: falha" in queued.exc_text
+
+def test_request_logging_policy_samples_by_route():
+    import logging
+    from m1_ml_book_flow_api.core import logger
+    rates = {"/metrics": 0.0, "/api/v1/health": 0.0, "/api/v1": 0.5}
+    with patch.dict(logger.LOG_ROUTE_SAMPLE_RATES, rates, clear=True):
+        assert logger.request_sample_rate("/metrics") == 0.0
+        assert logger.request_sample_rate("/api/v1/health") == 0.0
+        assert logger.request_sample_rate("/api/v1/books/1") == 0.5
+        assert logger.request_sample_rate("/docs") == 1.0
+        assert not logger.sample_request("/api/v1/health")
+        with patch('m1_ml_book_flow_api.core.middleware.log_request') as mock_log_request:
+            assert client.get("/metrics").status_code == 200
+        assert not mock_log_request.called
+    assert logger.request_log_level(200, 5.0, sampled=False) == logging.NOTSET
+    assert logger.request_log_level(200, 5.0, sampled=True) == logging.INFO
+    assert logger.request_log_level(200, logger.LOG_SLOW_REQUEST_MS, sampled=False) == logging.WARNING
+    assert logger.request_log_level(503, 5.0, sampled=False) == logging.ERROR
+
+def test_fast_json_formatter_matches_previous_fields():
+    import json
+    import logging
+    from m1_ml_book_flow_api.core.logger import CustomJsonFormatter, FastJsonFormatter
+    record = logging.LogRecord("BookFlow.http", logging.INFO, __file__, 10, "HTTP %s", ("Request",), None)
+    record.__dict__.update({"event": "request_complete", "http_status_code": 200, "user_id": None})
+    previous = json.loads(CustomJsonFormatter(
+        '%(timestamp)s %(level)s %(name)s %(message)s %(pathname)s %(lineno)d %(funcName)s'
+    ).format(record))
+    fast = json.loads(FastJsonFormatter(caller_info=True).format(record))
+    assert fast.keys() == previous.keys()
+    assert {k: v for k, v in fast.items() if k != "timestamp"} == {k: v for k, v in previous.items() if k != "timestamp"}
+    assert "pathname" not in json.loads(FastJsonFormatter().format(record))
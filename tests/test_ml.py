@@ -0,0 +1,336 @@
+import pytest
+import jwt
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from m1_ml_book_flow_api.main import app
+from m1_ml_book_flow_api.core.security.security import SECRET_KEY, ALGORITHM
+
+client = TestClient(app)
+
+def create_test_token(user_id: str, expires_delta: timedelta = None):
+    to_encode = {"sub": user_id, "type": "access"}
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=30))
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+@pytest.fixture
+def auth_header():
+    token = create_test_token("admin")
+    return {"Authorization": f"Bearer {token}"}
+
+def test_training_data_stats(auth_header, mock_ml_books_success):
+    response = client.get("/api/v1/ml/training-data", headers=auth_header)
+    assert response.status_code == 200
+    info = response.json()["dataset_info"]
+    assert info["rating_stats"]["avg"] == pytest.approx(4.0)
+    assert info["price_stats"]["min"] == 20.0
+    assert info["price_stats"]["max"] == 40.0
+    assert info["availability_ratio"] == pytest.approx(2 / 3)
+    assert sorted(info["categories"]) == ["Ficção", "Romance"]
+
+def test_training_stats_endpoint(auth_header, mock_ml_books_success):
+    response = client.get("/api/v1/ml/training-data/stats", headers=auth_header)
+    assert response.status_code == 200
+    body = response.json()
+    assert "training_data" not in body
+    assert body["total_records"] == 3
+    assert body["dataset_info"]["price_stats"]["std"] == pytest.approx(8.1650, abs=1e-4)
+
+def test_training_stats_not_found(auth_header, mock_ml_books_empty):
+    response = client.get("/api/v1/ml/training-data/stats", headers=auth_header)
+    assert response.status_code == 404
+
+@pytest.fixture
+def trained_registry(tmp_path):
+    from unittest.mock import patch
+    from m1_ml_book_flow_api.ml.registry import ModelRegistry, save_model
+    from m1_ml_book_flow_api.ml.train import train_model
+    rows = [
+        {"title_length": 10 + i, "year": 2000 + i, "price": 10.0 + 2 * i, "available": i % 2 == 0,
+         "category": "Ficção" if i % 2 else "Romance"}
+        for i in range(20)
+    ]
+    targets = {
+        "target_rating": [1.0 + (i % 5) for i in range(20)],
+        "target_price": [row["price"] for row in rows],
+        "target_category": [row["category"] for row in rows],
+    }
+    for model_type in ("rating", "price", "category"):
+        encoder, estimator, metrics = train_model(model_type, rows, targets)
+        save_model(model_type, "v1", encoder, estimator, metrics, models_dir=str(tmp_path))
+    registry = ModelRegistry(models_dir=str(tmp_path), reload_interval=3600)
+    registry.load()
+    with patch('m1_ml_book_flow_api.api.services.ml_service.model_registry', registry):
+        yield registry
+
+def test_prediction_uses_loaded_model(auth_header, trained_registry):
+    payload = {"model_type": "category", "input_features": {"book_id": 7, "year": 2019, "price": 48.0, "available": False}}
+    response = client.post("/api/v1/ml/predictions", json=payload, headers=auth_header)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["model_info"]["model_version"] == "v1"
+    assert body["predictions"][0]["prediction_value"] in ("Ficção", "Romance")
+
+def test_registry_hot_swaps_new_version(trained_registry):
+    from m1_ml_book_flow_api.ml.registry import save_model
+    old_model = trained_registry.get("price")
+    save_model("price", "v2", old_model.encoder, old_model.estimator, old_model.metrics, models_dir=trained_registry.models_dir)
+    trained_registry.load()
+    assert trained_registry.get("price").version == "v2"
+    assert old_model.version == "v1"
+
+def test_registry_reloads_in_background_thread(trained_registry):
+    import time
+    from m1_ml_book_flow_api.ml.registry import save_model
+    model = trained_registry.get("rating")
+    save_model("rating", "v2", model.encoder, model.estimator, model.metrics, models_dir=trained_registry.models_dir)
+    # get() não lê o diretório: a nova versão só é vista após a recarga em segundo plano
+    assert trained_registry.get("rating").version == "v1"
+    trained_registry.reload_interval = 0.01
+    trained_registry.start()
+    try:
+        deadline = time.monotonic() + 5
+        while trained_registry.get("rating").version != "v2" and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        trained_registry.stop()
+    assert trained_registry.get("rating").version == "v2"
+
+def test_prediction_falls_back_to_heuristic(auth_header, tmp_path):
+    from unittest.mock import patch
+    from m1_ml_book_flow_api.ml.registry import ModelRegistry
+    with patch('m1_ml_book_flow_api.api.services.ml_service.model_registry', ModelRegistry(models_dir=str(tmp_path))):
+        payload = {"model_type": "rating", "input_features": {"year": 2023, "price": 60}}
+        response = client.post("/api/v1/ml/predictions", json=payload, headers=auth_header)
+    assert response.status_code == 200
+    assert response.json()["predictions"][0]["prediction_value"] == 3.8
+
+def test_batch_predictions_keep_input_order(auth_header, tmp_path):
+    from unittest.mock import patch
+    from m1_ml_book_flow_api.ml.registry import ModelRegistry
+    rows = [{"book_id": i, "year": 2019 + i, "price": 45.0} for i in range(4)]
+    with patch('m1_ml_book_flow_api.api.services.ml_service.model_registry', ModelRegistry(models_dir=str(tmp_path))):
+        response = client.post("/api/v1/ml/predictions/batch", json={"model_type": "category", "rows": rows}, headers=auth_header)
+    assert response.status_code == 200
+    predictions = response.json()["predictions"]
+    assert [p["book_id"] for p in predictions] == [0, 1, 2, 3]
+    assert [p["prediction_value"] for p in predictions] == [
+        "Literatura Premium", "Literatura Premium", "Ficção Contemporânea", "Ficção Contemporânea"
+    ]
+
+def test_batch_predictions_columnar_matches_rows(auth_header, trained_registry):
+    rows = [{"year": 2001 + i, "price": 10.0 + i, "title_length": 20, "category": "Romance", "available": True} for i in range(5)]
+    columns = {key: [row[key] for row in rows] for key in rows[0]}
+    by_rows = client.post("/api/v1/ml/predictions/batch", json={"model_type": "rating", "rows": rows}, headers=auth_header)
+    by_columns = client.post("/api/v1/ml/predictions/batch", json={"model_type": "rating", "columns": columns}, headers=auth_header)
+    assert by_rows.status_code == by_columns.status_code == 200
+    assert by_rows.json()["predictions"] == by_columns.json()["predictions"]
+
+def test_batch_predictions_by_book_ids(auth_header, tmp_path):
+    from unittest.mock import patch
+    from m1_ml_book_flow_api.ml.registry import ModelRegistry
+    from tests.conftest import sample_books_models
+    with patch('m1_ml_book_flow_api.api.services.ml_service.model_registry', ModelRegistry(models_dir=str(tmp_path))), \
+         patch('m1_ml_book_flow_api.api.services.ml_service.get_books_by_ids', return_value=sample_books_models()):
+        ok = client.post("/api/v1/ml/predictions/batch", json={"model_type": "price", "book_ids": [3, 1]}, headers=auth_header)
+        missing = client.post("/api/v1/ml/predictions/batch", json={"model_type": "price", "book_ids": [99]}, headers=auth_header)
+    assert [p["book_id"] for p in ok.json()["predictions"]] == [3, 1]
+    assert missing.status_code == 404
+
+def test_batch_predictions_requires_single_input(auth_header):
+    response = client.post("/api/v1/ml/predictions/batch", json={"model_type": "rating", "rows": [{}], "book_ids": [1]}, headers=auth_header)
+    assert response.status_code == 422
+
+def test_batch_size_limit_is_checked_before_resolving_input(auth_header):
+    from unittest.mock import patch
+    service = 'm1_ml_book_flow_api.api.services.ml_service'
+    with patch(f'{service}.ML_BATCH_MAX_ROWS', 2), \
+         patch(f'{service}.get_books_by_ids') as mock_get_books, \
+         patch(f'{service}.rows_to_columns') as mock_rows_to_columns:
+        for payload in ({"book_ids": [1, 2, 3]}, {"rows": [{}, {}, {}]}, {"columns": {"price": [1.0, 2.0, 3.0]}}):
+            response = client.post("/api/v1/ml/predictions/batch", json={"model_type": "rating", **payload}, headers=auth_header)
+            assert response.status_code == 422
+    mock_get_books.assert_not_called()
+    mock_rows_to_columns.assert_not_called()
+
+def test_concurrent_predictions_are_micro_batched(tmp_path):
+    import asyncio
+    from unittest.mock import patch
+    from m1_ml_book_flow_api.ml.registry import ModelRegistry
+    from m1_ml_book_flow_api.api.services import ml_service
+    from m1_ml_book_flow_api.api.models.MLPredictions import PredictionRequest
+
+    requests = [PredictionRequest(model_type="rating", input_features={"book_id": i, "year": 2023, "price": 60}) for i in range(8)]
+
+    async def run_all():
+        batcher = ml_service.MicroBatcher(ml_service._run_rows_inference, window_ms=50, max_batch_size=64)
+        with patch.object(ml_service, 'prediction_batcher', batcher):
+            return await asyncio.gather(*(ml_service.process_ml_predictions_async(r) for r in requests))
+
+    with patch.object(ml_service, 'model_registry', ModelRegistry(models_dir=str(tmp_path))):
+        responses = asyncio.run(run_all())
+    assert [r.predictions[0].book_id for r in responses] == list(range(8))
+    assert all(r.predictions[0].prediction_value == 3.8 for r in responses)
+    assert all(r.metadata["batch_size"] == 8 for r in responses)
+
+def test_micro_batcher_keeps_tasks_and_flushes_on_close(tmp_path):
+    import asyncio
+    from unittest.mock import patch
+    from m1_ml_book_flow_api.ml.registry import ModelRegistry
+    from m1_ml_book_flow_api.api.services import ml_service
+
+    async def run():
+        batcher = ml_service.MicroBatcher(ml_service._run_rows_inference, window_ms=60000, max_batch_size=64)
+        submitted = asyncio.ensure_future(batcher.submit("rating", {"book_id": 1, "year": 2023, "price": 60}))
+        await asyncio.sleep(0)
+        await batcher.close()
+        result = await asyncio.wait_for(submitted, timeout=5)
+        return result, batcher._tasks
+
+    with patch.object(ml_service, 'model_registry', ModelRegistry(models_dir=str(tmp_path))):
+        (value, _, _, batch_size), tasks = asyncio.run(run())
+    assert value == 3.8 and batch_size == 1
+    assert not tasks
+
+def test_similarity_index_neighbours_and_recommendations():
+    from m1_ml_book_flow_api.ml.recommender import SimilarityIndex
+    import numpy as np
+    vectors = np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0], [0.1, 0.9]])
+    index = SimilarityIndex.build(np.array([10, 11, 12, 13]), vectors, top_k=2, block_size=3)
+    assert [book_id for book_id, _ in index.similar(10, 2)] == [11, 13]
+    assert index.similar(12, 1)[0][0] == 13
+    assert index.recommend([10, 11], k=1)[0][0] == 13
+    assert index.recommend([99], k=3) == []
+
+def test_similar_books_route(auth_header, mock_ml_books_success):
+    from unittest.mock import patch
+    from m1_ml_book_flow_api.ml.recommender import SimilarityIndexHolder
+    with patch('m1_ml_book_flow_api.api.services.ml_service.similarity_index', SimilarityIndexHolder()):
+        response = client.get("/api/v1/ml/books/1/similar?k=1", headers=auth_header)
+        missing = client.get("/api/v1/ml/books/99/similar", headers=auth_header)
+        recommendation = client.post("/api/v1/ml/predictions", headers=auth_header, json={
+            "model_type": "recommendation", "input_features": {"source": "test"}, "book_ids": [1],
+            "prediction_params": {"k": 2}
+        })
+    assert response.status_code == 200
+    assert [book["book_id"] for book in response.json()["similar_books"]] == [3]
+    assert missing.status_code == 404
+    predictions = recommendation.json()["predictions"]
+    assert [p["book_id"] for p in predictions][0] == 3
+    assert 1 not in [p["book_id"] for p in predictions]
+
+def test_prediction_cache_hit_and_invalidation_on_new_version(auth_header, trained_registry):
+    from unittest.mock import patch
+    from m1_ml_book_flow_api.core.cache import TTLCache
+    from m1_ml_book_flow_api.ml.registry import save_model
+    payload = {"model_type": "price", "input_features": {"year": 2010, "price": 31.0, "category": "Romance"}}
+    with patch('m1_ml_book_flow_api.api.services.ml_service.prediction_cache', TTLCache(100, 60)):
+        first = client.post("/api/v1/ml/predictions", json=payload, headers=auth_header).json()
+        second = client.post("/api/v1/ml/predictions", json=payload, headers=auth_header).json()
+        old_model = trained_registry.get("price")
+        save_model("price", "v2", old_model.encoder, old_model.estimator, old_model.metrics, models_dir=trained_registry.models_dir)
+        trained_registry.load()
+        third = client.post("/api/v1/ml/predictions", json=payload, headers=auth_header).json()
+    assert first["metadata"]["cache"] == "miss"
+    assert second["metadata"]["cache"] == "hit"
+    assert second["metadata"]["cache_hits"] == 1
+    assert second["predictions"] == first["predictions"]
+    assert third["metadata"]["cache"] == "miss"
+    assert third["model_info"]["model_version"] == "v2"
+
+def test_ttl_cache_evicts_least_recently_used():
+    from m1_ml_book_flow_api.core.cache import TTLCache
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    expired = TTLCache(maxsize=2, ttl=0)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+
+def test_similarity_index_is_shared_between_workers(tmp_path):
+    import numpy as np
+    from m1_ml_book_flow_api.api.models.MLFeatures import BookFeature
+    from m1_ml_book_flow_api.ml.recommender import SimilarityIndexHolder
+    from m1_ml_book_flow_api.ml.shared_arrays import SharedArrayStore
+
+    def features(n):
+        return [BookFeature(id=i, title_length=10, author_encoded=0, year_normalized=i / n, category_encoded=i % 2,
+                            price_normalized=(n - i) / n, rating_normalized=0.5, availability_flag=1,
+                            popularity_score=0.5) for i in range(n)]
+
+    store = SharedArrayStore(str(tmp_path))
+    first = SimilarityIndexHolder(store, reload_interval=0)
+    second = SimilarityIndexHolder(store, reload_interval=0)
+    built = first.get_or_build(lambda: features(6))
+    mapped = second.get_or_build(lambda: pytest.fail("o segundo worker não deve reconstruir o índice"))
+    assert isinstance(mapped.neighbor_ids, np.memmap)
+    assert mapped.similar(0, 3) == built.similar(0, 3)
+
+    first.refresh(lambda: features(8))
+    assert second.get().size == 8
+
+    from unittest.mock import patch
+    # Arrays de uma execução anterior do servidor ou de outra versão do catálogo são reconstruídos
+    restarted = SimilarityIndexHolder(store, reload_interval=0)
+    with patch('m1_ml_book_flow_api.ml.shared_arrays.ML_SHARED_RUN_ID', "next-run"):
+        assert restarted.get() is None
+        assert restarted.get_or_build(lambda: features(5)).size == 5
+        newer_catalog = SimilarityIndexHolder(store, reload_interval=0)
+        assert newer_catalog.get_or_build(lambda: features(7), catalog_version=2).size == 7
+
+def test_single_flight_coalesces_concurrent_calls():
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from m1_ml_book_flow_api.api.utils.singleflight import SingleFlight
+    flight = SingleFlight("test")
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"value": 42}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        leader = executor.submit(flight.do, "key", compute)
+        started.wait(5)
+        followers = [executor.submit(flight.do, "key", compute) for _ in range(7)]
+        while flight.coalesced < 7:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"executed": 1, "coalesced": 7, "in_flight": 0}
+
+    with pytest.raises(ValueError):
+        flight.do("error", lambda: (_ for _ in ()).throw(ValueError("falha")))
+    assert flight.do("key", lambda: "novo") == "novo"
+
+def test_features_payload_matches_response_model(auth_header, mock_ml_books_success):
+    from m1_ml_book_flow_api.api.models.MLFeatures import MLFeaturesResponse
+    response = client.get("/api/v1/ml/features", headers=auth_header)
+    assert response.status_code == 200
+    body = MLFeaturesResponse.model_validate(response.json())
+    assert body.total_records == 3
+    assert [feature.id for feature in body.features] == [1, 2, 3]
+
+def test_training_data_ndjson_stream(auth_header):
+    import json
+    from unittest.mock import patch
+    rows = [{"id": i, "title": f"Livro {i}", "author": "Autor", "year": 2020, "category": "Ficção",
+             "price": 10.0, "rating": 4.0, "available": i % 2 == 0, "image": ""} for i in range(3)]
+    with patch('m1_ml_book_flow_api.api.services.ml_service.stream_books', return_value=iter(rows)):
+        response = client.get("/api/v1/ml/training-data",
+                              headers={**auth_header, "Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["id"] for record in records] == [0, 1, 2]
+    assert records[0]["target_popularity"] == pytest.approx(4.0 * 0.8 + 0.2)
+    assert records[1]["features"]["available"] is False
@@ -0,0 +1,165 @@
+from unittest.mock import patch
+import pytest
+import jwt
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from m1_ml_book_flow_api.main import app
+from m1_ml_book_flow_api.core.security.security import SECRET_KEY, ALGORITHM
+
+client = TestClient(app)
+
+def create_test_token(user_id: str, expires_delta: timedelta = None):
+    to_encode = {"sub": user_id, "type": "access"}
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=30))
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+@pytest.fixture
+def auth_header():
+    token = create_test_token("admin")
+    return {"Authorization": f"Bearer {token}"}
+
+def test_observability_headers_and_auth_context(auth_header, mock_list_books_success):
+    from m1_ml_book_flow_api.core.middleware import RequestObservabilityMiddleware
+    with patch('m1_ml_book_flow_api.core.middleware.log_request') as mock_log_request:
+        response = client.get("/api/v1/books", headers=auth_header)
+    assert response.status_code == 200
+    assert len(response.headers["x-request-id"]) == 36
+    assert float(response.headers["x-process-time-ms"]) >= 0
+    logged = mock_log_request.call_args.kwargs
+    assert logged["status_code"] == 200 and logged["request_id"] == response.headers["x-request-id"]
+    assert logged["user_id"] is not None
+    assert RequestObservabilityMiddleware._auth_context("Bearer invalido") == {}
+
+def test_server_timing_reports_stages_by_route_template(auth_header, mock_list_books_success, mock_get_book_success):
+    from prometheus_client import REGISTRY
+    from m1_ml_book_flow_api.core.timing import span
+    response = client.get("/api/v1/books", headers=auth_header)
+    stages = {item.split(";")[0] for item in response.headers["server-timing"].split(", ")}
+    # Rota síncrona: a serialização roda no threadpool e ainda entra nos spans da requisição
+    assert {"auth", "serialize", "total"} <= stages
+
+    labels = {"route": "/api/v1/books/{book_id}", "stage": "auth"}
+    before = REGISTRY.get_sample_value("bookflow_request_stage_duration_seconds_count", labels) or 0
+    client.get("/api/v1/books/1", headers=auth_header)
+    assert REGISTRY.get_sample_value("bookflow_request_stage_duration_seconds_count", labels) == before + 1
+
+    with span("db"):
+        pass  # fora de uma requisição: não registra nada
+
+def test_sql_queries_are_counted_per_request_and_slow_ones_logged():
+    from prometheus_client import REGISTRY
+    from sqlalchemy import create_engine, text
+    from m1_ml_book_flow_api.core import database
+    from m1_ml_book_flow_api.core.timing import current_timings, reset_request_timings, start_request_timings
+    engine = database.instrument_engine(create_engine("sqlite://"))
+    token = start_request_timings("req-1")
+    try:
+        with engine.connect() as conn, patch.object(database, "DB_SLOW_QUERY_MS", 0.0), \
+                patch.object(database.db_logger, "warning") as mock_warning:
+            for book_id in (1, 2, 3):
+                conn.execute(text("SELECT :id AS id"), {"id": book_id})
+        timings = current_timings()
+        assert timings.db_queries == 3 and timings.db_seconds > 0
+    finally:
+        reset_request_timings(token)
+    assert mock_warning.call_count == 3
+    assert mock_warning.call_args.kwargs["extra"]["request_id"] == "req-1"
+    assert mock_warning.call_args.kwargs["extra"]["statement"] == "SELECT ? AS id"
+    assert REGISTRY.get_sample_value("bookflow_db_query_duration_seconds_count", {"statement": "SELECT ? AS id"}) >= 3
+
+def test_statement_labels_cap_holds_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    from m1_ml_book_flow_api.core import database
+    statements = [f"SELECT * FROM table_{i}" for i in range(64)]
+    with patch.object(database, "_statement_labels", set()), \
+         patch.object(database, "DB_METRICS_MAX_STATEMENTS", 10):
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            labels = list(pool.map(database._statement_label, statements))
+        assert len(database._statement_labels) == 10
+    assert labels.count("other") == 54
+
+def test_admin_profile_returns_collapsed_stacks(auth_header):
+    from fastapi import FastAPI
+    from m1_ml_book_flow_api.api.routes import admin
+    from m1_ml_book_flow_api.core.security import security
+    admin_app = FastAPI()
+    admin_app.include_router(admin.router, prefix="/api/v1")
+    admin_client = TestClient(admin_app)
+    with patch.object(security, "ADMIN_USERS", {"admin"}):
+        response = admin_client.get("/api/v1/admin/profile", params={"seconds": 0.1, "interval_ms": 5, "include_idle": True},
+                                    headers=auth_header)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert int(response.headers["x-profile-samples"]) > 0
+        lines = response.text.splitlines()
+        assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert not any("stack-sampler" in line for line in lines)
+
+        other_user = {"Authorization": f"Bearer {create_test_token('1')}"}
+        assert admin_client.get("/api/v1/admin/profile", params={"seconds": 0.1}, headers=other_user).status_code == 403
+        assert admin_client.get("/api/v1/admin/profile", params={"seconds": 3600}, headers=auth_header).status_code == 422
+
+def test_admin_access_is_opt_in(auth_header):
+    from fastapi import FastAPI
+    from m1_ml_book_flow_api.api.routes import admin
+    from m1_ml_book_flow_api.core.security import security
+    # Sem PROFILING_ENABLED a rota administrativa não é registrada
+    assert client.get("/api/v1/admin/profile", params={"seconds": 0.1}, headers=auth_header).status_code == 404
+    # Sem ADMIN_USERS nenhum usuário é administrador, nem o usuário padrão "admin"
+    admin_app = FastAPI()
+    admin_app.include_router(admin.router, prefix="/api/v1")
+    with patch.object(security, "ADMIN_USERS", set()):
+        response = TestClient(admin_app).get("/api/v1/admin/profile", params={"seconds": 0.1}, headers=auth_header)
+    assert response.status_code == 403
+
+def test_request_profile_mode_replaces_response_for_admins(auth_header):
+    import time
+    from fastapi import FastAPI
+    from m1_ml_book_flow_api.core.middleware import RequestObservabilityMiddleware, RequestProfilerMiddleware
+    from m1_ml_book_flow_api.core.security import security
+
+    def busy_route_for_profile():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+        return {"status": "ok"}
+
+    profiled_app = FastAPI()
+    profiled_app.get("/busy")(busy_route_for_profile)
+    profiled_app.add_middleware(RequestProfilerMiddleware)
+    profiled_app.add_middleware(RequestObservabilityMiddleware)
+    profiled_client = TestClient(profiled_app)
+
+    with patch.object(security, "ADMIN_USERS", {"admin"}):
+        response = profiled_client.get("/busy?profile=1", headers=auth_header)
+        assert response.headers["x-profile-status"] == "200"
+        assert "busy_route_for_profile" in response.text
+
+        other_user = {"Authorization": f"Bearer {create_test_token('1')}"}
+        response = profiled_client.get("/busy?profile=1", headers=other_user)
+        assert response.json() == {"status": "ok"} and "x-profile-status" not in response.headers
+
+def test_metrics_use_route_templates_and_domain_metrics(auth_header, mock_get_book_success, mock_catalog_snapshot):
+    from m1_ml_book_flow_api.api.repositories.catalog_repository import catalog_store
+    with patch('m1_ml_book_flow_api.api.repositories.catalog_repository._fetch_rows', return_value=[]):
+        catalog_store.refresh(db=object())
+    client.get("/api/v1/books/123", headers=auth_header)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'handler="/api/v1/books/{book_id}"' in response.text
+    assert "/api/v1/books/123" not in response.text
+    assert "bookflow_catalog_books 0.0" in response.text
+
+def test_metrics_are_aggregated_across_worker_processes(tmp_path):
+    import os
+    import subprocess
+    import sys
+    from m1_ml_book_flow_api.core import metrics
+    worker = "from m1_ml_book_flow_api.core.metrics import BOOKS_SAVED; BOOKS_SAVED.inc(3)"
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", worker], env=env, check=True)
+    with patch.object(metrics, "PROMETHEUS_MULTIPROC_DIR", str(tmp_path)):
+        body = metrics.metrics_response().body.decode()
+    assert "bookflow_books_saved_total 6.0" in body
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+import pytest
+import jwt
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from m1_ml_book_flow_api.main import app
+from m1_ml_book_flow_api.core.security.security import SECRET_KEY, ALGORITHM
+
+client = TestClient(app)
+
+def create_test_token(user_id: str, expires_delta: timedelta = None):
+    to_encode = {"sub": user_id, "type": "access"}
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=30))
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+@pytest.fixture
+def auth_header():
+    token = create_test_token("admin")
+    return {"Authorization": f"Bearer {token}"}
+
+def test_token_is_verified_once_per_request(auth_header, mock_list_books_success):
+    with patch('m1_ml_book_flow_api.core.security.security.jwt.decode', wraps=jwt.decode) as mock_decode:
+        assert client.get("/api/v1/books", headers=auth_header).status_code == 200
+    assert mock_decode.call_count == 1
+    with patch('m1_ml_book_flow_api.core.security.security.jwt.decode', wraps=jwt.decode):
+        response = client.get("/api/v1/books", headers={"Authorization": "Bearer invalido"})
+    assert response.status_code == 401
+
+def test_verified_tokens_are_cached_until_exp():
+    from fastapi import HTTPException
+    from m1_ml_book_flow_api.core.security import security
+    token = security.create_access_token({"sub": "42"})
+    with patch('m1_ml_book_flow_api.core.security.security.jwt.decode', wraps=jwt.decode) as mock_decode:
+        assert security.decode_access_token(token)["sub"] == "42"
+        assert security.decode_access_token(token)["sub"] == "42"
+    assert mock_decode.call_count == 1
+
+    for rejected in (security.create_access_token({"sub": "42"}, expires_delta=timedelta(seconds=-1)),
+                     security.create_refresh_token({"sub": "42"})):
+        with pytest.raises(HTTPException) as exc:
+            security.decode_access_token(rejected)
+        assert exc.value.status_code == 401
+        with pytest.raises(HTTPException):
+            security.decode_access_token(rejected)
+
+    with patch.object(security, 'token_cache', security.TTLCache(0, 60)):
+        with patch('m1_ml_book_flow_api.core.security.security.jwt.decode', wraps=jwt.decode) as mock_decode:
+            security.decode_access_token(token)
+            security.decode_access_token(token)
+        assert mock_decode.call_count == 2